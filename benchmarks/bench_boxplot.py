@@ -0,0 +1,103 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark of the boxplots (callflow.modules.BoxPlot) in sketch mode on
+synthetic runs of a callsite with `ranks` rows each, i.e., the boxplots of
+--runs runs merged into the ensemble's boxplot:
+
+    $ python benchmarks/bench_boxplot.py --ranks 1000 100000 --runs 8
+
+The time is compared with the exact boxplot of the union of the runs, and the
+sketch is checked against it on a low-variance column (i.e., values within a
+fraction of a percent of each other): the quartiles are within --rank_error of
+their rank, the extremes are exact and the same outliers are listed.
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from callflow.modules import BoxPlot
+
+
+def synthetic_df(nranks, dataset, scale, seed=0):
+    """
+    Rows of a callsite in a run, with a few outliers of its inclusive time.
+    """
+    rng = np.random.RandomState(seed)
+    inclusive = rng.normal(1100.0, scale, size=nranks)
+    inclusive[rng.choice(nranks, size=max(1, nranks // 1000), replace=False)] *= 1.5
+    return pd.DataFrame(
+        {
+            "time (inc)": inclusive,
+            "time": rng.gamma(2.0, 1.0, size=nranks),
+            "dataset": [dataset] * nranks,
+            "rank": np.arange(nranks),
+        }
+    )
+
+
+def exact_outliers(boxplot, kind):
+    """
+    Outlier values of an exact boxplot (its outliers are masked with zeros).
+    """
+    return sorted(_ for _ in boxplot.outliers[kind]["values"] if _ != 0)
+
+
+def check(dfs, rank_error):
+    """
+    The sketched boxplot of the runs agrees with the exact boxplot of their union.
+    """
+    df = pd.concat(dfs, ignore_index=True)
+    exact = BoxPlot(df)
+    sketch = BoxPlot.merge([BoxPlot(_, sketch=True) for _ in dfs])
+
+    values = np.sort(df["time (inc)"].values)
+    q = sketch.q["Inclusive"]
+    assert q[0] == values[0] and q[-1] == values[-1]
+    for quartile, estimate in zip(BoxPlot._QUARTILES[1:-1], q[1:-1]):
+        rank = np.searchsorted(values, estimate) / (len(values) - 1)
+        assert abs(rank - quartile) <= rank_error, (quartile, rank)
+
+    # Only the values within the rank error of the fences may differ.
+    expected = exact_outliers(exact, "Inclusive")
+    listed = sorted(sketch.outliers["Inclusive"]["values"])
+    differ = set(expected).symmetric_difference(listed)
+    assert len(differ) <= rank_error * len(values), (len(expected), len(listed))
+    return len(expected), len(listed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ranks", type=int, nargs="+", default=[200, 10000])
+    parser.add_argument("--runs", type=int, default=8)
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--rank_error", type=float, default=0.01)
+    args = parser.parse_args()
+
+    for nranks in args.ranks:
+        dfs = [
+            synthetic_df(nranks, f"run_{idx}", args.scale, seed=idx)
+            for idx in range(args.runs)
+        ]
+        expected, listed = check(dfs, args.rank_error)
+
+        start = time.perf_counter()
+        BoxPlot(pd.concat(dfs, ignore_index=True))
+        exact = time.perf_counter() - start
+
+        start = time.perf_counter()
+        BoxPlot.merge([BoxPlot(_, sketch=True) for _ in dfs])
+        sketch = time.perf_counter() - start
+
+        print(f"{args.runs} runs x {nranks} ranks (scale {args.scale})")
+        print(f"  exact:  {exact:.4f}s, {expected} outliers")
+        print(f"  sketch: {sketch:.4f}s, {listed} outliers")
+
+
+if __name__ == "__main__":
+    main()
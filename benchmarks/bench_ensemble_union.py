@@ -0,0 +1,138 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark of EnsembleGraph.union_df and EnsembleGraph.union_nxg on synthetic
+runs, each with (callsites x ranks) rows and a call tree over its callsites.
+
+    $ python benchmarks/bench_ensemble_union.py --runs 100 200 400 --callsites 1000 --ranks 16
+
+The previous implementation (concatenation and nx.DiGraph.update per run) is
+timed as a reference for at most --reference_max_runs runs.
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+import callflow
+from callflow import EnsembleGraph
+
+
+class SyntheticRun:
+    """
+    Stands for a processed SuperGraph (i.e., only its graphframe is used by the union).
+    """
+
+    def __init__(self, gf):
+        self.gf = gf
+
+
+def synthetic_run(tag, ncallsites, nranks, seed=0):
+    """
+    A run whose callsites are a random subset of a shared pool of callsites.
+    """
+    rng = np.random.RandomState(seed)
+    pool = 2 * ncallsites
+    parents = np.concatenate([[-1], rng.randint(0, np.arange(1, pool))])
+    callsites = np.sort(rng.choice(pool, ncallsites, replace=False))
+
+    gf = callflow.GraphFrame()
+    paths = {}
+    for callsite in callsites:
+        path = []
+        while callsite != -1:
+            path.append("callsite_" + str(callsite))
+            callsite = parents[callsite]
+        paths[path[0]] = gf.path_table.intern(reversed(path))
+
+    names = np.repeat(list(paths.keys()), nranks)
+    time = rng.gamma(2.0, 1.0, size=names.size)
+    gf.df = callflow.GraphFrame.categorize(
+        pd.DataFrame(
+            {
+                "name": names,
+                "module": ["module_" + _[-1] for _ in names],
+                "dataset": tag,
+                "rank": np.tile(np.arange(nranks), len(paths)),
+                "time": time,
+                "time (inc)": time + rng.gamma(2.0, 1.0, size=names.size),
+                "path": np.repeat(list(paths.values()), nranks),
+            }
+        )
+    )
+    gf.nxg = nx.DiGraph()
+    for path_id in paths.values():
+        nx.add_path(gf.nxg, gf.path_table.path(path_id))
+    return gf
+
+
+def reference_union(supergraphs):
+    """
+    Previous implementation: concatenation and nx.DiGraph.update per run.
+    """
+    df = pd.DataFrame([])
+    nxg = nx.DiGraph()
+    for tag in supergraphs:
+        df = pd.concat([df, supergraphs[tag].gf.df], sort=True)
+        nxg.update(supergraphs[tag].gf.nxg)
+    return df, nxg
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, nargs="+", default=[100, 200, 400])
+    parser.add_argument("--callsites", type=int, default=1000)
+    parser.add_argument("--ranks", type=int, default=16)
+    parser.add_argument("--reference_max_runs", type=int, default=200)
+    args = parser.parse_args()
+
+    print(
+        "%6s %12s %12s %12s %12s %12s"
+        % ("runs", "rows", "union_df", "union_nxg", "MB", "reference")
+    )
+    for nruns in args.runs:
+        supergraphs = {
+            "run_"
+            + str(idx): SyntheticRun(
+                synthetic_run("run_" + str(idx), args.callsites, args.ranks, idx)
+            )
+            for idx in range(nruns)
+        }
+        ensemble = EnsembleGraph.__new__(EnsembleGraph)
+        ensemble.supergraphs = supergraphs
+        ensemble.gf = callflow.GraphFrame()
+
+        start = time.perf_counter()
+        df = callflow.GraphFrame.categorize(ensemble.union_df())
+        union_df = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ensemble.union_nxg()
+        union_nxg = time.perf_counter() - start
+
+        reference = "-"
+        if nruns <= args.reference_max_runs:
+            start = time.perf_counter()
+            reference_union(supergraphs)
+            reference = "%.2fs" % (time.perf_counter() - start)
+
+        print(
+            "%6d %12d %12s %12s %12.1f %12s"
+            % (
+                nruns,
+                len(df),
+                "%.2fs" % union_df,
+                "%.2fs" % union_nxg,
+                df.memory_usage(deep=True).sum() / (1024 * 1024),
+                reference,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
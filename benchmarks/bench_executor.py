@@ -0,0 +1,141 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark of the request executor (callflow.server.executor) on synthetic
+requests, i.e., `requests` requests of `work` seconds (busy, i.e., holding the
+GIL) issued by --threads concurrent threads, of which --distinct are distinct:
+
+    $ python benchmarks/bench_executor.py --requests 64 --work 0.05 --workers 4
+
+The wall time is compared with computing the requests on the request threads
+(the previous implementation). It is also checked that a request whose
+computation completes before it is submitted (i.e., the future is done when
+submit returns) does not deadlock the executor.
+"""
+
+import time
+import argparse
+import threading
+from concurrent.futures import Future
+
+from callflow.server.executor import RequestExecutor
+
+
+class SyntheticCallFlow:
+    """
+    CallFlow computing a request by busy-waiting `work` seconds.
+    """
+
+    config = {}
+    executor = None
+
+    def __init__(self, work):
+        self.work = work
+
+    def request_ensemble(self, operation):
+        start = time.perf_counter()
+        while time.perf_counter() - start < self.work:
+            pass
+        return operation["id"]
+
+
+class CompletedPool:
+    """
+    Pool computing each submitted function inline, so its future is already
+    done when submit returns.
+    """
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def run_threads(nthreads, nrequests, ndistinct, request):
+    """
+    Issue the requests from `nthreads` threads, and return the wall time.
+    """
+    ids = [idx % ndistinct for idx in range(nrequests)]
+
+    def _issue(offset):
+        for _ in ids[offset::nthreads]:
+            request({"name": "synthetic", "id": _})
+
+    threads = [threading.Thread(target=_issue, args=(_,)) for _ in range(nthreads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def check_completed_future(callflow_):
+    """
+    A request whose future completes before its callback is registered must
+    return, and be removed from the requests in flight.
+    """
+    executor = RequestExecutor(callflow_, workers=1)
+    executor._pool.shutdown()
+    executor._pool = CompletedPool()
+
+    # The inline pool computes the requests of callflow_ (set by the executor).
+    result = {}
+
+    def _request():
+        result["id"] = executor.run("request_ensemble", {"id": 1})
+        result["stats"] = executor.stats()
+
+    thread = threading.Thread(target=_request, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    assert not thread.is_alive(), "The executor deadlocked on a completed future."
+    assert result["id"] == 1 and result["stats"]["inflight"] == 0
+    print("A request with a completed future: ok")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--distinct", type=int, default=16)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--work", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    callflow_ = SyntheticCallFlow(args.work)
+    check_completed_future(callflow_)
+
+    inline = run_threads(
+        args.threads, args.requests, args.distinct, callflow_.request_ensemble
+    )
+
+    executor = RequestExecutor(callflow_, workers=args.workers)
+    offloaded = run_threads(
+        args.threads,
+        args.requests,
+        args.distinct,
+        lambda operation: executor.run("request_ensemble", operation),
+    )
+    stats = executor.stats()
+    executor.shutdown()
+
+    print(
+        f"{args.requests} requests ({args.distinct} distinct) of {args.work}s, "
+        f"{args.threads} threads"
+    )
+    print(f"  request threads:  {inline:.3f}s")
+    print(
+        f"  {args.workers} workers:        {offloaded:.3f}s "
+        f"({stats['submitted']} computed, {stats['deduplicated']} deduplicated)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark of the module grouping (callflow.operations.Group) on synthetic
+calling context trees: each callsite calls `fanout` callsites down to `depth`
+levels, the callsites belong to `modules` modules (a callee stays in its
+caller's module with probability --stay), and each callsite has a row per rank.
+
+    $ python benchmarks/bench_group.py --depth 4 6 8 --fanout 4 --ranks 16
+
+The previous implementation (grouping the full call path of both ends of each
+edge) is timed as a reference on the trees with at most --reference_max_nodes
+callsites, and checked to produce the same group and component paths.
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import networkx as nx
+
+from callflow import GraphFrame
+from callflow.operations import Group
+
+
+def synthetic_gf(depth, fanout, nmodules, nranks, stay, seed=0):
+    """
+    GraphFrame of a calling context tree with a single root ("main").
+    """
+    rng = np.random.RandomState(seed)
+    gf = GraphFrame()
+
+    names, modules, paths = ["main"], ["module_0"], [gf.path_table.intern(["main"])]
+    edges = []
+    layer = [0]
+    for level in range(depth):
+        next_layer = []
+        for caller in layer:
+            for _ in range(fanout):
+                callee = len(names)
+                if rng.rand() < stay:
+                    module = modules[caller]
+                else:
+                    module = "module_" + str(rng.randint(nmodules))
+                names.append(f"f_{callee}")
+                modules.append(module)
+                paths.append(gf.path_table.extend(paths[caller], names[callee]))
+                edges.append((names[caller], names[callee]))
+                next_layer.append(callee)
+        layer = next_layer
+
+    gf.df = pd.DataFrame(
+        {
+            "name": np.repeat(names, nranks),
+            "module": np.repeat(modules, nranks),
+            "path": np.repeat(paths, nranks),
+            "rank": np.tile(np.arange(nranks), len(names)),
+        }
+    )
+    gf.nxg = nx.DiGraph(edges)
+    return gf
+
+
+class ReferenceGroup:
+    """
+    Group and component paths of the previous implementation.
+    """
+
+    def __init__(self, gf):
+        self.gf = gf
+        self.callsite_module_map = gf.df.set_index("name")["module"].to_dict()
+        self.callsite_path_map = gf.df.set_index("name")["path"].to_dict()
+
+    def compute(self):
+        group_path, component_path = {}, {}
+        for edge in self.gf.nxg.edges():
+            for node in edge:
+                if "/" in node:
+                    node = node.split("/")[-1]
+                path = self.gf.path_table.path(self.callsite_path_map[node])
+                group_path[node] = self.create_group_path(path)
+                component_path[node] = self.create_component_path(
+                    path, group_path[node]
+                )
+
+        path_table = self.gf.path_table
+        group_path = {k: path_table.intern(v) for k, v in group_path.items()}
+        component_path = {k: path_table.intern(v) for k, v in component_path.items()}
+        for col, mapping in [
+            ("group_path", group_path),
+            ("component_path", component_path),
+        ]:
+            self.gf.df[col] = [mapping.get(_, -1) for _ in self.gf.df["name"]]
+
+    def create_group_path(self, path):
+        group_path = []
+        prev_module = None
+        for idx, callsite in enumerate(path):
+            if idx > 0 and "/" in callsite:
+                callsite = callsite.split("/")[-1]
+            module = self.callsite_module_map[callsite]
+            if idx == 0 or module != prev_module:
+                group_path.append(module + "=" + callsite)
+            prev_module = module
+        return group_path
+
+    def create_component_path(self, path, group_path):
+        component_module = group_path[-1].split("=")[0]
+        component_path = [component_module]
+        for node in path:
+            callsite = node.split("/")[-1] if "/" in node else node
+            if self.callsite_module_map[callsite] == component_module:
+                component_path.append(node)
+        return component_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depth", type=int, nargs="+", default=[4, 6, 8])
+    parser.add_argument("--fanout", type=int, default=4)
+    parser.add_argument("--modules", type=int, default=32)
+    parser.add_argument("--ranks", type=int, default=16)
+    parser.add_argument("--stay", type=float, default=0.8)
+    parser.add_argument("--reference_max_nodes", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(
+        "%8s %10s %12s %14s %14s"
+        % ("depth", "callsites", "rows", "memoized", "reference")
+    )
+    for depth in args.depth:
+        gf = synthetic_gf(depth, args.fanout, args.modules, args.ranks, args.stay)
+        ncallsites = gf.nxg.number_of_nodes()
+
+        start = time.perf_counter()
+        Group(gf)
+        memoized = "%.2fs" % (time.perf_counter() - start)
+
+        reference = "-"
+        if ncallsites <= args.reference_max_nodes:
+            ref = synthetic_gf(depth, args.fanout, args.modules, args.ranks, args.stay)
+            start = time.perf_counter()
+            ReferenceGroup(ref).compute()
+            reference = "%.2fs" % (time.perf_counter() - start)
+
+            for col in ["group_path", "component_path"]:
+                assert gf.path_table.paths(gf.df[col]) == ref.path_table.paths(
+                    ref.df[col]
+                ), col
+            # vis_name is labeled by the callsite's own module.
+            assert (gf.df["vis_name"] == gf.df["module"] + "=" + gf.df["name"]).all()
+
+        print(
+            "%8d %10d %12d %14s %14s"
+            % (depth, ncallsites, len(gf.df), memoized, reference)
+        )
+
+
+if __name__ == "__main__":
+    main()
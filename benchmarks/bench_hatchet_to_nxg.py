@@ -0,0 +1,127 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark of GraphFrame.hatchet_graph_to_nxg on synthetic call DAGs with
+many shared subpaths: `depth` layers of `width` nodes, where each node calls
+`fanout` nodes of the next layer (i.e., up to width * fanout^depth paths).
+
+    $ python benchmarks/bench_hatchet_to_nxg.py --depth 4 8 16 64 --width 16 --fanout 2
+
+The previous implementation (walking node.paths() of every node) is timed
+as a reference on the DAGs with at most --reference_max_paths paths, and
+checked to produce the same graph.
+"""
+
+import time
+import argparse
+import numpy as np
+import networkx as nx
+from hatchet.node import Node
+from hatchet.frame import Frame
+from hatchet.graph import Graph
+
+from callflow import GraphFrame
+from callflow.utils import node_dict_from_frame, sanitize_name
+
+
+def synthetic_dag(depth, width, fanout, seed=0):
+    """
+    Layered call DAG with a single root ("main").
+    """
+    rng = np.random.RandomState(seed)
+    root = Node(Frame({"type": "function", "name": "main"}))
+
+    layer = [root]
+    for level in range(depth):
+        nodes = [
+            Node(Frame({"type": "function", "name": f"f_{level}_{idx}"}))
+            for idx in range(width)
+        ]
+        for caller in layer:
+            for idx in rng.choice(width, min(fanout, width), replace=False):
+                caller.add_child(nodes[idx])
+                nodes[idx].add_parent(caller)
+        layer = [_ for _ in nodes if len(_.parents) > 0]
+    return Graph([root])
+
+
+def count_paths(graph):
+    """
+    Number of paths from the roots to each node, summed over the nodes.
+    """
+    npaths = {}
+
+    def _count(node):
+        if id(node) not in npaths:
+            npaths[id(node)] = max(1, sum(_count(_) for _ in node.parents))
+        return npaths[id(node)]
+
+    return sum(_count(node) for node in graph.traverse())
+
+
+def reference_graph_to_nxg(graph):
+    """
+    Previous implementation: every path of every node adds its last edge.
+    """
+
+    def _get_node_name(nd):
+        nm = sanitize_name(nd["name"])
+        if nd.get("line") != "NA" and nd.get("line") is not None:
+            nm += ":" + str(nd.get("line"))
+        return nm
+
+    nxg = nx.DiGraph()
+    for node in graph.traverse():
+        for node_path in node.paths():
+            if len(node_path) >= 2:
+                src_name = _get_node_name(node_dict_from_frame(node_path[-2]))
+                trg_name = _get_node_name(node_dict_from_frame(node_path[-1]))
+                nxg.add_edge(src_name, trg_name)
+    return nxg
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--depth", type=int, nargs="+", default=[4, 8, 16, 64])
+    parser.add_argument("--width", type=int, default=16)
+    parser.add_argument("--fanout", type=int, default=2)
+    parser.add_argument("--reference_max_paths", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(
+        "%6s %8s %8s %14s %12s %12s"
+        % ("depth", "nodes", "edges", "paths", "linear", "reference")
+    )
+    for depth in args.depth:
+        graph = synthetic_dag(depth, args.width, args.fanout)
+        npaths = count_paths(graph)
+
+        start = time.perf_counter()
+        nxg = GraphFrame.hatchet_graph_to_nxg(graph)
+        linear = "%.3fs" % (time.perf_counter() - start)
+
+        reference = "-"
+        if npaths <= args.reference_max_paths:
+            start = time.perf_counter()
+            ref_nxg = reference_graph_to_nxg(graph)
+            reference = "%.3fs" % (time.perf_counter() - start)
+            assert set(nxg.edges()) == set(ref_nxg.edges())
+
+        print(
+            "%6d %8d %8d %14.3g %12s %12s"
+            % (
+                depth,
+                nxg.number_of_nodes(),
+                nxg.number_of_edges(),
+                npaths,
+                linear,
+                reference,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
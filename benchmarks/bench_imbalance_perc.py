@@ -0,0 +1,96 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark of Process.Builder.add_imbalance_perc on synthetic dataframes
+with (callsites x ranks) rows.
+
+    $ python benchmarks/bench_imbalance_perc.py --callsites 100 1000 10000 --ranks 100 1000 10000
+
+The largest (10^4 x 10^4) frame needs ~4 GB of memory. The per-callsite loop
+(the previous implementation) is timed as a reference on the frames with at
+most --reference_max_rows rows.
+"""
+
+import time
+import argparse
+import numpy as np
+import pandas as pd
+from scipy.stats import kurtosis, skew
+
+from callflow.operations import Process
+
+
+def synthetic_df(ncallsites, nranks, seed=0):
+    """
+    Dataframe with a row for each (callsite, rank).
+    """
+    rng = np.random.RandomState(seed)
+    codes = np.repeat(np.arange(ncallsites, dtype=np.int32), nranks)
+    names = pd.Categorical.from_codes(
+        codes, categories=["callsite_" + str(_) for _ in range(ncallsites)]
+    )
+    time = rng.gamma(2.0, 1.0, size=codes.size)
+    return pd.DataFrame(
+        {
+            "name": names,
+            "rank": np.tile(np.arange(nranks, dtype=np.int32), ncallsites),
+            "time": time,
+            "time (inc)": time + rng.gamma(2.0, 1.0, size=codes.size),
+        }
+    )
+
+
+def reference_statistics(df):
+    """
+    Per-callsite loop of the previous implementation.
+    """
+    ret = {}
+    for node_name in df["name"].unique():
+        node_df = df.loc[df["name"] == node_name]
+        ret[node_name] = [
+            np.std(node_df["time (inc)"].tolist(), ddof=1),
+            np.std(node_df["time"].tolist(), ddof=1),
+            skew(node_df["time (inc)"].tolist()),
+            skew(node_df["time"].tolist()),
+            kurtosis(node_df["time (inc)"].tolist()),
+            kurtosis(node_df["time"].tolist()),
+        ]
+    return ret
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--callsites", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--ranks", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--reference_max_rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    print(
+        "%10s %10s %12s %14s %14s"
+        % ("callsites", "ranks", "rows", "vectorized", "reference")
+    )
+    for ncallsites in args.callsites:
+        for nranks in args.ranks:
+            df = synthetic_df(ncallsites, nranks)
+
+            start = time.perf_counter()
+            Process.Builder.callsite_statistics(df)
+            vectorized = "%.2fs" % (time.perf_counter() - start)
+
+            reference = "-"
+            if len(df) <= args.reference_max_rows:
+                start = time.perf_counter()
+                reference_statistics(df)
+                reference = "%.2fs" % (time.perf_counter() - start)
+
+            print(
+                "%10d %10d %12d %14s %14s"
+                % (ncallsites, nranks, len(df), vectorized, reference)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark of the API response serialization (callflow.server.serializer) on
+synthetic responses of the /supergraph, /cct and /compare endpoints, i.e., the
+node-link data of a graph with `nodes` nodes (with the per-run attributes of
+--runs runs), and the DiffView results of `modules` modules over `ranks` ranks:
+
+    $ python benchmarks/bench_serializer.py --nodes 1000 --ranks 1024
+
+The payload bytes and the encode time (including the compression) of each
+encoding are compared with the previous serialization (json.dumps, uncompressed).
+Only the installed encoders and compressors (e.g., msgpack, brotli) are reported.
+"""
+
+import json
+import time
+import argparse
+import numpy as np
+import networkx as nx
+from networkx.readwrite import json_graph
+
+from callflow.server.serializer import Serializer
+
+
+def synthetic_graph(nnodes, nruns, seed=0):
+    """
+    Node-link data of a random tree with the node attributes of the supergraph.
+    """
+    rng = np.random.RandomState(seed)
+    nxg = nx.DiGraph()
+    for idx in range(nnodes):
+        name = f"callsite_{idx}"
+        attrs = {
+            "type": "callsite",
+            "module": f"module_{idx % 32}",
+            "time (inc)": rng.gamma(2.0, 1.0),
+            "time": rng.gamma(2.0, 1.0),
+        }
+        for run in range(nruns):
+            attrs[f"run_{run}"] = {
+                "time (inc)": rng.gamma(2.0, 1.0),
+                "time": rng.gamma(2.0, 1.0),
+            }
+        nxg.add_node(name, **attrs)
+        if idx > 0:
+            nxg.add_edge(
+                f"callsite_{rng.randint(idx)}", name, weight=rng.gamma(2.0, 1.0)
+            )
+    return json_graph.node_link_data(nxg)
+
+
+def synthetic_compare(nmodules, nranks, seed=0):
+    """
+    DiffView results (i.e., per-rank float arrays) of the modules.
+    """
+    rng = np.random.RandomState(seed)
+    ret = []
+    for idx in range(nmodules):
+        mean = rng.gamma(2.0, 1.0, size=nranks)
+        ret.append(
+            {
+                "name": f"module_{idx}",
+                "mean1": float(mean.mean()),
+                "mean2": float(mean.mean()),
+                "dataset": ["run_0", "run_1"],
+                "mean_diff": float(rng.randn()),
+                "bins": 20,
+                "hist": {
+                    "x": np.linspace(0, 1, 20).tolist(),
+                    "y": rng.randint(0, nranks, 20).tolist(),
+                },
+                "data_min": 0,
+                "mean": mean.tolist(),
+                "diff": rng.randn(nranks).tolist(),
+            }
+        )
+    return ret
+
+
+def encodings():
+    """
+    (name, accept, accept_encoding) of each negotiated encoding.
+    """
+    ret = []
+    for mimetype in Serializer.ENCODERS:
+        for encoding in [None] + list(Serializer.COMPRESSORS):
+            name = mimetype.split("/")[-1] + ("+" + encoding if encoding else "")
+            ret.append((name, mimetype, encoding or "identity"))
+    return ret
+
+
+def run(encode, data, repeat):
+    """
+    Returns the size of the payload, and the best time of encoding it.
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = encode(data)
+        best = min(best, time.perf_counter() - start)
+    return len(payload), best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1000])
+    parser.add_argument("--runs", type=int, default=8)
+    parser.add_argument("--modules", type=int, default=32)
+    parser.add_argument("--ranks", type=int, default=1024)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    serializer = Serializer()
+    print(
+        "%-12s %8s %-20s %14s %12s"
+        % ("endpoint", "nodes", "encoding", "bytes", "encode")
+    )
+    for nnodes in args.nodes:
+        responses = {
+            "/supergraph": synthetic_graph(nnodes, args.runs),
+            "/cct": synthetic_graph(nnodes, 0),
+            "/compare": synthetic_compare(args.modules, args.ranks),
+        }
+        for endpoint, data in responses.items():
+            size, best = run(lambda _: json.dumps(_).encode("utf-8"), data, args.repeat)
+            print(
+                "%-12s %8d %-20s %14d %10.1fms"
+                % (endpoint, nnodes, "json.dumps", size, best * 1000)
+            )
+            for name, accept, accept_encoding in encodings():
+                size, best = run(
+                    lambda _: serializer.serialize(_, accept, accept_encoding)[0],
+                    data,
+                    args.repeat,
+                )
+                print(
+                    "%-12s %8d %-20s %14d %10.1fms"
+                    % (endpoint, nnodes, name, size, best * 1000)
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark of the single auxiliary processing (callflow.modules.SingleAuxiliary)
+on synthetic dataframes with (callsites x ranks) rows, e.g., 1M rows:
+
+    $ python benchmarks/bench_single_auxiliary.py --callsites 1000 --ranks 1000
+
+Both the time of the processing (including writing the auxiliary store) and
+of computing the payload alone are reported. The previous implementation
+(a row lookup, a histogram and the per-column copies for each callsite and
+module) is timed as a reference on the frames with at most
+--reference_max_rows rows, and checked to compute the same payload.
+"""
+
+import os
+import time
+import argparse
+import tempfile
+import numpy as np
+import pandas as pd
+
+from callflow import GraphFrame
+from callflow.modules import SingleAuxiliary
+
+
+def synthetic_gf(ncallsites, nranks, nmodules, seed=0):
+    """
+    GraphFrame with a row for each (callsite, rank), in rank-major order.
+    """
+    rng = np.random.RandomState(seed)
+    codes = np.tile(np.arange(ncallsites, dtype=np.int32), nranks)
+    names = ["callsite_" + str(_) for _ in range(ncallsites)]
+    modules = ["module_" + str(_ % nmodules) for _ in range(ncallsites)]
+    time = rng.gamma(2.0, 1.0, size=codes.size)
+
+    gf = GraphFrame()
+    gf.graph = None
+    gf.df = pd.DataFrame(
+        {
+            "name": pd.Categorical.from_codes(codes, categories=names),
+            "module": pd.Categorical(np.array(modules)[codes]),
+            "nid": codes,
+            "rank": np.repeat(np.arange(nranks, dtype=np.int32), ncallsites),
+            "dataset": pd.Categorical(["run"] * codes.size),
+            "time": time,
+            "time (inc)": time + rng.gamma(2.0, 1.0, size=codes.size),
+        }
+    )
+    return gf
+
+
+class ReferenceSingleAuxiliary(SingleAuxiliary):
+    """
+    Payload of the previous implementation.
+    """
+
+    def histogram(self, data):
+        h, b = np.histogram(data, range=[0, data.max()], bins=int(self.binCount))
+        return 0.5 * (b[1:] + b[:-1]), h
+
+    def get_module_callsite_map(self):
+        ret = {"ensemble": {}}
+        for module in self.df["module"].unique().tolist():
+            callsites = self.gf.lookup_with_module(module)["name"].unique().tolist()
+            ret["ensemble"][module] = callsites
+        return ret
+
+    def pack_json(self, group_df, node_name):
+        hist_inc_grid = self.histogram(np.array(group_df["time (inc)"].tolist()))
+        hist_exc_grid = self.histogram(np.array(group_df["time"].tolist()))
+        return {
+            "name": node_name,
+            "time (inc)": group_df["time (inc)"].tolist(),
+            "time": group_df["time"].tolist(),
+            "sorted_time (inc)": group_df["time (inc)"].sort_values().tolist(),
+            "sorted_time": group_df["time"].sort_values().tolist(),
+            "rank": group_df["rank"].tolist(),
+            "id": "node-" + str(group_df["nid"].tolist()[0]),
+            "mean_time (inc)": group_df["time (inc)"].mean(),
+            "mean_time": group_df["time"].mean(),
+            "max_time (inc)": group_df["time (inc)"].max(),
+            "max_time": group_df["time"].max(),
+            "min_time (inc)": group_df["time (inc)"].min(),
+            "min_time": group_df["time"].min(),
+            "dataset": group_df["dataset"].tolist(),
+            "module": group_df["module"].tolist()[0],
+            "hist_time (inc)": self.histogram_format(hist_inc_grid),
+            "hist_time": self.histogram_format(hist_exc_grid),
+        }
+
+    def callsite_data(self):
+        ensemble = {}
+        for name in self.df["name"].unique():
+            ensemble[name] = self.pack_json(self.gf.lookup_with_name(name), name)
+        return {self.dataset: ensemble}
+
+    def module_data(self):
+        ensemble = {}
+        for module in self.df["module"].unique():
+            ensemble[module] = self.pack_json(
+                self.gf.lookup_with_module(module), module
+            )
+        return {self.dataset: ensemble}
+
+
+def run(cls, gf, save_path):
+    """
+    Returns the time of the processing (including writing the payload), the
+    time of computing the payload, and the payload.
+    """
+    start = time.perf_counter()
+    aux = cls(gf, dataset="run", props={"save_path": save_path})
+    total = time.perf_counter() - start
+
+    start = time.perf_counter()
+    payload = {
+        "callsite": aux.callsite_data(),
+        "module": aux.module_data(),
+        "moduleCallsiteMap": aux.get_module_callsite_map(),
+    }
+    return total, time.perf_counter() - start, payload
+
+
+def assert_close(a, b, path=""):
+    """
+    Same payload, except for the round-off of the means.
+    """
+    if isinstance(a, dict):
+        assert list(a.keys()) == list(b.keys()), path
+        for key in a:
+            assert_close(a[key], b[key], path + "/" + key)
+    elif path.split("/")[-1].startswith("mean_"):
+        assert np.isclose(a, b, rtol=1e-12), path
+    else:
+        assert a == b, path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--callsites", type=int, nargs="+", default=[1000])
+    parser.add_argument("--ranks", type=int, nargs="+", default=[1000])
+    parser.add_argument("--modules", type=int, default=32)
+    parser.add_argument("--reference_max_rows", type=int, default=1000000)
+    args = parser.parse_args()
+
+    print(
+        "%10s %8s %10s %16s %16s"
+        % ("callsites", "ranks", "rows", "grouped", "reference")
+    )
+    for ncallsites in args.callsites:
+        for nranks in args.ranks:
+            gf = synthetic_gf(ncallsites, nranks, args.modules)
+            with tempfile.TemporaryDirectory() as save_path:
+                os.makedirs(os.path.join(save_path, "run"))
+                total, compute, payload = run(SingleAuxiliary, gf, save_path)
+                grouped = "%.2fs/%.2fs" % (total, compute)
+
+                reference = "-"
+                if len(gf.df) <= args.reference_max_rows:
+                    total, compute, ref_payload = run(
+                        ReferenceSingleAuxiliary, gf, save_path
+                    )
+                    reference = "%.2fs/%.2fs" % (total, compute)
+                    assert_close(payload, ref_payload)
+
+            print(
+                "%10d %8d %10d %16s %16s"
+                % (ncallsites, nranks, len(gf.df), grouped, reference)
+            )
+
+
+if __name__ == "__main__":
+    main()
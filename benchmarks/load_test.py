@@ -0,0 +1,149 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Load test of a running CallFlow server: each of `concurrency` clients sends
+requests to an endpoint for --duration seconds, and the requests/second and the
+latency percentiles of each endpoint are reported, e.g., to compare the
+development server with the production mode:
+
+    $ callflow_server --config config.json --production --server_workers 4
+    $ python benchmarks/load_test.py --url http://127.0.0.1:5000 --concurrency 1 8 32
+
+The requests of the main endpoints are made for the runs listed by /init (the
+ensemble endpoints are used if there are more than one run).
+"""
+
+import gzip
+import json
+import time
+import argparse
+import threading
+import urllib.request
+import numpy as np
+
+
+def endpoints(runs, cct_size):
+    """
+    {name: (method, path, body)} of the main endpoints.
+    """
+    ret = {
+        "/init": ("GET", "/init", None),
+        "/supergraph_data": (
+            "POST",
+            "/supergraph_data",
+            {"datasets": runs, "sortBy": "time (inc)", "page": 0},
+        ),
+    }
+    if len(runs) > 1:
+        ret["/ensemble_supergraph"] = ("POST", "/ensemble_supergraph", {})
+        ret["/ensemble_cct"] = (
+            "POST",
+            "/ensemble_cct",
+            {"functionsInCCT": cct_size},
+        )
+    else:
+        ret["/single_supergraph"] = (
+            "POST",
+            "/single_supergraph",
+            {"dataset": runs[0]},
+        )
+        ret["/single_cct"] = (
+            "POST",
+            "/single_cct",
+            {"dataset": runs[0], "functionsInCCT": cct_size},
+        )
+    return ret
+
+
+def request(url, method, path, body, timeout):
+    data = None if body is None else json.dumps(body).encode("utf-8")
+    req = urllib.request.Request(
+        url + path,
+        data=data,
+        method=method,
+        headers={"Content-Type": "application/json", "Accept-Encoding": "gzip"},
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as response:
+        payload = response.read()
+        if response.headers.get("Content-Encoding") == "gzip":
+            payload = gzip.decompress(payload)
+        return payload
+
+
+def run(url, endpoint, concurrency, duration, timeout):
+    """
+    Returns the number of successful requests, errors and the latencies.
+    """
+    method, path, body = endpoint
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    end = time.perf_counter() + duration
+
+    def client():
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            try:
+                request(url, method, path, body, timeout)
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return len(latencies), errors[0], np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--endpoints", nargs="+", default=None)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--cct_size", type=int, default=70)
+    args = parser.parse_args()
+
+    config = json.loads(request(args.url, "GET", "/init", None, args.timeout))
+    runs = config["parameter_props"]["runs"]
+    targets = endpoints(runs, args.cct_size)
+    if args.endpoints is not None:
+        targets = {_: targets[_] for _ in args.endpoints}
+
+    print(
+        "%-22s %8s %10s %8s %10s %10s %10s"
+        % ("endpoint", "clients", "req/s", "errors", "p50", "p95", "p99")
+    )
+    for name, endpoint in targets.items():
+        for concurrency in args.concurrency:
+            count, errors, latencies = run(
+                args.url, endpoint, concurrency, args.duration, args.timeout
+            )
+            if count > 0:
+                p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+            else:
+                p50 = p95 = p99 = np.nan
+            print(
+                "%-22s %8d %10.1f %8d %8.1fms %8.1fms %8.1fms"
+                % (
+                    name,
+                    concurrency,
+                    count / args.duration,
+                    errors,
+                    p50,
+                    p95,
+                    p99,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,412 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+"""
+Mergeable summaries of grouped values.
+
+Each summary holds the state of a set of groups (e.g., callsites), is updated
+with chunks of (group code, value) pairs, and two summaries of the same groups
+can be merged. So, the values can be summarized a chunk at a time (e.g., out of
+core, or in parallel) with the same result as summarizing them at once.
+"""
+
+import numpy as np
+
+
+class Moments:
+    """
+    Count, mean, sum of squared deviations (M2), min and max of each group.
+    Chunks are merged with the pairwise update of Chan et al.
+    """
+
+    def __init__(self, ngroups=0):
+        self.count = np.zeros(ngroups, dtype=np.int64)
+        self.mean = np.zeros(ngroups)
+        self.m2 = np.zeros(ngroups)
+        self.min = np.full(ngroups, np.inf)
+        self.max = np.full(ngroups, -np.inf)
+
+    def __len__(self):
+        return len(self.count)
+
+    def resize(self, ngroups):
+        """
+        Add empty groups up to `ngroups` (e.g., new groups seen in a chunk).
+        """
+        pad = ngroups - len(self)
+        if pad > 0:
+            self.count = np.concatenate([self.count, np.zeros(pad, dtype=np.int64)])
+            self.mean = np.concatenate([self.mean, np.zeros(pad)])
+            self.m2 = np.concatenate([self.m2, np.zeros(pad)])
+            self.min = np.concatenate([self.min, np.full(pad, np.inf)])
+            self.max = np.concatenate([self.max, np.full(pad, -np.inf)])
+
+    @staticmethod
+    def from_values(codes, values, ngroups):
+        ret = Moments(ngroups)
+        if len(codes) == 0:
+            return ret
+
+        ret.count = np.bincount(codes, minlength=ngroups)
+        total = np.bincount(codes, weights=values, minlength=ngroups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ret.mean = np.where(ret.count > 0, total / ret.count, 0.0)
+        ret.m2 = np.bincount(
+            codes, weights=(values - ret.mean[codes]) ** 2, minlength=ngroups
+        )
+        np.minimum.at(ret.min, codes, values)
+        np.maximum.at(ret.max, codes, values)
+        return ret
+
+    def update(self, codes, values):
+        self.resize(codes.max() + 1 if len(codes) > 0 else 0)
+        self.merge(Moments.from_values(codes, values, len(self)))
+
+    def merge(self, other):
+        ngroups = max(len(self), len(other))
+        self.resize(ngroups)
+        other.resize(ngroups)
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(count > 0, other.count / count, 0.0)
+        self.m2 = self.m2 + other.m2 + delta ** 2 * self.count * weight
+        self.mean = self.mean + delta * weight
+        self.count = count
+        self.min = np.minimum(self.min, other.min)
+        self.max = np.maximum(self.max, other.max)
+
+    def take(self, indices):
+        """
+        Returns the moments of the groups `indices`.
+        """
+        ret = Moments()
+        ret.count = self.count[indices]
+        ret.mean = self.mean[indices]
+        ret.m2 = self.m2[indices]
+        ret.min = self.min[indices]
+        ret.max = self.max[indices]
+        return ret
+
+    def reduce(self, codes, ngroups):
+        """
+        Returns the moments of coarser groups, i.e., group `idx` is merged into `codes[idx]`.
+        """
+        ret = Moments(ngroups)
+        ret.count = np.bincount(codes, weights=self.count, minlength=ngroups).astype(
+            np.int64
+        )
+        total = np.bincount(codes, weights=self.count * self.mean, minlength=ngroups)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ret.mean = np.where(ret.count > 0, total / ret.count, 0.0)
+        ret.m2 = np.bincount(
+            codes,
+            weights=self.m2 + self.count * (self.mean - ret.mean[codes]) ** 2,
+            minlength=ngroups,
+        )
+        np.minimum.at(ret.min, codes, self.min)
+        np.maximum.at(ret.max, codes, self.max)
+        return ret
+
+    def variance(self, ddof=1):
+        """
+        Variance of each group (NaN if it has at most `ddof` values).
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > ddof, self.m2 / (self.count - ddof), np.nan)
+
+
+class QuantileSketch:
+    """
+    Relative-error quantile sketch of each group (refer DDSketch, Masson et al.).
+
+    The values are counted in logarithmically spaced buckets, so a quantile is
+    estimated within `relative_accuracy` of a value of the group, and merging two
+    sketches adds their bucket counts. The memory is proportional to the number of
+    buckets used by each group (i.e., log of the range of its values), not to
+    the number of values. The sketch is meant for non-negative values (e.g., times),
+    values below `min_value` are counted as zeros.
+    """
+
+    # Bits of the bucket index in the (group, bucket) keys.
+    _BUCKET_BITS = 20
+    _OFFSET = 1 << (_BUCKET_BITS - 1)
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        assert 0 < relative_accuracy < 1
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = np.log(self.gamma)
+        self.min_value = min_value
+
+        # Sorted (group, bucket) keys, and their counts.
+        self.keys = np.empty(0, dtype=np.int64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def _buckets(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        ret = np.zeros(len(values), dtype=np.int64)
+        positive = values >= self.min_value
+        ret[positive] = np.ceil(np.log(values[positive]) / self.log_gamma)
+        # The zero bucket is the first one.
+        ret = np.clip(ret + QuantileSketch._OFFSET, 1, (1 << self._BUCKET_BITS) - 1)
+        ret[~positive] = 0
+        return ret
+
+    def _value(self, bucket):
+        if bucket == 0:
+            return 0.0
+        index = bucket - QuantileSketch._OFFSET
+        return 2.0 * self.gamma ** index / (self.gamma + 1)
+
+    def update(self, codes, values):
+        codes = np.asarray(codes, dtype=np.int64)
+        keys = (codes << self._BUCKET_BITS) | self._buckets(values)
+        keys, counts = np.unique(keys, return_counts=True)
+        self._add(keys, counts)
+
+    def merge(self, other):
+        assert self.gamma == other.gamma
+        self._add(other.keys, other.counts)
+
+    def _add(self, keys, counts):
+        keys = np.concatenate([self.keys, keys])
+        counts = np.concatenate([self.counts, counts])
+        self.keys, inverse = np.unique(keys, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=counts).astype(np.int64)
+
+    def quantiles(self, code, qs):
+        """
+        Returns the `qs` quantiles of group `code` (NaNs if the group is empty).
+        """
+        lo = np.searchsorted(self.keys, code << self._BUCKET_BITS)
+        hi = np.searchsorted(self.keys, (code + 1) << self._BUCKET_BITS)
+        if lo == hi:
+            return [np.nan for _ in qs]
+
+        buckets = self.keys[lo:hi] & ((1 << self._BUCKET_BITS) - 1)
+        cumsum = np.cumsum(self.counts[lo:hi])
+
+        # Interpolated between the (estimated) values of the closest ranks,
+        # same as np.quantile.
+        ret = []
+        for rank in np.asarray(qs, dtype=np.float64) * (cumsum[-1] - 1):
+            below = min(np.floor(rank), cumsum[-1] - 1)
+            above = min(below + 1, cumsum[-1] - 1)
+            value_below, value_above = [
+                self._value(buckets[np.searchsorted(cumsum, _, side="right")])
+                for _ in [below, above]
+            ]
+            ret.append(
+                float(value_below + (rank - below) * (value_above - value_below))
+            )
+        return ret
+
+
+class KLLSketch:
+    """
+    Rank-error quantile sketch of a set of values (refer KLL, Karnin et al.).
+
+    The values are kept in compactors of increasing weight (2^level). A full
+    compactor is sorted and every other value is promoted to the next level, so
+    a quantile is estimated within about 1/k of its rank, and the estimates are
+    values of the set (i.e., they are not quantized, however close the values
+    are). Merging two sketches merges their compactors. The memory is about
+    3 * k values, not the number of values. The exact min and max are kept.
+    """
+
+    def __init__(self, k=200):
+        assert k >= 8
+        self.k = k
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+
+        # Values of each level, and the offset of its next compaction.
+        self.compactors = [np.empty(0)]
+        self.offsets = [0]
+
+    def _capacity(self, level):
+        depth = len(self.compactors) - level - 1
+        return max(2, int(np.ceil(self.k * (2.0 / 3.0) ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self.compactors[0] = np.concatenate([self.compactors[0], values])
+        self._compress()
+
+    def merge(self, other):
+        assert self.k == other.k
+        while len(self.compactors) < len(other.compactors):
+            self.compactors.append(np.empty(0))
+            self.offsets.append(0)
+        for level, values in enumerate(other.compactors):
+            self.compactors[level] = np.concatenate([self.compactors[level], values])
+
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _compress(self):
+        # Compact the lowest full compactor, until the sketch fits its capacity.
+        while sum(len(_) for _ in self.compactors) > sum(
+            self._capacity(_) for _ in range(len(self.compactors))
+        ):
+            level = next(
+                _
+                for _ in range(len(self.compactors))
+                if len(self.compactors[_]) >= self._capacity(_)
+            )
+            if level + 1 == len(self.compactors):
+                self.compactors.append(np.empty(0))
+                self.offsets.append(0)
+
+            # An odd value stays, the others are paired and one of each pair
+            # is promoted (alternately the smaller and the larger).
+            values = np.sort(self.compactors[level])
+            odd = len(values) % 2
+            offset = self.offsets[level]
+            self.offsets[level] = 1 - offset
+            self.compactors[level + 1] = np.concatenate(
+                [self.compactors[level + 1], values[odd + offset :: 2]]
+            )
+            self.compactors[level] = values[:odd]
+
+    def quantiles(self, qs):
+        """
+        Returns the `qs` quantiles (NaNs if the sketch is empty), interpolated
+        between the closest ranks, same as np.quantile. The extremes are exact.
+        """
+        if self.count == 0:
+            return [np.nan for _ in qs]
+
+        weights = np.concatenate(
+            [np.full(len(_), 1 << level) for level, _ in enumerate(self.compactors)]
+        )
+        values = np.concatenate(self.compactors)
+        order = np.argsort(values, kind="stable")
+        values, cumsum = values[order], np.cumsum(weights[order])
+
+        ret = []
+        for rank in np.asarray(qs, dtype=np.float64) * (self.count - 1):
+            below = min(np.floor(rank), self.count - 1)
+            above = min(below + 1, self.count - 1)
+            value_below, value_above = [
+                values[np.searchsorted(cumsum, _, side="right")] for _ in [below, above]
+            ]
+            ret.append(
+                float(value_below + (rank - below) * (value_above - value_below))
+            )
+
+        ret = np.clip(ret, self.min, self.max)
+        if qs[0] == 0:
+            ret[0] = self.min
+        if qs[-1] == 1:
+            ret[-1] = self.max
+        return ret.tolist()
+
+
+class Histogram:
+    """
+    Fixed-bin histogram of each group. The `bins` bins of group `idx` span
+    [lo[idx], hi[idx]], and the counts are the same as np.histogram's with that range.
+    """
+
+    def __init__(self, lo, hi, bins):
+        lo = np.asarray(lo, dtype=np.float64).copy()
+        hi = np.asarray(hi, dtype=np.float64).copy()
+
+        # Same as np.histogram, an empty range is extended by 0.5 on both sides.
+        empty = lo == hi
+        lo[empty] -= 0.5
+        hi[empty] += 0.5
+
+        self.lo, self.hi, self.bins = lo, hi, int(bins)
+        self.counts = np.zeros((len(lo), self.bins), dtype=np.int64)
+
+    def edges(self, codes, indices):
+        """
+        The `indices`-th bin edges of the groups `codes` (np.linspace's values).
+        """
+        step = (self.hi[codes] - self.lo[codes]) / self.bins
+        ret = indices * step + self.lo[codes]
+        return np.where(indices == self.bins, self.hi[codes], ret)
+
+    def update(self, codes, values):
+        codes = np.asarray(codes, dtype=np.int64)
+        values = np.asarray(values, dtype=np.float64)
+
+        # Values outside the range of the group are not counted.
+        keep = (values >= self.lo[codes]) & (values <= self.hi[codes])
+        codes, values = codes[keep], values[keep]
+
+        lo, hi = self.lo[codes], self.hi[codes]
+        indices = ((values - lo) / (hi - lo) * self.bins).astype(np.int64)
+        indices[indices == self.bins] -= 1
+
+        # Correct the round-off against the bin edges (same as np.histogram).
+        decrement = values < self.edges(codes, indices)
+        indices[decrement] -= 1
+        increment = (values >= self.edges(codes, indices + 1)) & (
+            indices != self.bins - 1
+        )
+        indices[increment] += 1
+
+        self.counts += np.bincount(
+            codes * self.bins + indices, minlength=self.counts.size
+        ).reshape(self.counts.shape)
+
+    def merge(self, other):
+        assert self.counts.shape == other.counts.shape
+        self.counts += other.counts
+
+    def centers(self, codes):
+        """
+        Bin centers of the group `codes` (or an array of them, one row per group).
+        """
+        indices = np.arange(self.bins + 1)
+        if np.ndim(codes) == 0:
+            edges = self.edges(codes, indices)
+            return 0.5 * (edges[1:] + edges[:-1])
+        edges = self.edges(np.asarray(codes)[:, None], indices[None, :])
+        return 0.5 * (edges[:, 1:] + edges[:, :-1])
+
+
+def histograms(codes, values, lo, hi, bins):
+    """
+    Histograms of the values of all groups in a single pass, i.e., the bin of
+    each value is computed and counted at once (refer Histogram).
+
+    Arguments:
+        codes (np.array): group of each value.
+        values (np.array): values.
+        lo, hi (np.array): range of each group.
+        bins (int): number of bins.
+
+    Returns:
+        centers, counts (np.array): bin centers and counts (a row per group).
+    """
+    hist = Histogram(lo, hi, bins)
+    hist.update(codes, values)
+    return hist.centers(np.arange(len(hist.lo))), hist.counts
+
+
+def histogram(values, lo, hi, bins):
+    """
+    Same as np.histogram with the range [lo, hi], returning the bin centers and counts.
+    """
+    centers, counts = histograms(
+        np.zeros(len(values), dtype=np.int64), values, [lo], [hi], bins
+    )
+    return centers[0], counts[0]
@@ -0,0 +1,93 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import threading
+from collections import OrderedDict
+
+# CallFlow imports
+import callflow
+
+LOGGER = callflow.get_logger(__name__)
+
+
+class LRUCache:
+    """
+    Bounded least recently used cache for the results of the client's requests.
+
+    The keys are versioned (refer `version`), so that the results computed
+    before the data is reloaded are never returned after it (refer `invalidate`).
+    """
+
+    def __init__(self, maxsize=64):
+        """
+        Arguments:
+            maxsize (int): maximum number of cached results. 0 disables the cache.
+        """
+        assert maxsize >= 0
+        self.maxsize = maxsize
+        self.version = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached result of `key`, or computes (and caches) it with `compute()`.
+        """
+        if self.maxsize == 0:
+            return compute()
+
+        with self._lock:
+            key = (self.version, key)
+            if key in self._entries:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            self.misses += 1
+
+        # Compute outside the lock, so that other requests are not blocked.
+        value = compute()
+
+        with self._lock:
+            # Drop the result if the data was reloaded while computing it.
+            if key[0] == self.version:
+                self._entries[key] = value
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def invalidate(self):
+        """
+        Drop all the cached results (e.g., the data is reloaded).
+        """
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+        LOGGER.debug(f"Request cache invalidated (version: {self.version}).")
+
+    def stats(self):
+        """
+        Returns the hit/miss metrics of the cache.
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "version": self.version,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests > 0 else 0.0,
+            }
@@ -5,19 +5,62 @@
 
 import os
 import json
+from concurrent.futures import ProcessPoolExecutor
 
 # ------------------------------------------------------------------------------
 # CallFlow imports
 import callflow
 from callflow import SuperGraph, EnsembleGraph
+from callflow.cache import LRUCache
+from callflow.datastructures.memory_budget import MemoryBudget
+from callflow.datastructures.auxiliary_store import AuxiliaryStore
+from callflow.datastructures.layout_store import LayoutStore
 from callflow.algorithms import DeltaConSimilarity, BlandAltman
+from callflow.operations import Manifest
 from callflow.layout import NodeLinkLayout, SankeyLayout, HierarchyLayout
 from callflow.modules import ParameterProjection, DiffView, MiniHistogram, FunctionList
 
 LOGGER = callflow.get_logger(__name__)
 
 
+def _process_single_run(config, dataset_name):
+    """
+    Process a single run of the ensemble and write it into the .callflow directory.
+    """
+    # Create an instance of dataset.
+    LOGGER.info("#########################################")
+    LOGGER.info(f"Dataset name: {dataset_name}")
+    LOGGER.info("#########################################")
+    supergraph = SuperGraph(config=config, tag=dataset_name, mode="process")
+
+    # Process each graphframe.
+    supergraph.process_gf()
+
+    supergraph.group_gf(group_by="module")
+
+    # Write the entire graphframe into .callflow.
+    supergraph.write_gf("entire")
+
+    # Single auxiliary processing.
+    supergraph.single_auxiliary(dataset=dataset_name, binCount=20, process=True)
+
+    return supergraph
+
+
+def _process_single_run_in_worker(config, dataset_name):
+    """
+    Worker entry point for _process_single_run.
+    Only the name is returned, the processed run is read back from the .callflow directory.
+    """
+    _process_single_run(config, dataset_name)
+    return dataset_name
+
+
 class CallFlow:
+
+    # Number of callsites in the client's default CCT view.
+    _DEFAULT_CCT_SIZE = 70
+
     def __init__(self, config: dict = None, data_dir: str = None):
         """
         Entry interface to access CallFlow's functionalities. "
@@ -35,6 +78,16 @@ class CallFlow:
         assert ndatasets > 0
         self.ensemble = ndatasets > 1
 
+        # Layouts computed for the client's requests (refer request_single and request_ensemble).
+        self.cache = LRUCache(maxsize=self.config["cache_size"])
+
+        # Layouts precomputed at process time (refer precompute_layouts).
+        self.layouts = LayoutStore(self.config["save_path"])
+
+        # Executor of the CPU-heavy requests (refer RequestExecutor), None to
+        # compute them on the request's thread.
+        self.executor = None
+
     # --------------------------------------------------------------------------
     # Processing methods.
     def _create_dot_callflow_folder(self):
@@ -61,7 +114,7 @@ class CallFlow:
                 LOGGER.info(f"Creating .callflow directory for dataset : {dataset}")
                 os.makedirs(dataset_dir)
 
-            files = ["df.csv", "nxg.json", "hatchet_tree.txt", "auxiliary_data.json"]
+            files = ["df.csv", "nxg.json", "hatchet_tree.txt", "auxiliary_data.bin"]
             for f in files:
                 fname = os.path.join(dataset_dir, f)
                 if not os.path.exists(fname):
@@ -84,6 +137,50 @@ class CallFlow:
         else:
             self._process_single(self.config["runs"][0])
 
+        if self.config.get("precompute_layouts", False):
+            self.precompute_layouts()
+
+    def precompute_layouts(self):
+        """
+        Compute the layouts of the default views of the runs (and the ensemble),
+        i.e., the supergraph, the CCT of the client's default size and the module
+        hierarchies, and write them into the .callflow directory (refer LayoutStore).
+        The layouts of the runs that were not re-processed are kept.
+        """
+        self.load()
+        LOGGER.info("Precomputing the layouts of the default views")
+        for operation in self._default_views():
+            if "dataset" in operation:
+                tag, key, compute = self._single_layout(operation)
+            else:
+                tag, key, compute = self._ensemble_layout(operation)
+            if not self.layouts.exists(tag, key):
+                self.layouts.write(tag, key, compute())
+
+    def _default_views(self):
+        """
+        Operations of the default views' requests (refer request_single and request_ensemble).
+        """
+        ret = []
+        for dataset in self.config["parameter_props"]["runs"]:
+            if dataset in self.supergraphs:
+                ret.append({"name": "supergraph", "dataset": dataset})
+                ret.append(
+                    {
+                        "name": "cct",
+                        "dataset": dataset,
+                        "functionsInCCT": CallFlow._DEFAULT_CCT_SIZE,
+                    }
+                )
+
+        if "ensemble" in self.supergraphs:
+            ret.append({"name": "supergraph"})
+            ret.append({"name": "cct", "functionsInCCT": CallFlow._DEFAULT_CCT_SIZE})
+            df = self.supergraphs["ensemble"].gf.df
+            for module in df["module"].unique().tolist():
+                ret.append({"name": "module_hierarchy", "module": module})
+        return ret
+
     def load(self):
         """
         Load the processed datasets by the format.
@@ -91,6 +188,10 @@ class CallFlow:
         ndatasets = len(self.config["runs"])
         self.config["parameter_props"] = self._parameter_props(self.config)
 
+        # Budget (in MB) for the dataframes read in lazy mode.
+        budget_in_bytes = int(self.config["memory_budget"] * 1024 * 1024)
+        self.budget = MemoryBudget(limit=budget_in_bytes)
+
         if self.ensemble:
             self.supergraphs = self._read_ensemble()
             # assertion here is 1 less than self.supergraph.keys, becasuse
@@ -104,12 +205,20 @@ class CallFlow:
         # Config is later return to client app on "init" request.
         self.config["runtime_props"] = self._runtime_props(self.supergraphs)
 
+        # The layouts of the previously loaded data are stale.
+        self.cache.invalidate()
+
     def _process_single(self, dataset):
         """
         Single dataset processing.
         """
         dataset_tag = dataset["name"]
 
+        manifest = Manifest(self.config)
+        if not manifest.is_changed(dataset_tag):
+            LOGGER.info(f"{dataset_tag} is unchanged since the last processing.")
+            return
+
         LOGGER.info("#########################################")
         LOGGER.info(f"Single Mode: {dataset_tag}")
         LOGGER.info("#########################################")
@@ -127,38 +236,48 @@ class CallFlow:
         # Store the graphframe.
         supergraph.write_gf("entire")
 
-        supergraph.single_auxiliary(dataset=dataset, binCount=20, process=True)
+        supergraph.single_auxiliary(dataset=dataset_tag, binCount=20, process=True)
+
+        manifest.add_run(dataset_tag)
+        manifest.write()
 
     def _process_ensemble(self, datasets):
         """
         Ensemble processing of datasets.
         """
-        # Before we process the ensemble, we perform single processing on all datasets.
-        single_supergraphs = {}
-        for dataset in datasets:
-            dataset_name = dataset["name"]
-            # Create an instance of dataset.
-            LOGGER.info("#########################################")
-            LOGGER.info(f"Dataset name: {dataset_name}")
-            LOGGER.info("#########################################")
-            single_supergraphs[dataset_name] = SuperGraph(
-                config=self.config, tag=dataset_name, mode="process"
-            )
-
-            # Process each graphframe.
-            single_supergraphs[dataset_name].process_gf()
-
-            single_supergraphs[dataset_name].group_gf(group_by="module")
-
-            # Write the entire graphframe into .callflow.
-            single_supergraphs[dataset_name].write_gf("entire")
+        dataset_names = [dataset["name"] for dataset in datasets]
+
+        # The manifest records the runs processed into the .callflow directory.
+        manifest = Manifest(self.config)
+        if manifest.is_ensemble_unchanged(dataset_names):
+            LOGGER.info("Ensemble is unchanged since the last processing.")
+            return
+
+        # Before we process the ensemble, we perform single processing on the
+        # new (or changed) datasets.
+        changed_names = [_ for _ in dataset_names if manifest.is_changed(_)]
+        LOGGER.info(
+            f"Processing {len(changed_names)} runs "
+            f"({len(dataset_names) - len(changed_names)} unchanged runs are reused)"
+        )
+        if self.config["workers"] > 1 and len(changed_names) > 1:
+            processed = self._process_single_runs_parallel(changed_names)
+        else:
+            processed = {}
+            for dataset_name in changed_names:
+                processed[dataset_name] = _process_single_run(self.config, dataset_name)
 
-            # Single auxiliary processing.
-            single_supergraphs[dataset_name].single_auxiliary(
-                dataset=dataset_name,
-                binCount=20,
-                process=True,
-            )
+        # The unchanged datasets are read from the .callflow directory.
+        single_supergraphs = {}
+        for dataset_name in dataset_names:
+            if dataset_name in processed:
+                single_supergraphs[dataset_name] = processed[dataset_name]
+            else:
+                single_supergraphs[dataset_name] = self._read_processed_run(
+                    dataset_name
+                )
+        for dataset_name in changed_names:
+            manifest.add_run(dataset_name)
 
         # Create a supergraph class for ensemble case.
         ensemble_supergraph = EnsembleGraph(
@@ -174,8 +293,24 @@ class CallFlow:
         # Write the grouped graphframe.
         ensemble_supergraph.write_gf("group")
 
+        # The chunked auxiliary processing reads the written dataframe, so the
+        # dataframes of the runs and the ensemble are dropped before it (i.e.,
+        # it bounds the memory of the auxiliary stage, not of the stages above).
+        if self.config["chunk_size"] > 0:
+            processed.clear()
+            single_supergraphs.clear()
+            ensemble_supergraph.gf.df = None
+
+        # Auxiliary data of the previous processing is reused for the
+        # callsites and modules whose data did not change.
+        previous = manifest.ensemble_fingerprints()
+        if previous is not None:
+            previous["data"] = SuperGraph.read_auxiliary_store(
+                ensemble_supergraph.dirname
+            )
+
         # Ensemble auxiliary processing.
-        ensemble_supergraph.ensemble_auxiliary(
+        auxiliary = ensemble_supergraph.ensemble_auxiliary(
             # MPIBinCount=self.currentMPIBinCount,
             # RunBinCount=self.currentRunBinCount,
             datasets=self.config["parameter_props"]["runs"],
@@ -183,7 +318,48 @@ class CallFlow:
             RunBinCount=20,
             process=True,
             write=True,
+            previous=previous,
         )
+        if previous is not None:
+            previous["data"].close()
+
+        manifest.set_ensemble(dataset_names, auxiliary.fingerprints)
+        manifest.write()
+
+    def _process_single_runs_parallel(self, dataset_names):
+        """
+        Process the single runs concurrently using a pool of `config["workers"]` processes.
+        Each worker writes its run into the .callflow directory, and the written
+        files are read back for the ensemble processing.
+        """
+        workers = min(self.config["workers"], len(dataset_names))
+        LOGGER.info(f"Processing {len(dataset_names)} runs using {workers} workers")
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_process_single_run_in_worker, self.config, name)
+                for name in dataset_names
+            ]
+            for future in futures:
+                LOGGER.info(f"Processed run: {future.result()}")
+
+        single_supergraphs = {}
+        for dataset_name in dataset_names:
+            single_supergraphs[dataset_name] = self._read_processed_run(dataset_name)
+
+        return single_supergraphs
+
+    def _read_processed_run(self, dataset_name):
+        """
+        Read a single run processed into the .callflow directory, for the ensemble processing.
+        """
+        supergraph = SuperGraph(config=self.config, tag=dataset_name, mode="render")
+
+        # Drop the index columns added while writing and reading the dataframe.
+        supergraph.gf.df = supergraph.gf.df.drop(
+            columns=["Unnamed: 0", "index", "level_0"], errors="ignore"
+        )
+        return supergraph
 
     def _read_single(self):
         """
@@ -193,7 +369,7 @@ class CallFlow:
         # Only consider the first dataset from the listing.
         dataset_name = self.config["parameter_props"]["runs"][0]
         supergraphs[dataset_name] = SuperGraph(
-            config=self.config, tag=dataset_name, mode="render"
+            config=self.config, tag=dataset_name, mode="render", budget=self.budget
         )
 
         return supergraphs
@@ -206,11 +382,11 @@ class CallFlow:
 
         for dataset_name in self.config["parameter_props"]["runs"]:
             supergraphs[dataset_name] = SuperGraph(
-                config=self.config, tag=dataset_name, mode="render"
+                config=self.config, tag=dataset_name, mode="render", budget=self.budget
             )
 
         supergraphs["ensemble"] = EnsembleGraph(
-            config=self.config, tag="ensemble", mode="render"
+            config=self.config, tag="ensemble", mode="render", budget=self.budget
         )
         return supergraphs
 
@@ -234,11 +410,12 @@ class CallFlow:
         minExcTime = 0
         maxNumOfRanks = 0
         for idx, tag in enumerate(supergraphs):
-            props["maxIncTime"][tag] = supergraphs[tag].gf.df["time (inc)"].max()
-            props["maxExcTime"][tag] = supergraphs[tag].gf.df["time"].max()
-            props["minIncTime"][tag] = supergraphs[tag].gf.df["time (inc)"].min()
-            props["minExcTime"][tag] = supergraphs[tag].gf.df["time"].min()
-            props["numOfRanks"][tag] = len(supergraphs[tag].gf.df["rank"].unique())
+            df = supergraphs[tag].gf.select(["time (inc)", "time", "rank"])
+            props["maxIncTime"][tag] = df["time (inc)"].max()
+            props["maxExcTime"][tag] = df["time"].max()
+            props["minIncTime"][tag] = df["time (inc)"].min()
+            props["minExcTime"][tag] = df["time"].min()
+            props["numOfRanks"][tag] = len(df["rank"].unique())
             maxExcTime = max(props["maxExcTime"][tag], maxExcTime)
             maxIncTime = max(props["maxIncTime"][tag], maxIncTime)
             minExcTime = min(props["minExcTime"][tag], minExcTime)
@@ -286,8 +463,140 @@ class CallFlow:
 
         elif operation_name == "supergraph_data":
             if len(operation["datasets"]) > 1:
-                return self.supergraphs["ensemble"].auxiliary_data
-            return self.supergraphs[operation["datasets"][0]].auxiliary_data
+                supergraph = self.supergraphs["ensemble"]
+            else:
+                supergraph = self.supergraphs[operation["datasets"][0]]
+
+            # Without a slice, the whole auxiliary data is returned.
+            _SLICES = ["module", "callsites", "page", "page_size"]
+            if not any(_ in operation for _ in _SLICES):
+                return supergraph.auxiliary_data
+
+            return supergraph.auxiliary_store.query(
+                operation["datasets"],
+                module=operation.get("module"),
+                callsites=operation.get("callsites"),
+                metric=operation.get("metric", operation.get("sortBy", "time (inc)")),
+                page=int(operation.get("page", 0)),
+                page_size=int(operation.get("page_size", AuxiliaryStore._PAGE_SIZE)),
+            )
+
+    def _layout(self, tag, key, compute):
+        """
+        Returns the layout of `key` from the cache, the precomputed layouts
+        (refer precompute_layouts), or computes it with `compute()`.
+        """
+
+        def read_or_compute():
+            nxg = self.layouts.read(tag, key)
+            if nxg is None:
+                nxg = compute()
+            return nxg
+
+        return self.cache.get_or_compute(key, read_or_compute)
+
+    def _offloaded(self, method, operation, compute):
+        """
+        Returns `compute`, or the computation of `self.<method>(operation)` by
+        the executor's workers (refer RequestExecutor).
+        """
+        if self.executor is None:
+            return compute
+        return lambda: self.executor.run(method, operation)
+
+    def _single_layout(self, operation):
+        """
+        Returns the tag, the key and the computation of a Single CallFlow layout.
+        """
+        operation_name = operation["name"]
+        dataset = operation["dataset"]
+
+        if operation_name == "supergraph":
+            reveal_callsites = operation.get("reveal_callsites", [])
+            split_entry_module = operation.get("split_entry_module", "")
+            split_callee_module = operation.get("split_callee_module", "")
+
+            key = (
+                "single",
+                operation_name,
+                dataset,
+                tuple(reveal_callsites),
+                split_entry_module,
+                split_callee_module,
+            )
+            return (
+                dataset,
+                key,
+                lambda: SankeyLayout(
+                    supergraph=self.supergraphs[dataset],
+                    path="group_path",
+                    reveal_callsites=reveal_callsites,
+                    split_entry_module=split_entry_module,
+                    split_callee_module=split_callee_module,
+                ).nxg,
+            )
+
+        elif operation_name == "cct":
+            key = ("single", operation_name, dataset, operation["functionsInCCT"])
+            return (
+                dataset,
+                key,
+                lambda: NodeLinkLayout(
+                    supergraph=self.supergraphs[dataset],
+                    callsite_count=operation["functionsInCCT"],
+                ).nxg,
+            )
+
+    def _ensemble_layout(self, operation):
+        """
+        Returns the tag, the key and the computation of an Ensemble CallFlow layout.
+        """
+        operation_name = operation["name"]
+
+        if operation_name == "cct":
+            key = ("ensemble", operation_name, operation["functionsInCCT"])
+            return (
+                "ensemble",
+                key,
+                lambda: NodeLinkLayout(
+                    supergraph=self.supergraphs["ensemble"],
+                    callsite_count=operation["functionsInCCT"],
+                ).nxg,
+            )
+
+        elif operation_name == "supergraph":
+            reveal_callsites = operation.get("reveal_callsites", [])
+            split_entry_module = operation.get("split_entry_module", "")
+            split_callee_module = operation.get("split_callee_module", "")
+
+            key = (
+                "ensemble",
+                operation_name,
+                tuple(reveal_callsites),
+                split_entry_module,
+                split_callee_module,
+            )
+            return (
+                "ensemble",
+                key,
+                lambda: SankeyLayout(
+                    supergraph=self.supergraphs["ensemble"],
+                    path="group_path",
+                    reveal_callsites=reveal_callsites,
+                    split_entry_module=split_entry_module,
+                    split_callee_module=split_callee_module,
+                ).nxg,
+            )
+
+        elif operation_name == "module_hierarchy":
+            key = ("ensemble", operation_name, operation["module"])
+            return (
+                "ensemble",
+                key,
+                lambda: HierarchyLayout(
+                    self.supergraphs["ensemble"], operation["module"]
+                ).nxg,
+            )
 
     def request_single(self, operation):
         """
@@ -305,37 +614,10 @@ class CallFlow:
 
         LOGGER.info(f"[Single Mode] {operation}")
 
-        if operation_name == "supergraph":
-            if "reveal_callsites" in operation:
-                reveal_callsites = operation["reveal_callsites"]
-            else:
-                reveal_callsites = []
-
-            if "split_entry_module" in operation:
-                split_entry_module = operation["split_entry_module"]
-            else:
-                split_entry_module = ""
-
-            if "split_callee_module" in operation:
-                split_callee_module = operation["split_callee_module"]
-            else:
-                split_callee_module = ""
-
-            single_supergraph = SankeyLayout(
-                supergraph=self.supergraphs[operation["dataset"]],
-                path="group_path",
-                reveal_callsites=reveal_callsites,
-                split_entry_module=split_entry_module,
-                split_callee_module=split_callee_module,
-            )
-            return single_supergraph.nxg
-
-        elif operation_name == "cct":
-            result = NodeLinkLayout(
-                supergraph=self.supergraphs[operation["dataset"]],
-                callsite_count=operation["functionsInCCT"],
-            )
-            return result.nxg
+        if operation_name in ["supergraph", "cct"]:
+            tag, key, compute = self._single_layout(operation)
+            compute = self._offloaded("request_single", operation, compute)
+            return self._layout(tag, key, compute)
 
         elif operation_name == "function":
             functionlist = FunctionList(
@@ -362,43 +644,13 @@ class CallFlow:
         if operation_name == "init":
             return self.config
 
-        elif operation_name == "cct":
-            result = NodeLinkLayout(
-                supergraph=self.supergraphs["ensemble"],
-                callsite_count=operation["functionsInCCT"],
-            )
-            return result.nxg
-
-        elif operation_name == "supergraph":
-            if "reveal_callsites" in operation:
-                reveal_callsites = operation["reveal_callsites"]
-            else:
-                reveal_callsites = []
+        elif operation_name in ["cct", "supergraph", "module_hierarchy"]:
+            tag, key, compute = self._ensemble_layout(operation)
+            compute = self._offloaded("request_ensemble", operation, compute)
+            return self._layout(tag, key, compute)
 
-            if "split_entry_module" in operation:
-                split_entry_module = operation["split_entry_module"]
-            else:
-                split_entry_module = ""
-
-            if "split_callee_module" in operation:
-                split_callee_module = operation["split_callee_module"]
-            else:
-                split_callee_module = ""
-
-            ensemble_super_graph = SankeyLayout(
-                supergraph=self.supergraphs["ensemble"],
-                path="group_path",
-                reveal_callsites=reveal_callsites,
-                split_entry_module=split_entry_module,
-                split_callee_module=split_callee_module,
-            )
-            return ensemble_super_graph.nxg
-
-        elif operation_name == "module_hierarchy":
-            modulehierarchy = HierarchyLayout(
-                self.supergraphs["ensemble"], operation["module"]
-            )
-            return modulehierarchy.nxg
+        elif operation_name in ["projection", "compare"] and self.executor is not None:
+            return self.executor.run("request_ensemble", operation)
 
         elif operation_name == "projection":
             projection = ParameterProjection(
@@ -0,0 +1,253 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import json
+import mmap
+import zlib
+import struct
+
+# CallFlow imports
+import callflow
+
+LOGGER = callflow.get_logger(__name__)
+
+
+class AuxiliaryStore:
+    """
+    Binary, indexed store of the auxiliary data (refer EnsembleAuxiliary).
+
+    The entry of each callsite (or module) of each dataset is a separate record,
+    i.e., a zlib-compressed JSON document, and the index maps
+    (kind, dataset, name) to the offset and size of its record, and its mean
+    runtimes (to rank the records without reading them). The other
+    (small) items of the auxiliary data (e.g., "moduleCallsiteMap") are stored
+    in the index. So, opening a store reads only the index, and the records are
+    read (from the memory-mapped file) when they are requested.
+
+    Layout: magic, records, index (zlib-compressed JSON), and the footer with
+    the offset and size of the index.
+    """
+
+    _FILENAME = "auxiliary_data.bin"
+
+    # Legacy (JSON) auxiliary data, converted to a store when it is opened.
+    _JSON_FILENAME = "auxiliary_data.json"
+
+    _MAGIC = b"CFAUX\x01"
+    _FOOTER = struct.Struct("<QQ")
+
+    # Kinds of the records, i.e., {kind: {dataset: {name: entry}}}.
+    _KINDS = ["callsite", "module"]
+
+    _LEVEL = 1
+
+    # Metrics the records are ranked by, i.e., the mean runtimes.
+    _METRICS = ["time (inc)", "time"]
+
+    # Number of callsites in a page of a query.
+    _PAGE_SIZE = 50
+
+    def __init__(self, path):
+        """
+        Arguments:
+            path (str): directory of the store.
+        """
+        self.fname = os.path.join(path, AuxiliaryStore._FILENAME)
+        LOGGER.info(f"[Read] {self.fname}")
+
+        self._fptr = open(self.fname, "rb")
+        self._mmap = mmap.mmap(self._fptr.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic = AuxiliaryStore._MAGIC
+        footer = AuxiliaryStore._FOOTER
+        if self._mmap[: len(magic)] != magic:
+            raise Exception(f"{self.fname} is not an auxiliary store.")
+
+        offset, size = footer.unpack(self._mmap[-footer.size :])
+        index = json.loads(zlib.decompress(self._mmap[offset : offset + size]))
+        self.index = index["records"]
+        self.items = index["items"]
+
+    def close(self):
+        self._mmap.close()
+        self._fptr.close()
+
+    @staticmethod
+    def exists(path):
+        # .callflow directory is created with empty placeholder files.
+        fname = os.path.join(path, AuxiliaryStore._FILENAME)
+        return os.path.isfile(fname) and os.path.getsize(fname) > 0
+
+    @staticmethod
+    def open(path):
+        """
+        Open the store of the `path` directory. Legacy auxiliary_data.json is
+        converted into a store first.
+        """
+        json_fname = os.path.join(path, AuxiliaryStore._JSON_FILENAME)
+        if not AuxiliaryStore.exists(path) and os.path.isfile(json_fname):
+            LOGGER.info(f"Converting {json_fname} into an auxiliary store")
+            with open(json_fname, "r") as fptr:
+                AuxiliaryStore.write(path, json.load(fptr))
+        return AuxiliaryStore(path)
+
+    @staticmethod
+    def write(path, data):
+        """
+        Write the auxiliary data `data` into the store of the `path` directory.
+        The file is replaced atomically, so the open stores keep reading the
+        previous file.
+        """
+        fname = os.path.join(path, AuxiliaryStore._FILENAME)
+        LOGGER.info(f"[Write] {fname}")
+
+        records = {}
+        items = {k: v for k, v in data.items() if k not in AuxiliaryStore._KINDS}
+        tmp_fname = fname + ".tmp"
+        with open(tmp_fname, "wb") as fptr:
+            fptr.write(AuxiliaryStore._MAGIC)
+            offset = len(AuxiliaryStore._MAGIC)
+            for kind in AuxiliaryStore._KINDS:
+                records[kind] = {}
+                for dataset, entries in data.get(kind, {}).items():
+                    records[kind][dataset] = {}
+                    for name, entry in entries.items():
+                        record = zlib.compress(
+                            json.dumps(entry).encode("utf-8"), AuxiliaryStore._LEVEL
+                        )
+                        fptr.write(record)
+                        records[kind][dataset][name] = [
+                            offset,
+                            len(record),
+                            AuxiliaryStore._means(entry),
+                        ]
+                        offset += len(record)
+
+            index = zlib.compress(
+                json.dumps({"records": records, "items": items}).encode("utf-8")
+            )
+            fptr.write(index)
+            fptr.write(AuxiliaryStore._FOOTER.pack(offset, len(index)))
+        os.replace(tmp_fname, fname)
+
+    @staticmethod
+    def _means(entry):
+        """
+        Mean runtimes of the entry, of either the ensemble (refer
+        EnsembleAuxiliary) or the single (refer SingleAuxiliary) form.
+        """
+        if "Inclusive" in entry:
+            return [entry["Inclusive"]["mean_time"], entry["Exclusive"]["mean_time"]]
+        return [entry.get("mean_" + _, 0) for _ in AuxiliaryStore._METRICS]
+
+    # --------------------------------------------------------------------------
+    def datasets(self, kind):
+        return list(self.index[kind])
+
+    def names(self, kind, dataset):
+        """
+        Names of the callsites (or modules) of the dataset, in the written order.
+        """
+        return list(self.index[kind].get(dataset, {}))
+
+    def get(self, kind, dataset, name, default=None):
+        """
+        Returns the entry of the callsite (or module) `name` of the dataset.
+        """
+        location = self.index[kind].get(dataset, {}).get(name)
+        if location is None:
+            return default
+        offset, size = location[:2]
+        return json.loads(zlib.decompress(self._mmap[offset : offset + size]))
+
+    def get_many(self, kind, dataset, names):
+        """
+        Returns {name: entry} of the `names` in the dataset (the missing names are skipped).
+        """
+        ret = {}
+        for name in names:
+            entry = self.get(kind, dataset, name)
+            if entry is not None:
+                ret[name] = entry
+        return ret
+
+    def to_dict(self):
+        """
+        Returns the whole auxiliary data (same as the written `data`).
+        """
+        ret = {}
+        for kind in AuxiliaryStore._KINDS:
+            ret[kind] = {
+                dataset: self.get_many(kind, dataset, self.names(kind, dataset))
+                for dataset in self.datasets(kind)
+            }
+        ret.update(self.items)
+        return ret
+
+    def top(self, kind, dataset, metric="time (inc)", names=None):
+        """
+        Names of the callsites (or modules) of the dataset (or only the `names`),
+        sorted by their mean `metric` in the descending order.
+        """
+        assert metric in AuxiliaryStore._METRICS
+        column = AuxiliaryStore._METRICS.index(metric)
+        index = self.index[kind].get(dataset, {})
+        if names is None:
+            names = list(index)
+        names = [_ for _ in names if _ in index]
+        return sorted(names, key=lambda _: index[_][2][column], reverse=True)
+
+    def query(
+        self,
+        datasets,
+        module=None,
+        callsites=None,
+        metric="time (inc)",
+        page=0,
+        page_size=_PAGE_SIZE,
+    ):
+        """
+        Returns a page of the auxiliary data, in the same form as the whole data.
+
+        The callsites (all, the callsites of the `module`, or the `callsites`)
+        are ranked by their mean `metric` in the ensemble (or the first dataset),
+        and the entries of the `page`-th `page_size` callsites are returned for
+        each of the datasets. The modules' entries are returned for the `module`
+        (or all modules), and "page" reports the total number of callsites.
+        """
+        kinds = {
+            kind: [_ for _ in ["ensemble"] + datasets if _ in self.index[kind]]
+            for kind in AuxiliaryStore._KINDS
+        }
+        reference = kinds["callsite"][0] if len(kinds["callsite"]) > 0 else None
+
+        module_callsite_map = self.items.get("moduleCallsiteMap", {})
+        if module is not None and callsites is None:
+            callsites = module_callsite_map.get("ensemble", {}).get(module, [])
+        ranked = self.top("callsite", reference, metric, callsites)
+        selected = ranked[page * page_size : (page + 1) * page_size]
+
+        modules = None if module is None else [module]
+        ret = {
+            "callsite": {
+                dataset: self.get_many("callsite", dataset, selected)
+                for dataset in kinds["callsite"]
+            },
+            "module": {
+                dataset: self.get_many(
+                    "module", dataset, modules or self.names("module", dataset)
+                )
+                for dataset in kinds["module"]
+            },
+            "page": {
+                "page": page,
+                "page_size": page_size,
+                "metric": metric,
+                "total": len(ranked),
+            },
+        }
+        ret.update(self.items)
+        return ret
@@ -0,0 +1,323 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import numpy as np
+import pandas as pd
+import hatchet as ht
+from hatchet.node import Node
+from hatchet.frame import Frame
+from hatchet.graph import Graph
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# CallFlow imports
+import callflow
+
+LOGGER = callflow.get_logger(__name__)
+
+
+class _GrowableArray:
+    """
+    float64 array with amortized appends, i.e., its capacity grows by half
+    when it is full, instead of keeping the appended chunks.
+    """
+
+    def __init__(self, capacity=1 << 10):
+        self.data = np.empty(capacity, dtype=np.float64)
+        self.size = 0
+
+    def extend(self, values):
+        size = self.size + len(values)
+        if size > len(self.data):
+            data = np.empty(max(size, len(self.data) * 3 // 2), dtype=np.float64)
+            data[: self.size] = self.data[: self.size]
+            self.data = data
+        self.data[self.size : size] = values
+        self.size = size
+
+    def values(self):
+        return self.data[: self.size]
+
+
+class CaliperJSONReader:
+    """
+    Streaming reader of Caliper's json-split profiles (i.e., "caliper_json" format).
+
+    hatchet's reader loads the whole JSON document (and a python list for each
+    record) before building the dataframe. This reader parses the document
+    incrementally (using ijson), and appends the records of the "data" section,
+    a chunk of `chunk_size` rows at a time, to a float64 array of each column.
+    The records outside the hierarchy are dropped from each chunk (once the
+    columns are parsed). So, the parsed records take a float64 value per field
+    (not a python object), and each column of the dataframe is built from its
+    array, which is then released. The attribute columns (e.g., module) are
+    categoricals of the node labels, instead of a python object per row.
+    Building the dataframe (and hatchet's sorted (node, rank) index) still
+    takes memory proportional to the records.
+
+    The resulting graphframe has the same rows and values as hatchet's
+    `GraphFrame.from_caliper_json`, which is used if ijson is not installed.
+    """
+
+    # Hierarchy columns (in the order of preference), and their node types.
+    _PATH_COLUMNS = [
+        ("source.function#callpath.address", "function"),
+        ("path", "region"),
+    ]
+
+    # Renamed columns (consistent with the other hatchet readers).
+    _RENAMES = {
+        "mpi.rank": "rank",
+        "module#cali.sampler.pc": "module",
+        "sum#time.duration": "time",
+        "sum#avg#sum#time.duration": "time",
+        "inclusive#sum#time.duration": "time (inc)",
+        "sum#avg#inclusive#sum#time.duration": "time (inc)",
+    }
+
+    def __init__(self, fname, chunk_size=1 << 16):
+        self.fname = fname
+        self.chunk_size = chunk_size
+
+        # Sections of the document.
+        self.columns = None
+        self.column_metadata = None
+        self.nodes = None
+
+        # Parsed records, a buffer for each column (refer _add_chunk).
+        self.buffers = None
+
+    @staticmethod
+    def is_available():
+        return ijson is not None
+
+    def read(self):
+        """
+        Returns the hatchet graphframe of the profile.
+        """
+        if not CaliperJSONReader.is_available():
+            LOGGER.warning("ijson is not installed, reading the whole caliper json.")
+            return ht.GraphFrame.from_caliper_json(self.fname)
+
+        self.parse()
+        graph, path_nodes = self.create_graph()
+        dataframe, exc_metrics, inc_metrics = self.create_dataframe(path_nodes)
+        return ht.GraphFrame(graph, dataframe, exc_metrics, inc_metrics)
+
+    # --------------------------------------------------------------------------
+    def parse(self):
+        """
+        Parse the document in a single pass.
+        The sections may be in any order, so the records parsed before the
+        columns are known are filtered later (refer create_dataframe).
+        """
+        sections = {}
+        rows, row = [], None
+        builder = None
+        with open(self.fname, "rb") as fptr:
+            for prefix, event, value in ijson.parse(fptr, use_float=True):
+                if prefix == "data.item.item":
+                    row.append(value)
+                elif prefix == "data.item":
+                    if event == "start_array":
+                        row = []
+                    else:
+                        rows.append(row)
+                        if len(rows) == self.chunk_size:
+                            self._add_chunk(rows)
+                            rows = []
+
+                # Other sections (columns, column_metadata, nodes) are small.
+                elif prefix == "" and event == "map_key":
+                    key = value
+                    builder = None if key == "data" else ijson.ObjectBuilder()
+                elif builder is not None:
+                    builder.event(event, value)
+                    # The section ends at its closing (or scalar) event.
+                    if prefix == key and event not in ["start_map", "start_array"]:
+                        sections[key] = builder.value
+                        builder = None
+                        # The records of the following chunks are filtered.
+                        if key == "columns":
+                            self.columns = list(sections["columns"])
+        self._add_chunk(rows)
+
+        self.columns = list(sections["columns"])
+        self.column_metadata = sections["column_metadata"]
+        self.nodes = sections["nodes"]
+
+    def _add_chunk(self, rows):
+        if len(rows) == 0:
+            return
+
+        # null values (e.g., records outside the hierarchy) are NaNs.
+        chunk = np.array(rows, dtype=np.float64)
+        if self.buffers is None:
+            self.buffers = [_GrowableArray() for _ in range(chunk.shape[1])]
+
+        # Records outside the hierarchy are dropped.
+        path_idx = self._path_index(chunk.shape[1])
+        if path_idx is not None:
+            chunk = chunk[~np.isnan(chunk[:, path_idx])]
+
+        for buffer, values in zip(self.buffers, chunk.T):
+            buffer.extend(values)
+
+    def _path_index(self, ncols):
+        """
+        Returns the index of the hierarchy column in the records of `ncols`
+        values (None, if it is not known yet).
+        """
+        if self.columns is None:
+            return None
+        for column, _ in CaliperJSONReader._PATH_COLUMNS:
+            if column in self.columns:
+                return self.columns.index(column)
+        if ncols == len(self.columns) + 1:
+            return len(self.columns)
+        return None
+
+    # --------------------------------------------------------------------------
+    def path_column(self):
+        """
+        Returns the hierarchy column and its node type.
+        """
+        for column, node_type in CaliperJSONReader._PATH_COLUMNS:
+            if column in self.columns:
+                return column, node_type
+
+        # Older Caliper versions do not list the hierarchy column, it is
+        # the trailing value of the records (e.g., data/caliper-lulesh-json).
+        ncols = len(self.buffers) if self.buffers is not None else 0
+        if ncols == len(self.columns) + 1:
+            self.columns.append("path")
+            self.column_metadata.append({"is_value": False})
+            return "path", "region"
+        raise Exception(f"No hierarchy column in {self.fname}")
+
+    def create_graph(self):
+        """
+        Returns the graph, and the hatchet node of each hierarchy node ID.
+        """
+        path_col, node_type = self.path_column()
+
+        roots = []
+        path_nodes = {}
+        for idx, node in enumerate(self.nodes):
+            if node["column"] != path_col:
+                continue
+            frame = Frame({"type": node_type, "name": node["label"]})
+            if "parent" not in node:
+                hnode = Node(frame, None)
+                roots.append(hnode)
+            else:
+                parent = path_nodes[node["parent"]]
+                hnode = Node(frame, parent)
+                parent.add_child(hnode)
+            path_nodes[idx] = hnode
+
+        graph = Graph(roots)
+        graph.enumerate_traverse()
+        return graph, path_nodes
+
+    def create_dataframe(self, path_nodes):
+        """
+        Returns the dataframe (indexed by node and rank) and the metric columns.
+        Each node has a record for each rank, i.e., the missing records are zeros.
+        """
+        path_col, _ = self.path_column()
+        ncols = len(self.columns)
+        buffers = self.buffers
+        if buffers is None:
+            buffers = [_GrowableArray(0) for _ in range(ncols)]
+        self.buffers = None
+        path_idx = self.columns.index(path_col)
+
+        # Records parsed before the columns are filtered here, a column at a time.
+        keep = ~np.isnan(buffers[path_idx].values())
+        if not keep.all():
+            for buffer in buffers:
+                values = buffer.values()[keep]
+                buffer.data, buffer.size = values, len(values)
+        nids = buffers[path_idx].values().astype(np.int64)
+
+        columns = [CaliperJSONReader._RENAMES.get(_, _) for _ in self.columns]
+        is_value = [_["is_value"] for _ in self.column_metadata]
+        has_rank = "rank" in columns
+
+        # Add the missing (node, rank) records.
+        node_ids = np.fromiter(path_nodes.keys(), dtype=np.int64)
+        if has_rank:
+            ranks = buffers[columns.index("rank")].values().astype(np.int64)
+            nranks = ranks.max() + 1 if len(ranks) > 0 else 1
+            all_nids = np.repeat(node_ids, nranks)
+            all_ranks = np.tile(np.arange(nranks), len(node_ids))
+        else:
+            ranks = np.zeros(len(nids), dtype=np.int64)
+            nranks = 1
+            all_nids, all_ranks = node_ids, np.zeros(len(node_ids), dtype=np.int64)
+
+        missing = ~np.isin(all_nids * nranks + all_ranks, nids * nranks + ranks)
+        missing_nids, missing_ranks = all_nids[missing], all_ranks[missing]
+        nmissing = len(missing_nids)
+        del all_nids, all_ranks, missing
+
+        # Each column is built (and its buffer released) in turn.
+        df = {}
+        for idx, column in enumerate(columns):
+            if idx == path_idx:
+                continue
+            if column == "rank":
+                values = np.concatenate([ranks, missing_ranks])
+            elif is_value[idx]:
+                values = np.concatenate([buffers[idx].values(), np.zeros(nmissing)])
+            else:
+                # Other attributes refer to the labels of the nodes section.
+                values = self._labels(buffers[idx].values(), nmissing)
+            buffers[idx] = None
+            df[column] = values
+
+        nids = np.concatenate([nids, missing_nids])
+        df["nid"] = nids
+        df["name"] = self._labels(nids, 0)
+
+        hnodes = np.empty(len(self.nodes), dtype=object)
+        for nid, hnode in path_nodes.items():
+            hnodes[nid] = hnode
+        df["node"] = hnodes[nids]
+
+        indices = ["node"] + (["rank"] if has_rank else [])
+        dataframe = pd.DataFrame(df)
+        del df
+        dataframe = dataframe.set_index(indices).sort_index()
+
+        metrics = [
+            column
+            for idx, column in enumerate(columns)
+            if is_value[idx] and column != "rank" and idx != path_idx
+        ]
+        exc_metrics = [_ for _ in metrics if "(inc)" not in _]
+        inc_metrics = [_ for _ in metrics if "(inc)" in _]
+        return dataframe, exc_metrics, inc_metrics
+
+    def _labels(self, indices, nmissing):
+        """
+        Returns the categorical of the labels of the nodes `indices` (NaN for
+        none), followed by `nmissing` missing values.
+        """
+        indices = np.asarray(indices, dtype=np.float64)
+        valid = ~np.isnan(indices)
+        nodes, inverse = np.unique(indices[valid].astype(np.int64), return_inverse=True)
+
+        # Distinct nodes may have the same label.
+        label_codes, labels = pd.factorize(
+            pd.Series([self.nodes[_]["label"] for _ in nodes], dtype=object)
+        )
+        codes = np.full(len(indices) + nmissing, -1, dtype=np.int64)
+        codes[: len(indices)][valid] = label_codes[inverse]
+        return pd.Categorical.from_codes(codes, categories=labels)
@@ -5,6 +5,7 @@
 
 import networkx as nx
 import pandas as pd
+from pandas.api.types import union_categoricals
 
 # CallFlow imports
 try:
@@ -12,6 +13,7 @@ try:
 
     LOGGER = callflow.get_logger(__name__)
     from callflow import SuperGraph
+    from callflow.datastructures.path_table import PathTable
 except Exception:
     raise Exception("Module callflow not found not found.")
 
@@ -24,14 +26,14 @@ class EnsembleGraph(SuperGraph):
     """
 
     # --------------------------------------------------------------------------
-    def __init__(self, config={}, tag="", mode="process", supergraphs={}):
+    def __init__(self, config={}, tag="", mode="process", supergraphs={}, budget=None):
         """
         Arguments:
             supergraphs (dict): dictionary of supergraphs keyed by their tag.
         """
         self.supergraphs = supergraphs
 
-        super().__init__(config, tag, mode)
+        super().__init__(config, tag, mode, budget)
 
     # --------------------------------------------------------------------------
     def create_gf(self):
@@ -45,7 +47,7 @@ class EnsembleGraph(SuperGraph):
         if self.mode == "process":
 
             self.gf = callflow.GraphFrame()
-            self.gf.df = self.union_df()
+            self.gf.df = callflow.GraphFrame.categorize(self.union_df())
             """
             TODO: Need to write a module to convert a NetowrkX graph to a Hatchet graph.
             Currently, there is no way to convert networkX to hatchet graph yet. So we are setting this to None.
@@ -60,61 +62,93 @@ class EnsembleGraph(SuperGraph):
     def union_df(self):
         """
         Union the dataframes.
+        The path IDs of each dataframe are remapped to the ensemble's path table,
+        and the categorical columns are re-encoded with the union of the categories
+        (otherwise, concatenation falls back to python strings).
+        The dataframes are concatenated at once, i.e., the union is allocated once.
         Return:
             (pd.DataFrame) DataFrame for union of the dataframes.
         """
-        df = pd.DataFrame([])
+        categories = self.union_categories()
 
+        dfs = []
         for idx, tag in enumerate(self.supergraphs):
-            df = pd.concat([df, self.supergraphs[tag].gf.df], sort=True)
+            gf = self.supergraphs[tag].gf
+            remap = self.gf.path_table.merge(gf.path_table)
+            columns = {
+                column: remap[gf.df[column].values]
+                for column in PathTable.COLUMNS
+                if column in gf.df.columns
+            }
+            for column, values in categories.items():
+                if column in gf.df.columns:
+                    columns[column] = pd.Categorical(gf.df[column], categories=values)
+            dfs.append(gf.df.assign(**columns))
+
+        if len(dfs) == 0:
+            return pd.DataFrame([])
+        return pd.concat(dfs, sort=True)
+
+    def union_categories(self):
+        """
+        Union the categories of the categorical columns (refer GraphFrame.categorize).
 
-        return df
+        Return:
+            (dict) categories for each categorical column.
+        """
+        ret = {}
+        for column in callflow.GraphFrame._CATEGORICAL_COLUMNS:
+            values = [
+                pd.Categorical(self.supergraphs[tag].gf.df[column])
+                for tag in self.supergraphs
+                if column in self.supergraphs[tag].gf.df.columns
+            ]
+            if len(values) > 0:
+                ret[column] = union_categoricals(values, ignore_order=True).categories
+        return ret
 
     def union_nxg(self):
         """
-        Union the netwprkX graph.
+        Union the networkX graphs.
+        Nodes and edges of all the graphs are first collected into shared tables
+        (keyed by the node names), and the union graph is constructed once.
 
         Return:
             (nx.DiGraph) NetworkX graph for union of graphs.
         """
-        nxg = nx.DiGraph()
+        nodes = {}
+        edges = {}
         for idx, tag in enumerate(self.supergraphs):
-            LOGGER.debug("-=========================-")
-            LOGGER.debug(tag)
-            EnsembleGraph._union_nxg_recurse(nxg, self.supergraphs[tag].gf.nxg)
+            nxg = self.supergraphs[tag].gf.nxg
+            if nxg.is_multigraph():
+                raise nx.NetworkXError("Union of multigraphs is not supported.")
 
-        return nxg
+            nnodes = len(nodes)
+            EnsembleGraph._union_tables(nodes, edges, nxg)
+            LOGGER.debug(f"{tag}: {len(nodes) - nnodes} new nodes in the union.")
+
+        ret = nx.DiGraph()
+        ret.add_nodes_from(nodes.items())
+        ret.add_edges_from((u, v, data) for (u, v), data in edges.items())
+        return ret
 
-    # Return the union of graphs G and H.
     @staticmethod
-    def _union_nxg_recurse(nxg_1, nxg_2):
+    def _union_tables(nodes, edges, nxg):
         """
-        Pairwise Iterative concatenation of nodes from nxg_2 to nxg_1.
-
+        Add the nodes and edges (and their attributes) of nxg to the node and edge tables.
+        Attributes of the later graphs take precedence (same as nx.DiGraph.update).
         """
-        if not nxg_1.is_multigraph() == nxg_2.is_multigraph():
-            raise nx.NetworkXError("G and H must both be graphs or multigraphs.")
-
-        nxg_1.update(nxg_2)
-
-        is_same = set(nxg_1) == set(nxg_2)
-        LOGGER.debug(f"Nodes in Graph 1 and Graph 2 are same? : {is_same}")
-        if set(nxg_1) != set(nxg_2):
-            LOGGER.debug(f"Difference is { list(set(nxg_1) - set(nxg_2))}")
-            # LOGGER.debug(f"Nodes in Graph 1: {set(nxg_1)}")
-            # LOGGER.debug(f"Nodes in Graph 2: {set(nxg_2)}")
-        LOGGER.debug("-=========================-")
-
-        if nxg_2.is_multigraph():
-            new_edges = nxg_2.edges(keys=True, data=True)
-        else:
-            new_edges = nxg_2.edges(data=True)
-
-        # add nodes and edges.
-        nxg_1.add_nodes_from(nxg_2)
-        nxg_1.add_edges_from(new_edges)
-
-        return nxg_1
+        for node, data in nxg.nodes(data=True):
+            if node in nodes:
+                nodes[node].update(data)
+            else:
+                nodes[node] = dict(data)
+
+        for u, v, data in nxg.edges(data=True):
+            if (u, v) in edges:
+                edges[(u, v)].update(data)
+            else:
+                edges[(u, v)] = dict(data)
 
     # --------------------------------------------------------------------------
     # TODO:
@@ -4,6 +4,8 @@
 # SPDX-License-Identifier: MIT
 
 import os
+import threading
+import numpy as np
 import pandas as pd
 import hatchet as ht
 import networkx as nx
@@ -11,13 +13,61 @@ import networkx as nx
 # -----------------------------------------------------------------------------
 # CallFlow imports
 import callflow
+from callflow.datastructures.path_table import PathTable
+from callflow.datastructures.caliper_reader import CaliperJSONReader
 
 LOGGER = callflow.get_logger(__name__)
 
 
 class GraphFrame(ht.GraphFrame):
 
-    _FILENAMES = {"ht": "hatchet_tree.txt", "df": "df.csv", "nxg": "nxg.json"}
+    _FILENAMES = {
+        "ht": "hatchet_tree.txt",
+        "df": "df.csv",
+        "nxg": "nxg.json",
+        "paths": "paths.json",
+    }
+
+    # Supported on-disk formats for the dataframe.
+    # csv is the default to stay compatible with existing .callflow directories.
+    # parquet and feather are columnar (require pyarrow) and preserve dtypes.
+    _DF_FILENAMES = {
+        "csv": "df.csv",
+        "parquet": "df.parquet",
+        "feather": "df.feather",
+    }
+
+    # Columns that store a python list per row.
+    # The path columns (refer PathTable.COLUMNS) store path IDs instead.
+    _LIST_COLUMNS = ["callers", "callees"]
+
+    # Columns that repeat a string for each rank (and run) of a callsite.
+    # They are stored as categoricals (i.e., integer codes into the distinct strings).
+    _CATEGORICAL_COLUMNS = [
+        "name",
+        "module",
+        "dataset",
+        "vis_node_name",
+        "vis_name",
+        "type",
+        "file",
+    ]
+
+    # State of a lazily read graphframe (refer read(lazy=True)).
+    # Defined on the class so that graphframes built otherwise remain valid.
+    _df = None
+    _nxg = None
+    _nxg_fname = None
+    _source = None
+    _table = None
+    _projection = None
+    _budget = None
+
+    # Row-index maps of the dataframe (refer index()).
+    _indexes = None
+
+    # Row-index maps built when the dataframe is loaded (refer build_indexes()).
+    _INDEXES = ["name", "module", ("module", "name"), "dataset", ("dataset", "name")]
 
     # ------------------------------------------------------------------------
     def __init__(self, graph=None, dataframe=None, exc_metrics=None, inc_metrics=None):
@@ -25,6 +75,9 @@ class GraphFrame(ht.GraphFrame):
         Constructs a callflow.GraphFrame object.
         """
 
+        # Call paths referenced by the path columns of the dataframe.
+        self.path_table = PathTable()
+
         # TODO: will we ever want to create a graphframe without data?
         if graph is not None and dataframe is not None:
             super().__init__(graph, dataframe, exc_metrics, inc_metrics)
@@ -36,10 +89,14 @@ class GraphFrame(ht.GraphFrame):
             self.nxg = self.hatchet_graph_to_nxg(graph)
 
     # -------------------------------------------------------------------------
-    def write(self, path, write_df=True, write_graph=False, write_nxg=True):
+    def write(
+        self, path, write_df=True, write_graph=False, write_nxg=True, df_format="csv"
+    ):
         """
         Write the GraphFrame as separate files (refer _FILENAMES for file name mapping).
+        The dataframe is written in `df_format` (refer _DF_FILENAMES).
         """
+        assert df_format in GraphFrame._DF_FILENAMES
 
         if not write_df and not write_graph and not write_nxg:
             return
@@ -48,9 +105,23 @@ class GraphFrame(ht.GraphFrame):
 
         LOGGER.info("Writing graphframe to ({0})".format(path))
 
-        # dump the filtered dataframe to csv if write_df is true.
+        # dump the filtered dataframe if write_df is true.
         if write_df:
-            self.df.to_csv(os.path.join(path, GraphFrame._FILENAMES["df"]))
+            fname = os.path.join(path, GraphFrame._DF_FILENAMES[df_format])
+            if df_format == "csv":
+                self.df.to_csv(fname)
+            elif df_format == "parquet":
+                GraphFrame._to_columnar(self.df).to_parquet(fname, index=False)
+            elif df_format == "feather":
+                import pyarrow.feather
+
+                # Uncompressed, so the file can be memory-mapped (refer read).
+                pyarrow.feather.write_feather(
+                    GraphFrame._to_columnar(self.df), fname, compression="uncompressed"
+                )
+
+            fname = os.path.join(path, GraphFrame._FILENAMES["paths"])
+            self.path_table.write(fname)
 
         if write_graph:
             fname = os.path.join(os.path.join(path, GraphFrame._FILENAMES["ht"]))
@@ -63,39 +134,318 @@ class GraphFrame(ht.GraphFrame):
                 nxg = nx.readwrite.json_graph.node_link_data(self.nxg)
                 json.dump(nxg, fptr, indent=2)
 
-    def read(self, path, read_graph=False):
+    def read(self, path, read_graph=False, df_format="csv", lazy=False, budget=None):
         """
         Read the GraphFrame from .callflow directory (refer _FILENAMES for file name mapping).
+        The dataframe is read from the `df_format` file (refer _DF_FILENAMES).
+
+        If lazy is true, the dataframe and the nxg are read on first access,
+        and the dataframe is accounted (and released) by the `budget` (refer MemoryBudget).
+        For feather files, the file is memory-mapped and only the accessed columns are read.
         """
-        import json
+        assert df_format in GraphFrame._DF_FILENAMES
 
         LOGGER.info("Reading graphframe from ({0})".format(path))
 
         # TODO: this function should not use assertions
         # but throw "ArgumentError" if file is not found, or data is not as expected
-        fname = os.path.join(path, GraphFrame._FILENAMES["df"])
-        self.df = pd.read_csv(fname)
-        if self.df.empty:
+        fname = os.path.join(path, GraphFrame._DF_FILENAMES[df_format])
+        nxg_fname = os.path.join(path, GraphFrame._FILENAMES["nxg"])
+
+        # .callflow directories written by the older versions do not have a
+        # path table (i.e., the paths are stored as lists in the dataframe).
+        paths_fname = os.path.join(path, GraphFrame._FILENAMES["paths"])
+        if os.path.isfile(paths_fname) and os.path.getsize(paths_fname) > 0:
+            self.path_table = PathTable.read(paths_fname)
+
+        if lazy:
+            self._lock = threading.Lock()
+            self._budget = budget
+            self._source = (
+                fname,
+                df_format,
+                GraphFrame._read_columns(fname, df_format),
+            )
+            if df_format == "feather":
+                import pyarrow.feather
+
+                self._table = pyarrow.feather.read_table(fname, memory_map=True)
+            self._nxg_fname = nxg_fname
+
+        else:
+            self.df = self._intern_paths(GraphFrame._read_df(fname, df_format))
+            self.nxg = GraphFrame._read_nxg(nxg_fname)
+
+        self.graph = None
+        if read_graph:
+            import json
+
+            fname = os.path.join(path, GraphFrame._FILENAMES["ht"])
+            with open(fname, "r") as graph_file:
+                self.graph = json.load(graph_file)
+
+            assert isinstance(self.graph, ht.GraphFrame.Graph)
+
+    @staticmethod
+    def _read_df(fname, df_format, columns=None, table=None):
+        """
+        Read the dataframe (or only its `columns`) from the `df_format` file.
+        `table` is the memory-mapped arrow table of a feather file, if available.
+        """
+        if df_format == "csv":
+            dtype = {_: "category" for _ in GraphFrame._CATEGORICAL_COLUMNS}
+            df = pd.read_csv(fname, usecols=columns, dtype=dtype)
+        elif df_format == "parquet":
+            df = GraphFrame._from_columnar(pd.read_parquet(fname, columns=columns))
+        elif df_format == "feather":
+            import pyarrow.feather
+
+            if table is None:
+                table = pyarrow.feather.read_table(fname, columns=columns)
+            elif columns is not None:
+                table = table.select(columns)
+            df = GraphFrame._from_columnar(table.to_pandas())
+
+        if df.empty:
             raise ValueError(f"{fname} is empty.")
 
+        # Columnar files written by the older versions store plain strings.
+        df = GraphFrame.categorize(df)
+
         # Hatchet requires node and rank to be indexes.
         # remove the set indexes to maintain consistency.
         # self.df = self.df.set_index(['node', 'rank'])
-        self.df = self.df.reset_index(drop=False)
+        if columns is None:
+            df = df.reset_index(drop=False)
+        return df
+
+    @staticmethod
+    def read_chunks(path, df_format="csv", columns=None, chunk_size=1 << 20):
+        """
+        Iterate over the dataframe written in the `path` directory in chunks of
+        (at most) `chunk_size` rows, so the whole dataframe is never in memory.
+        String columns are read as plain strings (i.e., not categoricals), because
+        the categories of the chunks differ.
+        """
+        assert df_format in GraphFrame._DF_FILENAMES
+        fname = os.path.join(path, GraphFrame._DF_FILENAMES[df_format])
+
+        if df_format == "csv":
+            for df in pd.read_csv(fname, usecols=columns, chunksize=chunk_size):
+                yield df
+        elif df_format == "parquet":
+            import pyarrow.parquet
+
+            parquet = pyarrow.parquet.ParquetFile(fname)
+            for batch in parquet.iter_batches(batch_size=chunk_size, columns=columns):
+                yield GraphFrame._from_columnar(batch.to_pandas())
+        elif df_format == "feather":
+            import pyarrow.feather
+
+            table = pyarrow.feather.read_table(fname, columns=columns, memory_map=True)
+            for batch in table.to_batches(max_chunksize=chunk_size):
+                yield GraphFrame._from_columnar(batch.to_pandas())
+
+    @staticmethod
+    def _read_columns(fname, df_format):
+        """
+        Read the column names of the dataframe file (without reading the data).
+        """
+        if df_format == "csv":
+            return pd.read_csv(fname, nrows=0).columns.tolist()
+        elif df_format == "parquet":
+            import pyarrow.parquet
+
+            return pyarrow.parquet.read_schema(fname).names
+        elif df_format == "feather":
+            import pyarrow.feather
+
+            return pyarrow.feather.read_table(fname, memory_map=True).column_names
+
+    @staticmethod
+    def _read_nxg(fname):
+        """
+        Read the nxg from the node-link json file.
+        """
+        import json
 
-        fname = os.path.join(path, GraphFrame._FILENAMES["nxg"])
         with open(fname, "r") as nxg_file:
             graph = json.load(nxg_file)
-            self.nxg = nx.readwrite.json_graph.node_link_graph(graph)
-            assert self.nxg is not None
+            nxg = nx.readwrite.json_graph.node_link_graph(graph)
+            assert nxg is not None
+        return nxg
 
-        self.graph = None
-        if read_graph:
-            fname = os.path.join(path, GraphFrame._FILENAMES["ht"])
-            with open(fname, "r") as graph_file:
-                self.graph = json.load(graph_file)
+    # --------------------------------------------------------------------------
+    # Lazily read dataframe and nxg.
+    @property
+    def df(self):
+        """
+        The dataframe. A lazily read graphframe materializes it on first access.
+        """
+        df = self._df
+        if df is None and self._source is not None:
+            df = self._materialize()
+        elif self._budget is not None:
+            self._budget.touch(self)
+        return df
+
+    @df.setter
+    def df(self, df):
+        # A dataframe set in memory is no longer backed by the file.
+        if self._source is not None:
+            self._source, self._table, self._projection = None, None, None
+            if self._budget is not None:
+                self._budget.remove(self)
+        self._df = df
+        self._indexes = None
+
+    @property
+    def nxg(self):
+        if self._nxg is None and self._nxg_fname is not None:
+            self._nxg = GraphFrame._read_nxg(self._nxg_fname)
+        return self._nxg
+
+    @nxg.setter
+    def nxg(self, nxg):
+        self._nxg_fname = None
+        self._nxg = nxg
+
+    def select(self, columns):
+        """
+        Returns a dataframe containing (at least) the `columns`.
+
+        A lazily read graphframe that is not materialized reads only the
+        requested columns, and keeps them for the following selections.
+        Otherwise, the entire dataframe is returned.
+        """
+        assert isinstance(columns, list)
+        if self._df is not None or self._source is None:
+            return self.df
+        return self._materialize(columns)
+
+    def release(self):
+        """
+        Drop the materialized data of a lazily read graphframe.
+        It is read again from the file on the next access.
+        """
+        if self._source is None:
+            return
+        with self._lock:
+            self._df, self._projection = None, None
+
+    def _materialize(self, columns=None):
+        """
+        Read the dataframe (or a projection with `columns`) of a lazily read graphframe.
+        """
+        with self._lock:
+            fname, df_format, file_columns = self._source
+
+            if columns is None:
+                df = self._df
+                if df is None:
+                    df = GraphFrame._read_df(fname, df_format, table=self._table)
+                    df = self._intern_paths(df)
+                    self._df, self._projection = df, None
+
+            else:
+                df = self._projection
+                columns = [_ for _ in file_columns if _ in columns]
+                if df is not None and set(columns).issubset(df.columns):
+                    if self._budget is not None:
+                        self._budget.touch(self)
+                    return df
+
+                if df is not None:
+                    columns = [
+                        _ for _ in file_columns if _ in df.columns or _ in columns
+                    ]
+                df = GraphFrame._read_df(fname, df_format, columns, self._table)
+                df = self._intern_paths(df)
+                self._projection = df
+
+        if self._budget is not None:
+            self._budget.add(self, df)
+        return df
+
+    def _intern_paths(self, df):
+        """
+        Intern the paths stored as lists (i.e., by the older versions) into path IDs.
+        """
+        for column in PathTable.COLUMNS:
+            if column in df.columns and not pd.api.types.is_integer_dtype(df[column]):
+                df[column] = [self.path_table.intern(_) for _ in df[column]]
+        return df
+
+    @staticmethod
+    def categorize(df):
+        """
+        Encode the string columns (refer _CATEGORICAL_COLUMNS) as categoricals.
+        The categories unused by the rows (e.g., after filtering) are dropped.
+        """
+        for column in GraphFrame._CATEGORICAL_COLUMNS:
+            if column not in df.columns:
+                continue
+            if df[column].dtype.name == "category":
+                df[column] = df[column].cat.remove_unused_categories()
+            else:
+                df[column] = df[column].astype("category")
+        return df
+
+    @staticmethod
+    def _to_columnar(df):
+        """
+        Prepare the dataframe for a columnar (arrow) file.
+        List columns are stored as native lists, and other python objects
+        (e.g., hatchet nodes) are stored as strings like in the csv format.
+        """
+        df = df.reset_index(drop=True)
+
+        for column in df.columns:
+            if df[column].dtype != object:
+                continue
+
+            if column in GraphFrame._LIST_COLUMNS:
+                df[column] = df[column].apply(GraphFrame._as_list)
+            else:
+                df[column] = df[column].apply(GraphFrame._as_scalar)
+        return df
+
+    @staticmethod
+    def _from_columnar(df):
+        """
+        Convert the list columns read from a columnar file into tuples so that
+        they stay hashable (e.g., for groupby).
+        """
+        for column in GraphFrame._LIST_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].apply(
+                    lambda _: tuple(_) if _ is not None else tuple()
+                )
+        return df
+
+    @staticmethod
+    def _as_scalar(value):
+        """
+        Normalize an object column's value.
+        Empty strings are missing values (same as reading them from a csv file).
+        """
+        if isinstance(value, str):
+            return value if value else None
+        if value is None or isinstance(value, (bool, int, float, np.number)):
+            return value
+        return str(value)
 
-            assert isinstance(graph, ht.GraphFrame.Graph)
+    @staticmethod
+    def _as_list(value):
+        """
+        Normalize a list column's value.
+        Missing values are stored as empty strings (or NaN) by the operations.
+        """
+        if isinstance(value, str):
+            return callflow.utils.list_from_path(value) if value else []
+        if isinstance(value, float):
+            return []
+        return list(value)
 
     # --------------------------------------------------------------------------
     # Hatchet's GraphFrame utilities.
@@ -134,7 +484,7 @@ class GraphFrame(ht.GraphFrame):
             gf = ht.GraphFrame.from_caliper(data_path, query=query)
 
         elif profile_format == "caliper_json":
-            gf = ht.GraphFrame.from_caliper_json(data_path)
+            gf = CaliperJSONReader(data_path).read()
 
         elif profile_format == "gprof":
             gf = ht.GraphFrame.from_gprof_dot(data_path)
@@ -154,53 +504,43 @@ class GraphFrame(ht.GraphFrame):
     def hatchet_graph_to_nxg(ht_graph):
         """
         Constructs a networkX graph from hatchet graph.
+        Each node is visited once (in pre-order from the roots), and adds the
+        edges from its parents, i.e., the conversion is O(V + E).
         """
         assert isinstance(ht_graph, ht.graph.Graph)
 
-        def _get_node_name(nd):
-            nm = callflow.utils.sanitize_name(nd["name"])
-            if nd.get("line") != "NA" and nd.get("line") is not None:
-                nm += ":" + str(nd.get("line"))
-            return nm
-
         # `node_dict_from_frame` converts the hatchet's frame to a dictionary
         from callflow.utils import node_dict_from_frame
 
+        # Names of the visited nodes (keyed by id, since nodes are shared by the paths).
+        names = {}
+
+        def _get_node_name(node):
+            nm = names.get(id(node))
+            if nm is None:
+                nd = node_dict_from_frame(node.frame)
+                nm = callflow.utils.sanitize_name(nd["name"])
+                if nd.get("line") != "NA" and nd.get("line") is not None:
+                    nm += ":" + str(nd.get("line"))
+                names[id(node)] = nm
+            return nm
+
         nxg = nx.DiGraph()
+        visited = set()
         for root in ht_graph.roots:
-            node_gen = root.traverse()
-
-            # root_dict = node_dict_from_frame(root.frame)
-            # root_name = root_dict["name"]
-            # root_paths = root.paths()
-            node = root
-
-            try:
-                while node:
-
-                    # node_dict = node_dict_from_frame(node.frame)
-                    # node_name = node_dict["name"]
-
-                    # Get all node paths from hatchet.
-                    node_paths = node.paths()
-
-                    # Loop through all the node paths.
-                    for node_path in node_paths:
-                        if len(node_path) >= 2:
-
-                            src_node = node_dict_from_frame(node_path[-2])
-                            trg_node = node_dict_from_frame(node_path[-1])
-
-                            src_name = _get_node_name(src_node)
-                            trg_name = _get_node_name(trg_node)
-                            nxg.add_edge(src_name, trg_name)
+            stack = [root]
+            while stack:
+                node = stack.pop()
+                if id(node) in visited:
+                    continue
+                visited.add(id(node))
 
-                    node = next(node_gen)
+                trg_name = _get_node_name(node)
+                for parent in node.parents:
+                    nxg.add_edge(_get_node_name(parent), trg_name)
 
-            except StopIteration:
-                pass
-            finally:
-                del root
+                # Children are pushed in reverse to visit them in order.
+                stack.extend(reversed(node.children))
 
         return nxg
 
@@ -251,33 +591,84 @@ class GraphFrame(ht.GraphFrame):
         assert isinstance(count, int) and isinstance(sort_attr, str)
         assert count > 0
 
-        df = self.df.groupby(["name"]).mean()
+        df = self.select(["name", sort_attr]).groupby(["name"], observed=True).mean()
         df = df.sort_values(by=[sort_attr], ascending=False)
         df = df.nlargest(count, sort_attr)
         return df.index.values.tolist()
 
+    def index(self, by):
+        """
+        Returns the row-index map of `by` (a column, or a tuple of columns),
+        i.e., {key: positions of the rows}. It is built once for the dataframe.
+        """
+        indexes = self._indexes
+        if indexes is None:
+            indexes = self._indexes = {}
+
+        ret = indexes.get(by)
+        if ret is None:
+            columns = list(by) if isinstance(by, tuple) else [by]
+            df = self.select(columns)
+            ret = df.groupby(
+                columns if isinstance(by, tuple) else by, observed=True, sort=False
+            ).indices
+            indexes[by] = ret
+        return ret
+
+    def build_indexes(self):
+        """
+        Build the row-index maps used by the lookups (refer _INDEXES).
+        """
+        for by in GraphFrame._INDEXES:
+            self.index(by)
+
+    def rows(self, by, key, columns=None):
+        """
+        Returns the rows whose `by` column(s) equal `key`, using the row-index map.
+        If `columns` are given, the rows are selected from select(columns).
+        """
+        df = self.df if columns is None else self.select(columns)
+        positions = self.index(by).get(key)
+        if positions is None:
+            return df.iloc[0:0]
+        return df.iloc[positions]
+
     def filter_by_name(self, names):
         assert isinstance(names, list)
-        return self.df[self.df["name"].isin(names)]
+        index = self.index("name")
+        positions = [index[_] for _ in names if _ in index]
+        if len(positions) == 0:
+            return self.df.iloc[0:0]
+        return self.df.iloc[np.sort(np.concatenate(positions))]
 
     def lookup_with_node(self, node):
-        return self.df.loc[self.df["name"] == node.callpath[-1]]
+        return self.rows("name", node.callpath[-1])
+
+    def lookup_with_name(self, name, columns=None):
+        return self.rows("name", name, columns)
+
+    def lookup_with_module(self, module, columns=None):
+        return self.rows("module", module, columns)
 
-    def lookup_with_name(self, name):
-        return self.df.loc[self.df["name"] == name]
+    def lookup_with_module_name(self, module, name, columns=None):
+        return self.rows(("module", "name"), (module, name), columns)
+
+    def lookup_with_dataset(self, dataset, columns=None):
+        return self.rows("dataset", dataset, columns)
+
+    def lookup_with_dataset_name(self, dataset, name, columns=None):
+        return self.rows(("dataset", "name"), (dataset, name), columns)
 
     def lookup_with_vis_nodeName(self, name):
-        return self.df.loc[self.df["vis_node_name"] == name]
+        return self.rows("vis_node_name", name)
 
     def lookup(self, node):
-        return self.df.loc[
-            (self.df["name"] == node.callpath[-1]) & (self.df["nid"] == node.nid)
-        ]
+        df = self.rows("name", node.callpath[-1])
+        return df.loc[df["nid"] == node.nid]
 
     def update_df(self, col_name, mapping):
-        self.df[col_name] = self.df["name"].apply(
-            lambda node: mapping[node] if node in mapping.keys() else ""
-        )
+        self.df[col_name] = [mapping.get(node, "") for node in self.df["name"]]
+        self._indexes = None
 
     # --------------------------------------------------------------------------
     @staticmethod
@@ -287,7 +678,7 @@ class GraphFrame(ht.GraphFrame):
 
         # Print top "N" callsites by inclusive time.
         LOGGER.info(f"Top {top_n_callsites} Inclusive time: ")
-        rank_df = gf.df.groupby(["name", "nid"]).mean()
+        rank_df = gf.df.groupby(["name", "nid"], observed=True).mean()
         top_inclusive_df = rank_df.nlargest(top_n_callsites, "time (inc)", keep="first")
         for name, row in top_inclusive_df.iterrows():
             LOGGER.info("{0} [{1}]".format(name, row["time (inc)"]))
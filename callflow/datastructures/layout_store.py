@@ -0,0 +1,71 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import json
+import shutil
+import hashlib
+from networkx.readwrite import json_graph
+
+# CallFlow imports
+import callflow
+
+LOGGER = callflow.get_logger(__name__)
+
+
+class LayoutStore:
+    """
+    Layouts (i.e., the networkx graphs of the client's requests) precomputed
+    at process time (refer CallFlow.precompute_layouts).
+
+    The layouts of a run (or the ensemble) are stored in its "layouts" directory
+    (i.e., save_path/tag/layouts), a node-link JSON file for each request key
+    (refer CallFlow.request_single and CallFlow.request_ensemble). The layouts
+    of a run are stale once it is re-processed, so they are removed when its
+    graphframe is written (refer SuperGraph.write_gf).
+    """
+
+    _DIRNAME = "layouts"
+
+    def __init__(self, save_path):
+        self.save_path = save_path
+
+    def _fname(self, tag, key):
+        digest = hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.save_path, tag, LayoutStore._DIRNAME, digest + ".json")
+
+    def exists(self, tag, key):
+        return os.path.isfile(self._fname(tag, key))
+
+    def read(self, tag, key):
+        """
+        Returns the layout of `key`, or None if it was not precomputed.
+        """
+        fname = self._fname(tag, key)
+        if not os.path.isfile(fname):
+            return None
+        LOGGER.info(f"[Read] {fname}")
+        with open(fname, "r") as fptr:
+            return json_graph.node_link_graph(json.load(fptr))
+
+    def write(self, tag, key, nxg):
+        fname = self._fname(tag, key)
+        LOGGER.info(f"[Write] {fname}")
+        os.makedirs(os.path.dirname(fname), exist_ok=True)
+
+        # Written atomically, so a server never reads a partial layout.
+        tmp_fname = fname + ".tmp"
+        with open(tmp_fname, "w") as fptr:
+            json.dump(json_graph.node_link_data(nxg), fptr)
+        os.replace(tmp_fname, fname)
+
+    def clear(self, tag):
+        """
+        Remove the layouts of the run (or the ensemble).
+        """
+        dirname = os.path.join(self.save_path, tag, LayoutStore._DIRNAME)
+        if os.path.isdir(dirname):
+            LOGGER.info(f"Removing the stale layouts in {dirname}")
+            shutil.rmtree(dirname)
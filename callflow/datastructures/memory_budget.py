@@ -0,0 +1,93 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import threading
+from collections import OrderedDict
+
+# CallFlow imports
+import callflow
+
+LOGGER = callflow.get_logger(__name__)
+
+
+class MemoryBudget:
+    """
+    Bounds the memory held by the dataframes of lazily read graphframes.
+
+    Graphframes register the dataframes they materialize, and the least
+    recently used ones are released when the budget is exceeded. A released
+    graphframe reads its dataframe back from the file on the next access.
+    """
+
+    def __init__(self, limit=0):
+        """
+        Arguments:
+            limit (int): budget in bytes. 0 only tracks the usage (i.e., no eviction).
+        """
+        assert limit >= 0
+        self.limit = limit
+
+        # id(gf) -> (gf, nbytes), in least to most recently used order.
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def usage(self):
+        """
+        Bytes held by the registered dataframes.
+        """
+        with self._lock:
+            return sum(nbytes for _, nbytes in self._entries.values())
+
+    def add(self, gf, df):
+        """
+        Register (or re-size) the dataframe materialized by `gf`, and release
+        the least recently used graphframes if the budget is exceeded.
+        """
+        nbytes = int(df.memory_usage(deep=True).sum())
+        with self._lock:
+            self._entries[id(gf)] = (gf, nbytes)
+            self._entries.move_to_end(id(gf))
+            evicted = self._evict(keep=id(gf))
+
+        for _gf in evicted:
+            _gf.release()
+
+    def touch(self, gf):
+        """
+        Mark `gf` as the most recently used.
+        """
+        with self._lock:
+            if id(gf) in self._entries:
+                self._entries.move_to_end(id(gf))
+
+    def remove(self, gf):
+        """
+        Stop tracking `gf` (e.g., its dataframe was replaced in memory).
+        """
+        with self._lock:
+            self._entries.pop(id(gf), None)
+
+    def _evict(self, keep):
+        """
+        Pop the least recently used entries (except `keep`) until the usage fits the limit.
+        Must be called with the lock held.
+        """
+        evicted = []
+        if self.limit == 0:
+            return evicted
+
+        usage = sum(nbytes for _, nbytes in self._entries.values())
+        for key in list(self._entries.keys()):
+            if usage <= self.limit:
+                break
+            if key == keep:
+                continue
+            gf, nbytes = self._entries.pop(key)
+            usage -= nbytes
+            evicted.append(gf)
+            LOGGER.debug(f"Releasing a dataframe ({nbytes} bytes) to fit the budget.")
+
+        return evicted
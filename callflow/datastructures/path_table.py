@@ -0,0 +1,176 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import numpy as np
+
+# CallFlow imports
+import callflow
+
+LOGGER = callflow.get_logger(__name__)
+
+
+class PathTable:
+    """
+    Interning table for the call paths (i.e., "path", "group_path" and "component_path").
+
+    Each distinct name (callsite, module, or "module=callsite") is interned as a
+    symbol, and each distinct path is stored once as a node of a trie, i.e.,
+    (ID of the path without its last element, symbol ID of the last element).
+    The dataframe stores the path IDs, and the layouts decode them through the table.
+    """
+
+    # Path ID of the empty (or missing) path.
+    EMPTY = -1
+
+    # Dataframe columns that store path IDs.
+    COLUMNS = ["path", "group_path", "component_path"]
+
+    def __init__(self):
+        # symbol ID -> name, and name -> symbol ID
+        self._symbols = []
+        self._symbol_ids = {}
+
+        # path ID -> prefix path ID, and path ID -> symbol ID
+        self._prefixes = []
+        self._leaves = []
+
+        # (prefix path ID, symbol ID) -> path ID
+        self._path_ids = {}
+
+        # path ID -> decoded path
+        self._cache = {}
+
+    def __len__(self):
+        return len(self._prefixes)
+
+    # --------------------------------------------------------------------------
+    def intern(self, path):
+        """
+        Returns the ID of the path (a sequence of names).
+        Paths stored by the older versions (stringified lists, or empty strings,
+        NaNs and Nones for missing paths) are parsed first.
+        """
+        if isinstance(path, str):
+            path = callflow.utils.list_from_path(path) if path else []
+        elif path is None or isinstance(path, float):
+            path = []
+
+        path_id = PathTable.EMPTY
+        for name in path:
+            path_id = self.extend(path_id, name)
+        return path_id
+
+    def extend(self, path_id, name):
+        """
+        Returns the ID of the path `path_id` extended by `name`.
+        """
+        return self._extend_symbol(path_id, self._intern_symbol(name))
+
+    def path(self, path_id):
+        """
+        Returns the path (tuple of names) of `path_id`.
+        """
+        ret = self._cache.get(path_id)
+        if ret is not None:
+            return ret
+        if path_id == PathTable.EMPTY:
+            return ()
+
+        # Walk up to the closest decoded prefix.
+        leaves = []
+        prefix_id = path_id
+        while prefix_id != PathTable.EMPTY and prefix_id not in self._cache:
+            leaves.append(self._symbols[self._leaves[prefix_id]])
+            prefix_id = self._prefixes[prefix_id]
+
+        ret = self._cache.get(prefix_id, ()) + tuple(reversed(leaves))
+        self._cache[path_id] = ret
+        return ret
+
+    def prefix(self, path_id):
+        """
+        Returns the ID of the path without its last element (EMPTY for a single element).
+        """
+        return self._prefixes[path_id]
+
+    def leaf(self, path_id):
+        """
+        Returns the last element of the path.
+        """
+        return self._symbols[self._leaves[path_id]]
+
+    def paths(self, path_ids):
+        """
+        Returns the paths of a sequence of path IDs.
+        """
+        return [self.path(_) for _ in path_ids]
+
+    def merge(self, other):
+        """
+        Intern the paths of `other` table.
+
+        Return:
+            (np.ndarray) Maps the path IDs of `other` to the path IDs of this table.
+            The last element maps PathTable.EMPTY to itself, so `remap[ids]` works for missing paths.
+        """
+        symbol_ids = [self._intern_symbol(_) for _ in other._symbols]
+
+        remap = np.empty(len(other) + 1, dtype=np.int64)
+        remap[-1] = PathTable.EMPTY
+
+        # Prefixes always have smaller IDs than their extensions.
+        for path_id, (prefix_id, symbol_id) in enumerate(
+            zip(other._prefixes, other._leaves)
+        ):
+            remap[path_id] = self._extend_symbol(
+                remap[prefix_id], symbol_ids[symbol_id]
+            )
+        return remap
+
+    def _intern_symbol(self, name):
+        symbol_id = self._symbol_ids.get(name)
+        if symbol_id is None:
+            symbol_id = len(self._symbols)
+            self._symbols.append(name)
+            self._symbol_ids[name] = symbol_id
+        return symbol_id
+
+    def _extend_symbol(self, path_id, symbol_id):
+        key = (int(path_id), symbol_id)
+        ext_id = self._path_ids.get(key)
+        if ext_id is None:
+            ext_id = len(self._prefixes)
+            self._prefixes.append(key[0])
+            self._leaves.append(symbol_id)
+            self._path_ids[key] = ext_id
+        return ext_id
+
+    # --------------------------------------------------------------------------
+    def write(self, fname):
+        with open(fname, "w") as fptr:
+            json.dump(
+                {
+                    "symbols": self._symbols,
+                    "prefixes": self._prefixes,
+                    "leaves": self._leaves,
+                },
+                fptr,
+            )
+
+    @staticmethod
+    def read(fname):
+        with open(fname, "r") as fptr:
+            data = json.load(fptr)
+
+        table = PathTable()
+        table._symbols = data["symbols"]
+        table._symbol_ids = {name: idx for idx, name in enumerate(table._symbols)}
+        table._prefixes = data["prefixes"]
+        table._leaves = data["leaves"]
+        table._path_ids = {
+            key: idx for idx, key in enumerate(zip(table._prefixes, table._leaves))
+        }
+        return table
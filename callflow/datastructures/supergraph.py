@@ -11,7 +11,9 @@ import callflow
 from callflow.timer import Timer
 from callflow.algorithms import DeltaConSimilarity
 from callflow.operations import Process, Group, Filter
-from callflow.modules import EnsembleAuxiliary, SingleAuxiliary
+from callflow.modules import EnsembleAuxiliary, SingleAuxiliary, ChunkedAuxiliary
+from callflow.datastructures.auxiliary_store import AuxiliaryStore
+from callflow.datastructures.layout_store import LayoutStore
 
 LOGGER = callflow.get_logger(__name__)
 
@@ -22,15 +24,19 @@ class SuperGraph(object):
     """
 
     # --------------------------------------------------------------------------
-    _FILENAMES = {"params": "env_params.txt", "aux": "auxiliary_data.json"}
+    _FILENAMES = {"params": "env_params.txt"}
+
+    _auxiliary_data = None
+    _auxiliary_store = None
 
     # --------------------------------------------------------------------------
-    def __init__(self, config={}, tag="", mode="process"):
+    def __init__(self, config={}, tag="", mode="process", budget=None):
         """
         Arguments:
             props (dict): dictionary to store the configuration. CallFlow appends more information while processing.
             tag (str): Tag for each call graph.
             mode (str): process|render. process performs pre-processing, and render calculates layout for the client.
+            budget (MemoryBudget): memory budget shared by the lazily read graphframes (refer config["lazy_render"]).
         """
         assert mode in ["process", "render"]
         self.timer = Timer()
@@ -38,6 +44,7 @@ class SuperGraph(object):
         self.config = config
         self.tag = tag
         self.mode = mode
+        self.budget = budget
 
         self.create_gf()
 
@@ -46,12 +53,42 @@ class SuperGraph(object):
 
         assert self.mode == "render"
         self.gf = callflow.GraphFrame()
-        self.gf.read(self.dirname)
+        self.gf.read(
+            self.dirname,
+            df_format=self.config["df_format"],
+            lazy=self.config["lazy_render"],
+            budget=self.budget,
+        )
 
         # Read only if "read_parameters" is specified in the config file.
         if self.config["read_parameter"]:
             self.parameters = SuperGraph.read_parameters(self.dirname)
-        self.auxiliary_data = SuperGraph.read_auxiliary_data(self.dirname)
+
+        # In lazy mode, auxiliary store is opened on the first request.
+        # Only its index is read, the records are read on request.
+        if not self.config["lazy_render"]:
+            self.auxiliary_store = SuperGraph.read_auxiliary_store(self.dirname)
+            self.gf.build_indexes()
+
+    @property
+    def auxiliary_store(self):
+        if self._auxiliary_store is None and self.mode == "render":
+            self._auxiliary_store = SuperGraph.read_auxiliary_store(self.dirname)
+        return self._auxiliary_store
+
+    @auxiliary_store.setter
+    def auxiliary_store(self, store):
+        self._auxiliary_store = store
+
+    @property
+    def auxiliary_data(self):
+        if self._auxiliary_data is None and self.mode == "render":
+            self._auxiliary_data = self.auxiliary_store.to_dict()
+        return self._auxiliary_data
+
+    @auxiliary_data.setter
+    def auxiliary_data(self, data):
+        self._auxiliary_data = data
 
     def create_gf(self):
         """Create a graphframe based on the mode.
@@ -64,7 +101,9 @@ class SuperGraph(object):
         elif self.mode == "render":
             self._create_for_render()
 
-        self.gf.df.reset_index(drop=False, inplace=True)
+        # A lazily read dataframe is not materialized until it is accessed.
+        if self.mode == "process" or not self.config["lazy_render"]:
+            self.gf.df.reset_index(drop=False, inplace=True)
 
     # -------------------------------------------------------------------------
     def get_module_name(self, callsite):
@@ -80,8 +119,9 @@ class SuperGraph(object):
             if callsite in self.config["callsite_module_map"]:
                 return self.config["callsite_module_map"][callsite]
 
-        if "module" in self.gf.df.columns:
-            return self.gf.lookup_with_name(callsite)["module"].unique()[0]
+        df = self.gf.lookup_with_name(callsite, columns=["name", "module"])
+        if "module" in df.columns:
+            return df["module"].unique()[0]
         else:
             return callsite
 
@@ -155,12 +195,14 @@ class SuperGraph(object):
             )
 
         self.gf = process.gf
+        self.gf.df = callflow.GraphFrame.categorize(self.gf.df)
 
     def group_gf(self, group_by="module"):
         """
         Group the graphframe based on `group_by` parameter.
         """
         self.gf = Group(self.gf, group_by).gf
+        self.gf.df = callflow.GraphFrame.categorize(self.gf.df)
 
     def filter_gf(self, mode="single"):
         """
@@ -172,23 +214,61 @@ class SuperGraph(object):
             filter_by=self.config["filter_by"],
             filter_perc=self.config["filter_perc"],
         ).gf
+        self.gf.df = callflow.GraphFrame.categorize(self.gf.df)
 
     # --------------------------------------------------------------------------
     # Question: These functions just call another class, should we just call the corresponding classes directly?
     def write_gf(self, write_df=True, write_graph=False, write_nxg=True):
-        self.gf.write(self.dirname, write_df, write_graph, write_nxg)
+        self.gf.write(
+            self.dirname,
+            write_df,
+            write_graph,
+            write_nxg,
+            df_format=self.config["df_format"],
+        )
+        # Layouts precomputed from the previous graphframe are stale.
+        LayoutStore(self.config["save_path"]).clear(self.tag)
 
     # --------------------------------------------------------------------------
     def ensemble_auxiliary(
-        self, datasets, MPIBinCount=20, RunBinCount=20, process=True, write=True
+        self,
+        datasets,
+        MPIBinCount=20,
+        RunBinCount=20,
+        process=True,
+        write=True,
+        previous=None,
     ):
-        EnsembleAuxiliary(
+        # Out-of-core processing of the written (grouped) dataframe.
+        if self.config.get("chunk_size", 0) > 0:
+            if previous is not None:
+                LOGGER.info(
+                    "chunk_size is set: the auxiliary data of the unchanged "
+                    "callsites is recomputed."
+                )
+            return ChunkedAuxiliary(
+                lambda: callflow.GraphFrame.read_chunks(
+                    self.dirname,
+                    self.config["df_format"],
+                    ChunkedAuxiliary._COLUMNS,
+                    self.config["chunk_size"],
+                ),
+                self.gf.path_table,
+                datasets=datasets,
+                props=self.config,
+                MPIBinCount=MPIBinCount,
+                RunBinCount=RunBinCount,
+                process=process,
+            )
+
+        return EnsembleAuxiliary(
             self.gf,
             datasets=datasets,
             props=self.config,
             MPIBinCount=MPIBinCount,
             RunBinCount=RunBinCount,
             process=process,
+            previous=previous,
         )
 
     def single_auxiliary(self, dataset="", binCount=20, process=True):
@@ -218,16 +298,22 @@ class SuperGraph(object):
 
         return parameters
 
+    @staticmethod
+    def read_auxiliary_store(path):
+        """
+        Open the auxiliary store (refer AuxiliaryStore), converting the legacy
+        auxiliary_data.json if needed.
+        """
+        return AuxiliaryStore.open(path)
+
     @staticmethod
     def read_auxiliary_data(path):
         """
-        Read the data stored in auxiliary_data.json
+        Read the whole auxiliary data stored in the auxiliary store.
         """
-        fname = os.path.join(path, SuperGraph._FILENAMES["aux"])
-        LOGGER.info(f"[Read] {fname}")
-        data = None
-        with open(fname, "r") as fptr:
-            data = json.load(fptr)
+        store = SuperGraph.read_auxiliary_store(path)
+        data = store.to_dict()
+        store.close()
         return data
 
     @staticmethod
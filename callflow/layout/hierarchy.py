@@ -13,15 +13,21 @@ LOGGER = callflow.get_logger(__name__)
 
 
 class HierarchyLayout:
+
+    # Dataframe columns read by the layout.
+    _DF_COLUMNS = ["name", "module", "time", "time (inc)", "component_path"]
+
     def __init__(self, supergraph, module, filter_by="time (inc)", filter_perc=0.0):
         assert isinstance(supergraph, callflow.SuperGraph)
-        assert "module" in supergraph.gf.df.columns
-        assert module in supergraph.gf.df["module"].unique().tolist()
-
-        module_df = supergraph.gf.df.loc[supergraph.gf.df["module"] == module]
+        module_df = supergraph.gf.lookup_with_module(
+            module, columns=HierarchyLayout._DF_COLUMNS
+        )
+        assert "module" in module_df.columns
+        assert len(module_df) > 0
         self.nxg = HierarchyLayout.create_nxg_tree_from_paths(
             module_df=module_df,
             path="component_path",
+            path_table=supergraph.gf.path_table,
             filter_by=filter_by,
             filter_perc=filter_perc,
         )
@@ -34,13 +40,12 @@ class HierarchyLayout:
             LOGGER.debug(f"cycles: {cycles}")
 
     @staticmethod
-    def create_nxg_tree_from_paths(module_df, path, filter_by, filter_perc):
-        """Create a networkx graph for the module hierarchy. Filter if filter percentage is greater than 0."""
-
-        from ast import literal_eval as make_tuple
+    def create_nxg_tree_from_paths(module_df, path, path_table, filter_by, filter_perc):
+        """Create a networkx graph for the module hierarchy. Filter if filter percentage is greater than 0.
+        The `path` column stores path IDs of the `path_table`."""
 
         if filter_perc > 0.0:
-            group_df = module_df.groupby(["name"]).mean()
+            group_df = module_df.groupby(["name"], observed=True).mean()
             f_group_df = group_df.loc[
                 group_df[filter_by] > filter_perc * group_df[filter_by].max()
             ]
@@ -50,8 +55,8 @@ class HierarchyLayout:
         nxg = nx.DiGraph()
         paths = module_df[path].unique()
 
-        for idx, path in enumerate(paths):
-            path = make_tuple(path)
+        for idx, path_id in enumerate(paths):
+            path = path_table.path(path_id)
             source_targets = HierarchyLayout._create_source_targets(path)
 
             for edge in source_targets:
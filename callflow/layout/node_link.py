@@ -18,6 +18,9 @@ class NodeLinkLayout:
 
     _COLUMNS = ["time (inc)", "time", "name", "module"]
 
+    # Dataframe columns read by the layout.
+    _DF_COLUMNS = ["name", "module", "dataset", "time", "time (inc)", "path"]
+
     def __init__(self, supergraph, callsite_count=50):
 
         assert isinstance(supergraph, SuperGraph)
@@ -29,17 +32,20 @@ class NodeLinkLayout:
 
         self.timer = Timer()
 
+        self.df = self.supergraph.gf.select(NodeLinkLayout._DF_COLUMNS)
+
         # Number of runs in the state.
-        self.runs = self.supergraph.gf.df["dataset"].unique()
+        self.runs = self.df["dataset"].unique()
 
         # Put the top callsites into a list.
         callsites = self.supergraph.gf.get_top_by_attr(callsite_count, "time (inc)")
 
         # Filter out the callsites not in the list. (in a LOCAL copy)
-        df = self.supergraph.gf.filter_by_name(callsites)
+        df = self.df[self.df["name"].isin(callsites)]
 
         with self.timer.phase(f"Creating CCT for ({self.runs})"):
-            self.nxg = NodeLinkLayout._create_nxg_from_paths(df["path"].tolist())
+            paths = self.supergraph.gf.path_table.paths(df["path"].unique())
+            self.nxg = NodeLinkLayout._create_nxg_from_paths(paths)
 
         # Add node and edge attributes.
         with self.timer.phase("Add graph attributes"):
@@ -54,7 +60,7 @@ class NodeLinkLayout:
     # flake8: noqa: C901
     def _add_node_attributes(self):
 
-        module_name_group_df = self.supergraph.gf.df.groupby(["module", "name"])
+        module_name_group_df = self.df.groupby(["module", "name"], observed=True)
         name_time_inc_map = module_name_group_df["time (inc)"].max().to_dict()
         name_time_exc_map = module_name_group_df["time"].max().to_dict()
 
@@ -84,16 +90,18 @@ class NodeLinkLayout:
         # ----------------------------------------------------------------------
         # compute map across data
         for run in self.runs:
-            target_df = self.supergraph.gf.df.loc[
-                self.supergraph.gf.df["dataset"] == run
-            ]
+            target_df = self.supergraph.gf.lookup_with_dataset(
+                run, columns=NodeLinkLayout._DF_COLUMNS
+            )
 
             if not target_df["module"].equals(target_df["name"]):
-                target_group_df = target_df.groupby(["module"])
-                target_name_group_df = target_df.groupby(["module", "name"])
+                target_group_df = target_df.groupby(["module"], observed=True)
+                target_name_group_df = target_df.groupby(
+                    ["module", "name"], observed=True
+                )
             else:
                 target_group_df = target_df
-                target_name_group_df = target_df.groupby("name")
+                target_name_group_df = target_df.groupby("name", observed=True)
 
             target_module_callsite_map = target_group_df["name"].to_dict()
             target_name_time_inc_map = (
@@ -261,7 +269,6 @@ class NodeLinkLayout:
     def _create_nxg_from_paths(paths):
 
         assert isinstance(paths, list)
-        from ast import literal_eval as make_tuple
 
         nxg = nx.DiGraph()
 
@@ -269,7 +276,7 @@ class NodeLinkLayout:
         for i, path in enumerate(paths):
 
             # go over the callsites in this path
-            callsites = make_tuple(path)
+            callsites = path
             plen = len(callsites)
 
             for j in range(plen - 1):
@@ -6,7 +6,6 @@
 import pandas as pd
 import networkx as nx
 import numpy as np
-from ast import literal_eval as make_list
 
 # CallFlow imports
 try:
@@ -35,6 +34,20 @@ class SankeyLayout:
         "entry_function",
     ]
 
+    # Dataframe columns read by the layout.
+    _DF_COLUMNS = [
+        "name",
+        "module",
+        "dataset",
+        "time",
+        "time (inc)",
+        "path",
+        "group_path",
+        "component_path",
+        "entry_function",
+        "callees",
+    ]
+
     _PRIMARY_GROUPBY_COLUMN = "name"
     _SECONDARY_GROUPBY_COLUMN = "module"
 
@@ -56,7 +69,9 @@ class SankeyLayout:
 
         self.timer = Timer()
 
-        self.runs = self.supergraph.gf.df["dataset"].unique()
+        self.df = self.supergraph.gf.select(SankeyLayout._DF_COLUMNS)
+        self.path_table = self.supergraph.gf.path_table
+        self.runs = self.df["dataset"].unique()
 
         self.reveal_callsites = reveal_callsites
         self.split_entry_module = split_entry_module
@@ -66,22 +81,23 @@ class SankeyLayout:
             "Creating the Single SankeyLayout for {0}.".format(self.supergraph.tag)
         )
 
-        self.primary_group_df = self.supergraph.gf.df.groupby(
-            [SankeyLayout._PRIMARY_GROUPBY_COLUMN]
+        self.primary_group_df = self.df.groupby(
+            [SankeyLayout._PRIMARY_GROUPBY_COLUMN], observed=True
         )
-        self.secondary_group_df = self.supergraph.gf.df.groupby(
-            [SankeyLayout._SECONDARY_GROUPBY_COLUMN]
+        self.secondary_group_df = self.df.groupby(
+            [SankeyLayout._SECONDARY_GROUPBY_COLUMN], observed=True
         )
-        self.secondary_primary_group_df = self.supergraph.gf.df.groupby(
+        self.secondary_primary_group_df = self.df.groupby(
             [
                 SankeyLayout._SECONDARY_GROUPBY_COLUMN,
                 SankeyLayout._PRIMARY_GROUPBY_COLUMN,
-            ]
+            ],
+            observed=True,
         )
 
         with self.timer.phase("Construct Graph"):
             self.nxg = SankeyLayout._create_nxg_from_paths(
-                self.supergraph.gf.df, self.path
+                self.df, self.path, self.path_table
             )
             self.add_reveal_paths(self.reveal_callsites)
             if self.split_entry_module != "":
@@ -130,9 +146,11 @@ class SankeyLayout:
             df = self.primary_group_df.get_group(callsite)
             paths.append(
                 {
-                    "group_path": make_list(df["group_path"].unique()[0]),
-                    "path": make_list(df["path"].unique()[0]),
-                    "component_path": make_list(df["component_path"].unique()[0]),
+                    "group_path": self.path_table.path(df["group_path"].unique()[0]),
+                    "path": self.path_table.path(df["path"].unique()[0]),
+                    "component_path": self.path_table.path(
+                        df["component_path"].unique()[0]
+                    ),
                 }
             )
         return paths
@@ -304,7 +322,7 @@ class SankeyLayout:
         Adds node attributes from the dataframe using the _COLUMNS.
         """
         ensemble_mapping = SankeyLayout._ensemble_map(
-            df=self.supergraph.gf.df, nxg=self.nxg, columns=SankeyLayout._COLUMNS
+            df=self.df, nxg=self.nxg, columns=SankeyLayout._COLUMNS
         )
         for idx, key in enumerate(ensemble_mapping):
             nx.set_node_attributes(self.nxg, name=key, values=ensemble_mapping[key])
@@ -312,7 +330,7 @@ class SankeyLayout:
         dataset_mapping = {}
         for run in self.runs:
             dataset_mapping[run] = SankeyLayout._dataset_map(
-                df=self.supergraph.gf.df,
+                df=self.df,
                 nxg=self.nxg,
                 tag=run,
                 columns=SankeyLayout._COLUMNS,
@@ -370,9 +388,9 @@ class SankeyLayout:
     # --------------------------------------------------------------------------
     # Construct the networkX Graph from call paths.
     @staticmethod
-    def _create_nxg_from_paths(df, path):
+    def _create_nxg_from_paths(df, path, path_table):
         """
-        Construct a networkx graph from paths.
+        Construct a networkx graph from paths (i.e., path IDs of the `path_table`).
         Note: Current logic constructs two graphs (one for cct, and one for supergraph) and later uses them to construct a module level supergraph.
         """
         assert isinstance(df, pd.DataFrame)
@@ -381,16 +399,16 @@ class SankeyLayout:
         assert "module" in df.columns
 
         # Get the grouped dataframes.
-        paths_df = df.groupby(["name", path])
-        module_name_group_df = df.groupby(["module", "name"])
+        paths_df = df.groupby(["name", path], observed=True)
+        module_name_group_df = df.groupby(["module", "name"], observed=True)
 
         # Empty networkx graphs.
         nxg = nx.DiGraph()
         cct = nx.DiGraph()
 
-        for (callsite, path), path_df in paths_df:
+        for (callsite, path_id), path_df in paths_df:
             # Break cycles, if any.
-            path_list = SankeyLayout._break_cycles_in_paths(path)
+            path_list = SankeyLayout._break_cycles_in_paths(path_table.path(path_id))
 
             # loop through the path lists for each callsite.
             for callsite_idx, callsite in enumerate(path_list):
@@ -465,21 +483,13 @@ class SankeyLayout:
         Breaks cycles if present in the callpath.
 
         Parameter:
-            path: path array
+            path: path (sequence of "module=callsite"), empty for a missing path.
         """
-        from ast import literal_eval as make_list
-
         ret = []
         moduleMapper = {}
         dataMap = {}
 
-        # TODO: see if we can remove this.
-        if isinstance(path, float):
-            return []
-
-        path_list = make_list(path)
-
-        for idx, elem in enumerate(path_list):
+        for idx, elem in enumerate(path):
             callsite = elem.split("=")[1]
             module = elem.split("=")[0]
             if module not in dataMap:
@@ -517,8 +527,8 @@ class SankeyLayout:
         assert isinstance(nxg, nx.DiGraph)
         ret = {}
 
-        module_group_df = df.groupby(["module"])
-        module_name_group_df = df.groupby(["module", "name"])
+        module_group_df = df.groupby(["module"], observed=True)
+        module_name_group_df = df.groupby(["module", "name"], observed=True)
 
         module_callsite_map = module_group_df["name"].unique().to_dict()
 
@@ -597,8 +607,10 @@ class SankeyLayout:
         # Group the dataframe in two ways.
         # 1. by module
         # 2. by module and callsite
-        target_module_group_df = target_df.groupby(["module"])
-        target_module_name_group_df = target_df.groupby(["module", "name"])
+        target_module_group_df = target_df.groupby(["module"], observed=True)
+        target_module_name_group_df = target_df.groupby(
+            ["module", "name"], observed=True
+        )
 
         # Module map for target run {'module': [Array of callsites]}
         target_module_callsite_map = target_module_group_df["name"].unique().to_dict()
@@ -6,6 +6,7 @@
 from .auxiliary import EnsembleAuxiliary
 from .auxiliary_single import SingleAuxiliary
 from .auxiliary_fast import FastEnsembleAuxiliary
+from .auxiliary_chunked import ChunkedAuxiliary
 from .boxplot import BoxPlot
 from .histogram_rank import RankHistogram
 from .histogram_mini import MiniHistogram
@@ -21,6 +22,7 @@ __all__ = [
     "EnsembleAuxiliary",
     "SingleAuxiliary",
     "FastEnsembleAuxiliary",
+    "ChunkedAuxiliary",
     "BoxPlot",
     "RankHistogram",
     "MiniHistogram",
@@ -5,11 +5,12 @@
 
 import os
 import sys
-import json
 import math
 import numpy as np
+import pandas as pd
 from .gradients import Gradients
 from .boxplot import BoxPlot
+from .histogram_generic import GenericHistogram
 
 sys.path.insert(0, "..")
 
@@ -19,6 +20,7 @@ try:
 
     LOGGER = callflow.get_logger(__name__)
     from callflow.timer import Timer
+    from callflow.datastructures.auxiliary_store import AuxiliaryStore
 except Exception:
     raise Exception("Module callflow not found not found.")
 
@@ -32,7 +34,14 @@ class EnsembleAuxiliary:
         MPIBinCount="20",
         RunBinCount="20",
         process=True,
+        previous=None,
     ):
+        """
+        Arguments:
+            previous (dict): fingerprints ("callsite", "module") and auxiliary store ("data")
+                of a previous processing. The per-dataset entries of the callsites
+                and modules whose fingerprint did not change are reused.
+        """
         self.gf = gf
         self.MPIBinCount = MPIBinCount
         self.RunBinCount = RunBinCount
@@ -43,6 +52,10 @@ class EnsembleAuxiliary:
         self.process = process
         self.hist_props = ["rank", "name", "dataset", "all_ranks"]
         self.filter = True
+        self.previous = previous
+        self.fingerprints = {"callsite": {}, "module": {}}
+        self.boxplot_sketch = props.get("boxplot_sketch", False)
+        self.target_boxplots = {}
         if process:
             self.compute()
         LOGGER.info(self.timer)
@@ -50,13 +63,15 @@ class EnsembleAuxiliary:
     def compute(self):
         ret = {}
         if len(self.datasets) == 1:
-            filename = os.path.join(self.datasets[0], "auxiliary_data.json")
+            path = os.path.join(self.props["save_path"], self.datasets[0])
         else:
-            filename = os.path.join("ensemble", "auxiliary_data.json")
-        path = os.path.join(self.props["save_path"], filename)
+            path = os.path.join(self.props["save_path"], "ensemble")
         LOGGER.info("Calculating Gradients, Mean runtime variations, and Distribution.")
         with self.timer.phase("Process data"):
             self.group_frames()
+        with self.timer.phase("Fingerprint data"):
+            self.fingerprints["callsite"] = self.fingerprint("name")
+            self.fingerprints["module"] = self.fingerprint("module")
         with self.timer.phase("Collect Callsite data"):
             ret["callsite"] = self.callsite_data()
         with self.timer.phase("Collect Module data"):
@@ -64,8 +79,7 @@ class EnsembleAuxiliary:
         with self.timer.phase("Module callsite map data"):
             ret["moduleCallsiteMap"] = self.get_module_callsite_map()
         with self.timer.phase("Writing data"):
-            with open(path, "w") as f:
-                json.dump(ret, f)
+            AuxiliaryStore.write(path, ret)
         return ret
 
     def filter_dict(self, result):
@@ -74,7 +88,7 @@ class EnsembleAuxiliary:
         ret["module"] = result["module"]
         ret["moduleCallsiteMap"] = result["moduleCallsiteMap"]
         ret["callsite"] = {}
-        group_df = self.df.groupby(["name"]).mean()
+        group_df = self.df.groupby(["name"], observed=True).mean()
         if self.props["filter_by"] == "time":
             f_group_df = group_df.loc[
                 group_df[self.props["filter_by"]] > self.props["filter_below"]
@@ -98,13 +112,13 @@ class EnsembleAuxiliary:
 
     def group_frames(self):
         if self.filter:
-            xgroup_df = self.df.groupby(["name"]).mean()
+            xgroup_df = self.df.groupby(["name"], observed=True).mean()
             sort_xgroup_df = xgroup_df.sort_values(by=["time (inc)"], ascending=False)
             top100callsites = sort_xgroup_df.nlargest(50, "time (inc)")
             self.df = self.df[self.df["name"].isin(top100callsites.index.values)]
-        self.module_name_group_df = self.df.groupby(["module", "name"])
-        self.module_group_df = self.df.groupby(["module"])
-        self.name_group_df = self.df.groupby(["name"])
+        self.module_name_group_df = self.df.groupby(["module", "name"], observed=True)
+        self.module_group_df = self.df.groupby(["module"], observed=True)
+        self.name_group_df = self.df.groupby(["name"], observed=True)
         self.target_df = {}
         self.target_module_group_df = {}
         self.target_module_name_group_df = {}
@@ -112,35 +126,43 @@ class EnsembleAuxiliary:
         for dataset in self.datasets:
             self.target_df[dataset] = self.df.loc[self.df["dataset"] == dataset]
             self.target_module_group_df[dataset] = self.target_df[dataset].groupby(
-                ["module"]
+                ["module"], observed=True
             )
             self.target_module_name_group_df[dataset] = self.target_df[dataset].groupby(
-                ["module", "name"]
+                ["module", "name"], observed=True
             )
             self.target_name_group_df[dataset] = self.target_df[dataset].groupby(
-                ["name"]
+                ["name"], observed=True
             )
 
+        # Histograms by property of all callsites and modules.
+        self.callsite_hists = GenericHistogram(
+            self.df, "name", self.hist_props, self.MPIBinCount
+        )
+        self.module_hists = GenericHistogram(
+            self.df, "module", self.hist_props, self.MPIBinCount
+        )
+
+        # Gradients of all callsites and modules.
+        gradients = Gradients(self.target_df, binCount=self.RunBinCount)
+        self.callsite_gradients = gradients.run_all("name")
+        self.module_gradients = gradients.run_all("module")
+
     # Callsite grouped information
     def callsite_data(self):
         ret = {}
         # Create the data dict.
         ensemble = {}
         for callsite, callsite_df in self.name_group_df:
-            callsite_ensemble_df = self.name_group_df.get_group(callsite)
             hists = {}
             hists["Inclusive"] = {}
             hists["Exclusive"] = {}
             for prop in self.hist_props:
-                prop_histograms = self.histogram_by_property_ensemble(
-                    callsite_ensemble_df, prop
-                )
+                prop_histograms = self.callsite_hists.ensemble(callsite, prop)
                 hists["Inclusive"][prop] = prop_histograms["Inclusive"]
                 hists["Exclusive"][prop] = prop_histograms["Exclusive"]
-            gradients = Gradients(self.target_df, binCount=self.RunBinCount).run(
-                columnName="name", callsiteOrModule=callsite
-            )
-            boxplot = BoxPlot(callsite_df)
+            gradients = self.callsite_gradients[callsite]
+            boxplot = self.boxplot(callsite, callsite_df)
             ensemble[callsite] = self.pack_json(
                 callsite_df,
                 callsite,
@@ -158,19 +180,22 @@ class EnsembleAuxiliary:
             name_grouped = self.target_name_group_df[dataset]
             target = {}
             for callsite, callsite_df in name_grouped:
-                callsite_ensemble_df = self.name_group_df.get_group(callsite)
+                previous = self.previous_entry("callsite", dataset, callsite)
+                if previous is not None:
+                    target[callsite] = previous
+                    continue
                 callsite_target_df = callsite_df
                 if not callsite_df.empty:
                     hists = {}
                     hists["Inclusive"] = {}
                     hists["Exclusive"] = {}
                     for prop in self.hist_props:
-                        prop_histograms = self.histogram_by_property(
-                            callsite_ensemble_df, callsite_target_df, prop
+                        prop_histograms = self.callsite_hists.target(
+                            callsite, dataset, prop
                         )
                         hists["Inclusive"][prop] = prop_histograms["Inclusive"]
                         hists["Exclusive"][prop] = prop_histograms["Exclusive"]
-                    boxplot = BoxPlot(callsite_df)
+                    boxplot = self.boxplot(callsite, callsite_df)
                     target[callsite] = self.pack_json(
                         df=callsite_target_df,
                         name=callsite,
@@ -183,24 +208,36 @@ class EnsembleAuxiliary:
             ret[dataset] = target
         return ret
 
+    def boxplot(self, callsite, df):
+        """
+        Boxplot of the rows of a callsite. In sketch mode, it is merged from the
+        boxplots of each dataset, which are reused for the target data.
+        """
+        if not self.boxplot_sketch:
+            return BoxPlot(df)
+
+        boxplots = []
+        for dataset, dataset_df in df.groupby("dataset", observed=True):
+            if (callsite, dataset) not in self.target_boxplots:
+                self.target_boxplots[(callsite, dataset)] = BoxPlot(
+                    dataset_df, sketch=True
+                )
+            boxplots.append(self.target_boxplots[(callsite, dataset)])
+        return BoxPlot.merge(boxplots)
+
     # Module grouped information.
     def module_data(self):
         ret = {}
         # Module grouped information
         ensemble = {}
         for module, module_df in self.module_group_df:
-            module_ensemble_df = self.module_group_df.get_group(module)
             hists = {"Inclusive": {}, "Exclusive": {}}
             for prop in self.hist_props:
-                prop_histograms = self.histogram_by_property_ensemble(
-                    module_ensemble_df, prop
-                )
+                prop_histograms = self.module_hists.ensemble(module, prop)
                 hists["Inclusive"][prop] = prop_histograms["Inclusive"]
                 hists["Exclusive"][prop] = prop_histograms["Exclusive"]
             # Calculate gradients
-            gradients = Gradients(self.target_df, binCount=self.RunBinCount).run(
-                columnName="module", callsiteOrModule=module
-            )
+            gradients = self.module_gradients[module]
             ensemble[module] = self.pack_json(
                 df=module_df,
                 name=module,
@@ -213,14 +250,17 @@ class EnsembleAuxiliary:
             target = {}
             module_group_df = self.target_module_group_df[dataset]
             for module, module_df in module_group_df:
-                module_ensemble_df = self.module_group_df.get_group(module)
+                previous = self.previous_entry("module", dataset, module)
+                if previous is not None:
+                    target[module] = previous
+                    continue
                 module_target_df = module_df
                 gradients = {"Inclusive": {}, "Exclusive": {}}
                 hists = {"Inclusive": {}, "Exclusive": {}}
                 if not module_target_df.empty:
                     for prop in self.hist_props:
-                        prop_histograms = self.histogram_by_property(
-                            module_ensemble_df, module_target_df, prop
+                        prop_histograms = self.module_hists.target(
+                            module, dataset, prop
                         )
                         hists["Inclusive"][prop] = prop_histograms["Inclusive"]
                         hists["Exclusive"][prop] = prop_histograms["Exclusive"]
@@ -234,21 +274,48 @@ class EnsembleAuxiliary:
             ret[dataset] = target
         return ret
 
+    # Fingerprints of the data used for the per-dataset entries.
+    def fingerprint(self, column):
+        """
+        Hash the rows of each callsite (or module) into a fingerprint.
+        Times are hashed in single precision so that the float round-off of
+        re-reading a csv file does not change the fingerprint.
+        """
+        df = self.df[
+            ["name", "module", "dataset", "rank", "nid", "component_level"]
+        ].copy()
+        df["component_path"] = self.df["component_path"].map(
+            {
+                _: str(self.gf.path_table.path(_))
+                for _ in self.df["component_path"].unique()
+            }
+        )
+        df["time"] = self.df["time"].astype(np.float32)
+        df["time (inc)"] = self.df["time (inc)"].astype(np.float32)
+
+        hashes = pd.util.hash_pandas_object(df, index=False).values.view(np.int64)
+        fingerprints = (
+            pd.Series(hashes).groupby(self.df[column].values, observed=True).sum()
+        )
+        return {key: str(value) for key, value in fingerprints.items()}
+
+    def previous_entry(self, kind, dataset, name):
+        """
+        Returns the entry of the previous processing for `name` in `dataset`
+        if its fingerprint did not change (refer `previous`).
+        """
+        if self.previous is None:
+            return None
+        if self.previous[kind].get(name) != self.fingerprints[kind].get(name):
+            return None
+        return self.previous["data"].get(kind, dataset, name)
+
     def select_rows(self, df, search_strings):
         unq, IDs = np.unique(df["dataset"], return_inverse=True)
         unqIDs = np.searchsorted(unq, search_strings)
         mask = np.isin(IDs, unqIDs)
         return df[mask]
 
-    def histogram(self, data, data_min=np.nan, data_max=np.nan):
-        if np.isnan(data_min) or np.isnan(data_max):
-            data_min = data.min()
-            data_max = data.max()
-        h, b = np.histogram(
-            data, range=[data_min, data_max], bins=int(self.MPIBinCount)
-        )
-        return 0.5 * (b[1:] + b[:-1]), h
-
     def convert_pandas_array_to_list(self, series):
         return series.apply(lambda d: d.tolist())
 
@@ -314,7 +381,7 @@ class EnsembleAuxiliary:
                 time_inc = []
                 time = []
             else:
-                module_df = df.groupby(["module", "rank"]).mean()
+                module_df = df.groupby(["module", "rank"], observed=True).mean()
                 x_df = module_df.xs(name, level="module")
                 time_inc = x_df["time (inc)"].tolist()
                 time = x_df["time"].tolist()
@@ -325,7 +392,9 @@ class EnsembleAuxiliary:
             "module": df["module"].tolist()[0],
             # "callers": df["callers"].unique().tolist(),
             # "callees": df["callees"].unique().tolist(),
-            "component_path": df["component_path"].unique().tolist(),
+            "component_path": [
+                list(self.gf.path_table.path(_)) for _ in df["component_path"].unique()
+            ],
             "component_level": df["component_level"].unique().tolist(),
             "Inclusive": {
                 "data": time_inc,
@@ -359,108 +428,3 @@ class EnsembleAuxiliary:
             },
         }
         return result
-
-    # Return the histogram in the required form.
-    def histogram_format(self, histogram_grid):
-        return {
-            "x": histogram_grid[0].tolist(),
-            "y": histogram_grid[1].tolist(),
-            "x_min": histogram_grid[0][0],
-            "x_max": histogram_grid[0][-1],
-            "y_min": np.min(histogram_grid[1]).astype(np.float64),
-            "y_max": np.max(histogram_grid[1]).astype(np.float64),
-        }
-
-    # Prop can be dataset, rank, name
-    def histogram_by_property_ensemble(self, ensemble_df, prop):
-        ret = {}
-        if prop == "all_ranks":
-            time_ensemble_inclusive_arr = np.array(ensemble_df["time (inc)"].tolist())
-            time_ensemble_exclusive_arr = np.array(ensemble_df["time"].tolist())
-        elif prop == "rank":
-            ensemble_prop = ensemble_df.groupby(["dataset", "rank"])[
-                ["time", "time (inc)"]
-            ].mean()
-            time_ensemble_inclusive_arr = np.array(ensemble_prop["time (inc)"])
-            time_ensemble_exclusive_arr = np.array(ensemble_prop["time"])
-        else:
-            ensemble_prop = ensemble_df.groupby([prop])[["time", "time (inc)"]].mean()
-            time_ensemble_inclusive_arr = np.array(ensemble_prop["time (inc)"])
-            time_ensemble_exclusive_arr = np.array(ensemble_prop["time"])
-        inclusive_max = time_ensemble_inclusive_arr.max()
-        inclusive_min = time_ensemble_inclusive_arr.min()
-        histogram_ensemble_inclusive_grid = self.histogram(
-            time_ensemble_inclusive_arr, inclusive_min, inclusive_max
-        )
-        exclusive_max = time_ensemble_exclusive_arr.max()
-        exclusive_min = time_ensemble_exclusive_arr.min()
-        histogram_ensemble_exclusive_grid = self.histogram(
-            time_ensemble_exclusive_arr, exclusive_min, exclusive_max
-        )
-        ret["Inclusive"] = {
-            "ensemble": self.histogram_format(histogram_ensemble_inclusive_grid),
-        }
-        ret["Exclusive"] = {
-            "ensemble": self.histogram_format(histogram_ensemble_exclusive_grid),
-        }
-        return ret
-
-    # Prop can be dataset, rank, name
-    def histogram_by_property(self, ensemble_df, target_df, prop):
-        ret = {}
-        if prop == "all_ranks":
-            time_ensemble_inclusive_arr = np.array(ensemble_df["time (inc)"].tolist())
-            time_ensemble_exclusive_arr = np.array(ensemble_df["time"].tolist())
-            time_target_inclusive_arr = np.array(target_df["time (inc)"].tolist())
-            time_target_exclusive_arr = np.array(target_df["time"].tolist())
-        elif prop == "rank":
-            ensemble_prop = ensemble_df.groupby(["dataset", "rank"])[
-                ["time", "time (inc)"]
-            ].mean()
-            target_prop = target_df.groupby(["dataset", "rank"])[
-                ["time", "time (inc)"]
-            ].mean()
-            time_ensemble_inclusive_arr = np.array(ensemble_prop["time (inc)"])
-            time_ensemble_exclusive_arr = np.array(ensemble_prop["time"])
-            time_target_inclusive_arr = np.array(target_prop["time (inc)"])
-            time_target_exclusive_arr = np.array(target_prop["time"])
-        else:
-            ensemble_prop = ensemble_df.groupby([prop])[["time", "time (inc)"]].mean()
-            target_prop = target_df.groupby([prop])[["time", "time (inc)"]].mean()
-            time_ensemble_inclusive_arr = np.array(ensemble_prop["time (inc)"])
-            time_ensemble_exclusive_arr = np.array(ensemble_prop["time"])
-            time_target_inclusive_arr = np.array(target_prop["time (inc)"])
-            time_target_exclusive_arr = np.array(target_prop["time"])
-        inclusive_max = max(
-            time_ensemble_inclusive_arr.max(), time_target_inclusive_arr.max()
-        )
-        inclusive_min = min(
-            time_ensemble_inclusive_arr.min(), time_target_inclusive_arr.min()
-        )
-        histogram_ensemble_inclusive_grid = self.histogram(
-            time_ensemble_inclusive_arr, inclusive_min, inclusive_max
-        )
-        histogram_target_inclusive_grid = self.histogram(
-            time_target_inclusive_arr, inclusive_min, inclusive_max
-        )
-        exclusive_max = max(
-            time_ensemble_exclusive_arr.max(), time_target_exclusive_arr.max()
-        )
-        exclusive_min = min(
-            time_ensemble_exclusive_arr.min(), time_target_exclusive_arr.min()
-        )
-        histogram_ensemble_exclusive_grid = self.histogram(
-            time_ensemble_exclusive_arr, exclusive_min, exclusive_max
-        )
-        histogram_target_exclusive_grid = self.histogram(
-            time_target_exclusive_arr, exclusive_min, exclusive_max
-        )
-        ret["Inclusive"] = {
-            "ensemble": self.histogram_format(histogram_ensemble_inclusive_grid),
-            "target": self.histogram_format(histogram_target_inclusive_grid),
-        }
-        ret["Exclusive"] = {
-            "ensemble": self.histogram_format(histogram_ensemble_exclusive_grid),
-            "target": self.histogram_format(histogram_target_exclusive_grid),
-        }
-        return ret
@@ -0,0 +1,714 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import math
+import numpy as np
+import pandas as pd
+
+# CallFlow imports
+import callflow
+from callflow.algorithms.summaries import Moments, QuantileSketch, Histogram, histogram
+from callflow.modules.gradients import Gradients
+from callflow.timer import Timer
+from callflow.datastructures.auxiliary_store import AuxiliaryStore
+
+LOGGER = callflow.get_logger(__name__)
+
+
+class ChunkedAuxiliary:
+    """
+    Out-of-core ensemble auxiliary processing (refer EnsembleAuxiliary).
+
+    The written (grouped) dataframe is read in chunks of rows (twice), and each
+    chunk is folded into mergeable summaries (refer callflow.algorithms.summaries)
+    of the callsites, modules and their (callsite, dataset) targets:
+        1. moments and quantile sketches of each callsite, which select the top callsites.
+        2. fixed-bin histograms, outliers and per-rank means of the top callsites and their modules.
+    So, the memory of this stage is proportional to the callsites (and the ranks
+    of the top callsites shipped in the payload), not to the rows of the dataframe.
+    The preceding stages (i.e., processing the runs, and filtering and grouping
+    the ensemble) still hold the whole dataframe.
+
+    The payload is the same as EnsembleAuxiliary's, except:
+        - the quartiles are estimated by the sketches (within 1% of a value).
+        - the auxiliary data of the previous processing is not reused.
+        - the outliers list only the outlier values (and their datasets and ranks).
+        - the "rank" histograms and the "data" of a target callsite use the mean of
+          each rank, i.e., they differ if a callsite has many rows for a rank.
+    """
+
+    # Columns read from the dataframe.
+    _COLUMNS = [
+        "name",
+        "module",
+        "dataset",
+        "rank",
+        "nid",
+        "component_path",
+        "component_level",
+        "time",
+        "time (inc)",
+    ]
+
+    _METRICS = {"Inclusive": "time (inc)", "Exclusive": "time"}
+
+    # Quantiles of the boxplots (refer BoxPlot.quartiles).
+    _QUARTILES = [0.0, 0.25, 0.5, 0.75, 1.0]
+
+    def __init__(
+        self,
+        chunks,
+        path_table,
+        datasets=[],
+        props={},
+        MPIBinCount="20",
+        RunBinCount="20",
+        process=True,
+        topCallsites=50,
+    ):
+        """
+        Arguments:
+            chunks (callable): returns an iterator over the chunks (dataframes) of rows.
+            path_table (PathTable): path table of the "component_path" column.
+        """
+        self.chunks = chunks
+        self.path_table = path_table
+        self.datasets = datasets
+        self.dataset_ids = {_: idx for idx, _ in enumerate(datasets)}
+        self.props = props
+        self.MPIBinCount = int(MPIBinCount)
+        self.RunBinCount = RunBinCount
+        self.topCallsites = topCallsites
+        self.hist_props = ["rank", "name", "dataset", "all_ranks"]
+        self.timer = Timer()
+        self.fingerprints = {"callsite": {}, "module": {}}
+
+        # Callsites (in the order they are read).
+        self.callsites = []
+        self.callsite_ids = {}
+
+        if process:
+            self.compute()
+        LOGGER.info(self.timer)
+
+    def compute(self):
+        ret = {}
+        if len(self.datasets) == 1:
+            path = os.path.join(self.props["save_path"], self.datasets[0])
+        else:
+            path = os.path.join(self.props["save_path"], "ensemble")
+        LOGGER.info("Calculating Gradients, Mean runtime variations, and Distribution.")
+        with self.timer.phase("Summarize callsites"):
+            self.summarize_callsites()
+        with self.timer.phase("Select callsites"):
+            self.select_callsites()
+        with self.timer.phase("Summarize distributions"):
+            self.summarize_distributions()
+        with self.timer.phase("Collect Callsite data"):
+            ret["callsite"] = self.callsite_data()
+        with self.timer.phase("Collect Module data"):
+            ret["module"] = self.module_data()
+        with self.timer.phase("Module callsite map data"):
+            ret["moduleCallsiteMap"] = self.get_module_callsite_map()
+        with self.timer.phase("Writing data"):
+            AuxiliaryStore.write(path, ret)
+        return ret
+
+    # --------------------------------------------------------------------------
+    def read(self):
+        """
+        Iterate over the chunks of the datasets' rows, with their callsite and dataset codes.
+        """
+        for df in self.chunks():
+            df = df.loc[df["dataset"].isin(self.datasets)]
+            if df.empty:
+                continue
+
+            # Paths stored by the older versions are interned first.
+            if not pd.api.types.is_integer_dtype(df["component_path"]):
+                df = df.assign(
+                    component_path=[
+                        self.path_table.intern(_) for _ in df["component_path"]
+                    ]
+                )
+
+            codes, names = pd.factorize(df["name"])
+            for name in names:
+                if name not in self.callsite_ids:
+                    self.callsite_ids[name] = len(self.callsites)
+                    self.callsites.append(name)
+            codes = np.array([self.callsite_ids[_] for _ in names])[codes]
+            dataset_codes = df["dataset"].map(self.dataset_ids).values.astype(np.int64)
+            yield df, codes, dataset_codes
+
+    def summarize_callsites(self):
+        """
+        First pass: moments and quantile sketches of the callsites and their targets,
+        and the attributes (module, nid, component paths) of each target.
+        """
+        ndatasets = len(self.datasets)
+        self.moments = {kind: Moments() for kind in self._METRICS}
+        self.target_moments = {kind: Moments() for kind in self._METRICS}
+        self.sketch = {kind: QuantileSketch() for kind in self._METRICS}
+        self.target_sketch = {kind: QuantileSketch() for kind in self._METRICS}
+
+        # {(callsite code, dataset code): {attribute: {value: None}}}, i.e.,
+        # ordered sets of the attributes.
+        self.attributes = {}
+        self.nranks = 0
+
+        for df, codes, dataset_codes in self.read():
+            targets = codes * ndatasets + dataset_codes
+            for kind, metric in self._METRICS.items():
+                values = df[metric].values.astype(np.float64)
+                self.moments[kind].update(codes, values)
+                self.target_moments[kind].update(targets, values)
+                self.sketch[kind].update(codes, values)
+                self.target_sketch[kind].update(targets, values)
+
+            attrs = pd.DataFrame(
+                {
+                    "code": codes,
+                    "dataset": dataset_codes,
+                    "module": df["module"].values,
+                    "nid": df["nid"].values,
+                    "component_path": df["component_path"].values,
+                    "component_level": df["component_level"].values,
+                }
+            ).drop_duplicates()
+            for code, dataset, *values in zip(
+                *[attrs[_].tolist() for _ in attrs.columns]
+            ):
+                attr = self.attributes.setdefault(
+                    (code, dataset), {_: {} for _ in attrs.columns[2:]}
+                )
+                for name, value in zip(attrs.columns[2:], values):
+                    attr[name][value] = None
+
+            self.nranks = max(self.nranks, int(df["rank"].max()) + 1)
+
+        # Order in which the (callsite, dataset) pairs are read.
+        self.attribute_order = {key: idx for idx, key in enumerate(self.attributes)}
+
+        ncallsites = len(self.callsites)
+        for kind in self._METRICS:
+            self.moments[kind].resize(ncallsites)
+            self.target_moments[kind].resize(ncallsites * ndatasets)
+
+    def select_callsites(self):
+        """
+        Select the top callsites by their mean inclusive time (refer EnsembleAuxiliary.group_frames).
+        """
+        mean = pd.Series(self.moments["Inclusive"].mean, index=self.callsites)
+        top = mean.sort_index().nlargest(self.topCallsites).index
+        self.selected = np.array(
+            [self.callsite_ids[_] for _ in sorted(top)], dtype=np.int64
+        )
+
+        # Callsite code -> index of the selected callsite (-1 if not selected).
+        self.local = np.full(len(self.callsites), -1, dtype=np.int64)
+        self.local[self.selected] = np.arange(len(self.selected))
+
+        # Module of each selected callsite.
+        module_of = [self.attribute(_, "module")[0] for _ in self.selected]
+        self.modules = sorted(set(module_of))
+        module_ids = {_: idx for idx, _ in enumerate(self.modules)}
+        self.module_of = np.array([module_ids[_] for _ in module_of], dtype=np.int64)
+
+        # Moments of the selected callsites and modules (and their targets).
+        nmodules = len(self.modules)
+        ndatasets = len(self.datasets)
+        targets = (self.selected[:, None] * ndatasets + np.arange(ndatasets)).ravel()
+        module_targets = (
+            self.module_of[:, None] * ndatasets + np.arange(ndatasets)
+        ).ravel()
+        self.callsite_summary, self.module_summary = {}, {}
+        for kind in self._METRICS:
+            callsite = self.moments[kind].take(self.selected)
+            target = self.target_moments[kind].take(targets)
+            self.callsite_summary[kind] = {"ensemble": callsite, "target": target}
+            self.module_summary[kind] = {
+                "ensemble": callsite.reduce(self.module_of, nmodules),
+                "target": target.reduce(module_targets, nmodules * ndatasets),
+            }
+
+        # Boxplot quartiles of the selected callsites (and their targets).
+        for kind in self._METRICS:
+            summary = self.callsite_summary[kind]
+            summary["q"] = self.quartiles(
+                self.sketch[kind], self.selected, summary["ensemble"]
+            )
+            summary["target_q"] = self.quartiles(
+                self.target_sketch[kind], targets, summary["target"]
+            )
+
+    def quartiles(self, sketch, codes, moments):
+        """
+        Quartiles of the groups `codes`, the extremes are the exact min and max.
+        """
+        ret = np.array([sketch.quantiles(_, self._QUARTILES) for _ in codes])
+        ret[:, 0] = moments.min
+        ret[:, -1] = moments.max
+        return ret
+
+    def summarize_distributions(self):
+        """
+        Second pass: fixed-bin histograms, outliers, per-rank means and fingerprints
+        of the selected callsites and their modules.
+        """
+        nselected, nmodules = len(self.selected), len(self.modules)
+        ndatasets, nranks = len(self.datasets), self.nranks
+
+        self.hists, self.rank_sums, self.outliers = {}, {}, {}
+        for kind in self._METRICS:
+            callsite, module = self.callsite_summary[kind], self.module_summary[kind]
+            callsite_range = (callsite["ensemble"].min, callsite["ensemble"].max)
+            module_range = (module["ensemble"].min, module["ensemble"].max)
+            self.hists[kind] = {
+                "callsite": Histogram(*callsite_range, self.MPIBinCount),
+                "callsite_target": Histogram(
+                    *[np.repeat(_, ndatasets) for _ in callsite_range],
+                    self.MPIBinCount,
+                ),
+                "module": Histogram(*module_range, self.MPIBinCount),
+                "module_target": Histogram(
+                    *[np.repeat(_, ndatasets) for _ in module_range],
+                    self.MPIBinCount,
+                ),
+            }
+            self.rank_sums[kind] = {
+                "callsite": np.zeros(nselected * ndatasets * nranks),
+                "module": np.zeros(nmodules * ndatasets * nranks),
+            }
+            self.outliers[kind] = {
+                "ensemble": [[] for _ in range(nselected)],
+                "target": [[] for _ in range(nselected * ndatasets)],
+            }
+        self.rank_counts = {
+            "callsite": np.zeros(nselected * ndatasets * nranks, dtype=np.int32),
+            "module": np.zeros(nmodules * ndatasets * nranks, dtype=np.int32),
+        }
+        callsite_hashes = np.zeros(nselected, dtype=np.int64)
+        module_hashes = np.zeros(nmodules, dtype=np.int64)
+
+        for df, codes, dataset_codes in self.read():
+            selected = self.local[codes] >= 0
+            df = df.loc[selected]
+            callsites = self.local[codes[selected]]
+            dataset_codes = dataset_codes[selected]
+            modules = self.module_of[callsites]
+            ranks = df["rank"].values.astype(np.int64)
+
+            callsite_targets = callsites * ndatasets + dataset_codes
+            module_targets = modules * ndatasets + dataset_codes
+            callsite_ranks = callsite_targets * nranks + ranks
+            module_ranks = module_targets * nranks + ranks
+            np.add.at(self.rank_counts["callsite"], callsite_ranks, 1)
+            np.add.at(self.rank_counts["module"], module_ranks, 1)
+
+            for kind, metric in self._METRICS.items():
+                values = df[metric].values.astype(np.float64)
+                hists = self.hists[kind]
+                hists["callsite"].update(callsites, values)
+                hists["callsite_target"].update(callsite_targets, values)
+                hists["module"].update(modules, values)
+                hists["module_target"].update(module_targets, values)
+
+                np.add.at(self.rank_sums[kind]["callsite"], callsite_ranks, values)
+                np.add.at(self.rank_sums[kind]["module"], module_ranks, values)
+
+                summary = self.callsite_summary[kind]
+                self.add_outliers(
+                    self.outliers[kind]["ensemble"],
+                    summary["q"],
+                    callsites,
+                    values,
+                    df,
+                )
+                self.add_outliers(
+                    self.outliers[kind]["target"],
+                    summary["target_q"],
+                    callsite_targets,
+                    values,
+                    df,
+                )
+
+            hashes = self.hash_rows(df)
+            np.add.at(callsite_hashes, callsites, hashes)
+            np.add.at(module_hashes, modules, hashes)
+
+        self.fingerprints["callsite"] = {
+            self.callsites[code]: str(value)
+            for code, value in zip(self.selected, callsite_hashes)
+        }
+        self.fingerprints["module"] = {
+            module: str(value) for module, value in zip(self.modules, module_hashes)
+        }
+
+    def add_outliers(self, outliers, q, codes, values, df, bar=1.5):
+        """
+        Append the values beyond `bar` IQRs of the quartiles (refer BoxPlot.iqr_outlier).
+        """
+        iqr_distance = (q[:, 3] - q[:, 1]) * bar
+        lower = (q[:, 1] - iqr_distance)[codes]
+        upper = (q[:, 3] + iqr_distance)[codes]
+        mask = (values < lower) | (values > upper)
+        for code, value, dataset, rank in zip(
+            codes[mask],
+            values[mask],
+            df["dataset"].values[mask],
+            df["rank"].values[mask],
+        ):
+            outliers[code].append((value, dataset, int(rank)))
+
+    def hash_rows(self, df):
+        """
+        Hashes of the rows (refer EnsembleAuxiliary.fingerprint).
+        """
+        rows = df[
+            ["name", "module", "dataset", "rank", "nid", "component_level"]
+        ].copy()
+        rows["component_path"] = [
+            str(self.path_table.path(_)) for _ in df["component_path"]
+        ]
+        rows["time"] = df["time"].astype(np.float32)
+        rows["time (inc)"] = df["time (inc)"].astype(np.float32)
+        return pd.util.hash_pandas_object(rows, index=False).values.view(np.int64)
+
+    # --------------------------------------------------------------------------
+    def attribute(self, code, name, dataset=None):
+        """
+        Distinct values of the attribute of a callsite (in a dataset, if given).
+        """
+        datasets = range(len(self.datasets)) if dataset is None else [dataset]
+        ret = {}
+        for dataset in datasets:
+            ret.update(self.attributes.get((code, dataset), {}).get(name, {}))
+        return list(ret)
+
+    def rank_means(self, group, kind, idx, dataset=None):
+        """
+        Mean of each (dataset, rank) of a group (ranks without rows are skipped).
+        """
+        nranks, ndatasets = self.nranks, len(self.datasets)
+        if dataset is None:
+            start, stop = idx * ndatasets * nranks, (idx + 1) * ndatasets * nranks
+        else:
+            start = (idx * ndatasets + dataset) * nranks
+            stop = start + nranks
+        counts = self.rank_counts[group][start:stop]
+        sums = self.rank_sums[kind][group][start:stop]
+        return sums[counts > 0] / counts[counts > 0]
+
+    def histogram(self, data, data_min=np.nan, data_max=np.nan):
+        if np.isnan(data_min) or np.isnan(data_max):
+            data_min = data.min()
+            data_max = data.max()
+        return histogram(data, data_min, data_max, self.MPIBinCount)
+
+    def histogram_format(self, histogram_grid):
+        return {
+            "x": histogram_grid[0].tolist(),
+            "y": histogram_grid[1].tolist(),
+            "x_min": histogram_grid[0][0],
+            "x_max": histogram_grid[0][-1],
+            "y_min": np.min(histogram_grid[1]).astype(np.float64),
+            "y_max": np.max(histogram_grid[1]).astype(np.float64),
+        }
+
+    def prop_histograms(self, props, target=None):
+        """
+        Histograms of the per-property values (refer GenericHistogram).
+        `props` maps each property to its ensemble values (or a precomputed
+        histogram grid for "all_ranks"), and `target` to the target's values.
+        """
+        ret = {}
+        for prop in self.hist_props:
+            ensemble = props[prop]
+            if prop == "all_ranks":
+                ret[prop] = {"ensemble": self.histogram_format(ensemble)}
+                if target is not None:
+                    ret[prop]["target"] = self.histogram_format(target[prop])
+                continue
+
+            data_min, data_max = ensemble.min(), ensemble.max()
+            if target is not None:
+                data_min = min(data_min, target[prop].min())
+                data_max = max(data_max, target[prop].max())
+            ret[prop] = {
+                "ensemble": self.histogram_format(
+                    self.histogram(ensemble, data_min, data_max)
+                )
+            }
+            if target is not None:
+                ret[prop]["target"] = self.histogram_format(
+                    self.histogram(target[prop], data_min, data_max)
+                )
+        return ret
+
+    def pack_json(
+        self,
+        moments,
+        idx,
+        name,
+        attributes,
+        data,
+        gradients={"Inclusive": {}, "Exclusive": {}},
+        prop_hists={"Inclusive": {}, "Exclusive": {}},
+        q={"Inclusive": {}, "Exclusive": {}},
+        outliers={"Inclusive": {}, "Exclusive": {}},
+    ):
+        """
+        Same entry as EnsembleAuxiliary.pack_json, from the moments of the group `idx`.
+        """
+        result = {
+            "name": name,
+            "id": "node-" + str(attributes["nid"][0]),
+            "dataset": attributes["dataset"],
+            "module": attributes["module"][0],
+            "component_path": [
+                list(self.path_table.path(_)) for _ in attributes["component_path"]
+            ],
+            "component_level": attributes["component_level"],
+        }
+        for kind in self._METRICS:
+            variance = moments[kind].variance()[idx]
+            if math.isnan(variance):
+                variance = 0
+            result[kind] = {
+                "data": data[kind],
+                "mean_time": moments[kind].mean[idx],
+                "max_time": moments[kind].max[idx],
+                "min_time": moments[kind].min[idx],
+                "variance": variance,
+                "q": q[kind],
+                "outliers": outliers[kind],
+                "std_deviation": math.sqrt(variance),
+                "gradients": gradients[kind],
+                "prop_histograms": prop_hists[kind],
+            }
+        return result
+
+    def pack_outliers(self, outliers):
+        return {
+            "values": [_[0] for _ in outliers],
+            "datasets": [_[1] for _ in outliers],
+            "ranks": [_[2] for _ in outliers],
+        }
+
+    def gradients(self, moments, idx):
+        """
+        Gradients of the mean runtime of the datasets (0 for the datasets without rows).
+        """
+        ndatasets = len(self.datasets)
+        means = {}
+        for kind in self._METRICS:
+            target = moments[kind]["target"]
+            means[kind] = {
+                dataset: (
+                    target.mean[idx * ndatasets + _]
+                    if target.count[idx * ndatasets + _] > 0
+                    else 0
+                )
+                for _, dataset in enumerate(self.datasets)
+            }
+        return Gradients({}, binCount=self.RunBinCount).pack(
+            means["Inclusive"], means["Exclusive"]
+        )
+
+    def group_props(self, group, summary, idx, members):
+        """
+        Per-property values of the group `idx` for the ensemble and each dataset.
+        `members` are the indexes of its selected callsites ("name" property).
+        """
+        ndatasets = len(self.datasets)
+        hist_name = "callsite" if group == "callsite" else "module"
+        ensemble, targets = {}, {}
+        for kind in self._METRICS:
+            moments = summary[kind]
+            target = moments["target"]
+            callsite = self.callsite_summary[kind]
+            datasets = [
+                _ for _ in range(ndatasets) if target.count[idx * ndatasets + _] > 0
+            ]
+            hists = self.hists[kind]
+
+            ensemble[kind] = {
+                "rank": self.rank_means(group, kind, idx),
+                "name": callsite["ensemble"].mean[members],
+                "dataset": target.mean[
+                    idx * ndatasets + np.array(datasets, dtype=np.int64)
+                ],
+                "all_ranks": (
+                    hists[hist_name].centers(idx),
+                    hists[hist_name].counts[idx],
+                ),
+            }
+            targets[kind] = {}
+            for dataset in datasets:
+                code = idx * ndatasets + dataset
+                member_targets = members * ndatasets + dataset
+                member_targets = member_targets[
+                    callsite["target"].count[member_targets] > 0
+                ]
+                targets[kind][dataset] = {
+                    "rank": self.rank_means(group, kind, idx, dataset),
+                    "name": callsite["target"].mean[member_targets],
+                    "dataset": target.mean[[code]],
+                    "all_ranks": (
+                        hists[hist_name + "_target"].centers(code),
+                        hists[hist_name + "_target"].counts[code],
+                    ),
+                }
+        return ensemble, targets
+
+    # --------------------------------------------------------------------------
+    def callsite_data(self):
+        ret = {"ensemble": {}}
+        for dataset in self.datasets:
+            ret[dataset] = {}
+
+        ndatasets = len(self.datasets)
+        for idx, code in enumerate(self.selected):
+            callsite = self.callsites[code]
+            ensemble, targets = self.group_props(
+                "callsite", self.callsite_summary, idx, np.array([idx])
+            )
+            attributes = self.group_attributes([code])
+
+            ret["ensemble"][callsite] = self.pack_json(
+                {_: self.callsite_summary[_]["ensemble"] for _ in self._METRICS},
+                idx,
+                callsite,
+                attributes,
+                data={"Inclusive": [], "Exclusive": []},
+                gradients=self.gradients(self.callsite_summary, idx),
+                prop_hists={
+                    _: self.prop_histograms(ensemble[_]) for _ in self._METRICS
+                },
+                q={
+                    _: self.callsite_summary[_]["q"][idx].tolist()
+                    for _ in self._METRICS
+                },
+                outliers={
+                    _: self.pack_outliers(self.outliers[_]["ensemble"][idx])
+                    for _ in self._METRICS
+                },
+            )
+
+            for dataset in targets["Inclusive"]:
+                target = idx * ndatasets + dataset
+                ret[self.datasets[dataset]][callsite] = self.pack_json(
+                    {_: self.callsite_summary[_]["target"] for _ in self._METRICS},
+                    target,
+                    callsite,
+                    self.group_attributes([code], dataset),
+                    data={
+                        _: self.rank_means("callsite", _, idx, dataset).tolist()
+                        for _ in self._METRICS
+                    },
+                    prop_hists={
+                        _: self.prop_histograms(ensemble[_], targets[_][dataset])
+                        for _ in self._METRICS
+                    },
+                    q={
+                        _: self.callsite_summary[_]["target_q"][target].tolist()
+                        for _ in self._METRICS
+                    },
+                    outliers={
+                        _: self.pack_outliers(self.outliers[_]["target"][target])
+                        for _ in self._METRICS
+                    },
+                )
+        return ret
+
+    def module_data(self):
+        ret = {"ensemble": {}}
+        for dataset in self.datasets:
+            ret[dataset] = {}
+
+        ndatasets = len(self.datasets)
+        for idx, module in enumerate(self.modules):
+            members = np.flatnonzero(self.module_of == idx)
+            ensemble, targets = self.group_props(
+                "module", self.module_summary, idx, members
+            )
+            codes = self.selected[members]
+
+            ret["ensemble"][module] = self.pack_json(
+                {_: self.module_summary[_]["ensemble"] for _ in self._METRICS},
+                idx,
+                module,
+                self.group_attributes(codes),
+                data={"Inclusive": [], "Exclusive": []},
+                gradients=self.gradients(self.module_summary, idx),
+                prop_hists={
+                    _: self.prop_histograms(ensemble[_]) for _ in self._METRICS
+                },
+            )
+
+            for dataset in targets["Inclusive"]:
+                ret[self.datasets[dataset]][module] = self.pack_json(
+                    {_: self.module_summary[_]["target"] for _ in self._METRICS},
+                    idx * ndatasets + dataset,
+                    module,
+                    self.group_attributes(codes, dataset),
+                    data={
+                        _: self.rank_means("module", _, idx, dataset).tolist()
+                        for _ in self._METRICS
+                    },
+                    prop_hists={
+                        _: self.prop_histograms(ensemble[_], targets[_][dataset])
+                        for _ in self._METRICS
+                    },
+                )
+        return ret
+
+    def group_attributes(self, codes, dataset=None):
+        """
+        Distinct attributes of the callsites `codes` (in a dataset, if given),
+        in the order they are read.
+        """
+        datasets = range(len(self.datasets)) if dataset is None else [dataset]
+        keys = sorted(
+            [
+                (code, _)
+                for code in codes
+                for _ in datasets
+                if (code, _) in self.attributes
+            ],
+            key=self.attribute_order.get,
+        )
+
+        ret = {}
+        for name in ["module", "nid", "component_path", "component_level"]:
+            values = {}
+            for key in keys:
+                values.update(self.attributes[key][name])
+            ret[name] = list(values)
+
+        ret["dataset"] = [
+            self.datasets[_] for _ in datasets if any(key[1] == _ for key in keys)
+        ]
+        return ret
+
+    def get_module_callsite_map(self):
+        ret = {"ensemble": {}}
+        for dataset in self.datasets:
+            ret[dataset] = {}
+
+        for idx, module in enumerate(self.modules):
+            codes = self.selected[self.module_of == idx]
+            ret["ensemble"][module] = [self.callsites[_] for _ in codes]
+            for dataset_idx, dataset in enumerate(self.datasets):
+                callsites = [
+                    self.callsites[_]
+                    for _ in codes
+                    if (_, dataset_idx) in self.attributes
+                ]
+                if len(callsites) > 0:
+                    ret[dataset][module] = callsites
+        return ret
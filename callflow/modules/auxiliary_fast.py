@@ -13,6 +13,7 @@ import numpy as np
 import callflow
 from callflow.modules.gradients import Gradients
 from callflow.modules.boxplot import BoxPlot
+from callflow.modules.histogram_generic import GenericHistogram
 from callflow.timer import Timer
 
 LOGGER = callflow.get_logger(__name__)
@@ -32,6 +33,7 @@ class FastEnsembleAuxiliary:
     ):
         self.timer = Timer()
         self.df = self.select_rows(states["ensemble_entire"].new_gf.df, datasets)
+        self.path_table = states["ensemble_entire"].new_gf.path_table
         self.MPIBinCount = MPIBinCount
         self.RunBinCount = RunBinCount
         self.config = config
@@ -68,7 +70,7 @@ class FastEnsembleAuxiliary:
         ret["module"] = result["module"]
         ret["moduleCallsiteMap"] = result["moduleCallsiteMap"]
         ret["callsite"] = {}
-        group_df = self.df.groupby(["name"]).mean()
+        group_df = self.df.groupby(["name"], observed=True).mean()
         if self.config.filter_by == "time":
             f_group_df = group_df.loc[
                 group_df[self.config.filter_by] > self.config.filter_below
@@ -91,15 +93,15 @@ class FastEnsembleAuxiliary:
         return ret
 
     def filter_frames(self, nCallsites, attr):
-        xgroup_df = self.df.groupby(["name"]).mean()
+        xgroup_df = self.df.groupby(["name"], observed=True).mean()
         sort_xgroup_df = xgroup_df.sort_values(by=[attr], ascending=False)
         nCallsites_df = sort_xgroup_df.nlargest(nCallsites, attr)
         return nCallsites_df
 
     def group_frames(self):
-        self.module_name_group_df = self.df.groupby(["module", "name"])
-        self.module_group_df = self.df.groupby(["module"])
-        self.name_group_df = self.df.groupby(["name"])
+        self.module_name_group_df = self.df.groupby(["module", "name"], observed=True)
+        self.module_group_df = self.df.groupby(["module"], observed=True)
+        self.name_group_df = self.df.groupby(["name"], observed=True)
         self.target_df = {}
         self.target_module_group_df = {}
         self.target_module_name_group_df = {}
@@ -107,13 +109,13 @@ class FastEnsembleAuxiliary:
         for dataset in self.datasets:
             self.target_df[dataset] = self.df.loc[self.df["dataset"] == dataset]
             self.target_module_group_df[dataset] = self.target_df[dataset].groupby(
-                ["module"]
+                ["module"], observed=True
             )
             self.target_module_name_group_df[dataset] = self.target_df[dataset].groupby(
-                ["module", "name"]
+                ["module", "name"], observed=True
             )
             self.target_name_group_df[dataset] = self.target_df[dataset].groupby(
-                ["name"]
+                ["name"], observed=True
             )
 
     def select_rows(self, df, search_strings):
@@ -122,15 +124,6 @@ class FastEnsembleAuxiliary:
         mask = np.isin(IDs, unqIDs)
         return df[mask]
 
-    def histogram(self, data, data_min=np.nan, data_max=np.nan):
-        if np.isnan(data_min) or np.isnan(data_max):
-            data_min = data.min()
-            data_max = data.max()
-        h, b = np.histogram(
-            data, range=[data_min, data_max], bins=int(self.MPIBinCount)
-        )
-        return 0.5 * (b[1:] + b[:-1]), h
-
     def convert_pandas_array_to_list(self, series):
         return series.apply(lambda d: d.tolist())
 
@@ -189,7 +182,9 @@ class FastEnsembleAuxiliary:
             "module": df["module"].tolist()[0],
             "callers": df["callers"].unique().tolist(),
             "callees": df["callees"].unique().tolist(),
-            "component_path": df["component_path"].unique().tolist(),
+            "component_path": [
+                list(self.path_table.path(_)) for _ in df["component_path"].unique()
+            ],
             "component_level": df["component_level"].unique().tolist(),
             "Inclusive": {
                 "mean_time": df["time (inc)"].mean(),
@@ -222,130 +217,24 @@ class FastEnsembleAuxiliary:
         }
         return result
 
-    # Return the histogram in the required form.
-    def histogram_format(self, histogram_grid):
-        return {
-            "x": histogram_grid[0].tolist(),
-            "y": histogram_grid[1].tolist(),
-            "x_min": histogram_grid[0][0],
-            "x_max": histogram_grid[0][-1],
-            "y_min": np.min(histogram_grid[1]).astype(np.float64),
-            "y_max": np.max(histogram_grid[1]).astype(np.float64),
-        }
-
-    # Prop can be dataset, rank, name
-    def histogram_by_property_ensemble(self, ensemble_df, prop):
-        ret = {}
-        if prop == "all_ranks":
-            time_ensemble_inclusive_arr = np.array(ensemble_df["time (inc)"].tolist())
-            time_ensemble_exclusive_arr = np.array(ensemble_df["time"].tolist())
-        elif prop == "rank":
-            ensemble_prop = ensemble_df.groupby(["dataset", prop])[
-                ["time", "time (inc)"]
-            ].mean()
-            time_ensemble_inclusive_arr = np.array(ensemble_prop["time (inc)"])
-            time_ensemble_exclusive_arr = np.array(ensemble_prop["time"])
-        else:
-            ensemble_prop = ensemble_df.groupby([prop])[["time", "time (inc)"]].mean()
-            time_ensemble_inclusive_arr = np.array(ensemble_prop["time (inc)"])
-            time_ensemble_exclusive_arr = np.array(ensemble_prop["time"])
-        inclusive_max = time_ensemble_inclusive_arr.max()
-        inclusive_min = time_ensemble_inclusive_arr.min()
-        histogram_ensemble_inclusive_grid = self.histogram(
-            time_ensemble_inclusive_arr, inclusive_min, inclusive_max
-        )
-        exclusive_max = time_ensemble_exclusive_arr.max()
-        exclusive_min = time_ensemble_exclusive_arr.min()
-        histogram_ensemble_exclusive_grid = self.histogram(
-            time_ensemble_exclusive_arr, exclusive_min, exclusive_max
-        )
-        ret["Inclusive"] = {
-            "ensemble": self.histogram_format(histogram_ensemble_inclusive_grid),
-        }
-        ret["Exclusive"] = {
-            "ensemble": self.histogram_format(histogram_ensemble_exclusive_grid),
-        }
-        return ret
-
-    # Prop can be dataset, rank, name
-    def histogram_by_property(self, ensemble_df, target_df, prop):
-        ret = {}
-        if prop == "all_ranks":
-            time_ensemble_inclusive_arr = np.array(ensemble_df["time (inc)"].tolist())
-            time_ensemble_exclusive_arr = np.array(ensemble_df["time"].tolist())
-            time_target_inclusive_arr = np.array(target_df["time (inc)"].tolist())
-            time_target_exclusive_arr = np.array(target_df["time"].tolist())
-        elif prop == "rank":
-            ensemble_prop = ensemble_df.groupby(["dataset", prop])[
-                ["time", "time (inc)"]
-            ].mean()
-            target_prop = target_df.groupby(["dataset", prop])[
-                ["time", "time (inc)"]
-            ].mean()
-            time_ensemble_inclusive_arr = np.array(ensemble_prop["time (inc)"])
-            time_ensemble_exclusive_arr = np.array(ensemble_prop["time"])
-            time_target_inclusive_arr = np.array(target_prop["time (inc)"])
-            time_target_exclusive_arr = np.array(target_prop["time"])
-        else:
-            ensemble_prop = ensemble_df.groupby([prop])[["time", "time (inc)"]].mean()
-            target_prop = target_df.groupby([prop])[["time", "time (inc)"]].mean()
-            time_ensemble_inclusive_arr = np.array(ensemble_prop["time (inc)"])
-            time_ensemble_exclusive_arr = np.array(ensemble_prop["time"])
-            time_target_inclusive_arr = np.array(target_prop["time (inc)"])
-            time_target_exclusive_arr = np.array(target_prop["time"])
-        inclusive_max = max(
-            time_ensemble_inclusive_arr.max(), time_target_inclusive_arr.max()
-        )
-        inclusive_min = min(
-            time_ensemble_inclusive_arr.min(), time_target_inclusive_arr.min()
-        )
-        histogram_ensemble_inclusive_grid = self.histogram(
-            time_ensemble_inclusive_arr, inclusive_min, inclusive_max
-        )
-        histogram_target_inclusive_grid = self.histogram(
-            time_target_inclusive_arr, inclusive_min, inclusive_max
-        )
-        exclusive_max = max(
-            time_ensemble_exclusive_arr.max(), time_target_exclusive_arr.max()
-        )
-        exclusive_min = min(
-            time_ensemble_exclusive_arr.min(), time_target_exclusive_arr.min()
-        )
-        histogram_ensemble_exclusive_grid = self.histogram(
-            time_ensemble_exclusive_arr, exclusive_min, exclusive_max
-        )
-        histogram_target_exclusive_grid = self.histogram(
-            time_target_exclusive_arr, exclusive_min, exclusive_max
-        )
-        ret["Inclusive"] = {
-            "ensemble": self.histogram_format(histogram_ensemble_inclusive_grid),
-            "target": self.histogram_format(histogram_target_inclusive_grid),
-        }
-        ret["Exclusive"] = {
-            "ensemble": self.histogram_format(histogram_ensemble_exclusive_grid),
-            "target": self.histogram_format(histogram_target_exclusive_grid),
-        }
-        return ret
-
     # Callsite grouped information
     def callsite_data_old(self):
         ret = {}
         # Create the data dict.
         ensemble = {}
+        callsite_hists = GenericHistogram(self.df, "name", self.props, self.MPIBinCount)
+        callsite_gradients = Gradients(
+            self.target_df, binCount=self.RunBinCount
+        ).run_all("name")
         for callsite, callsite_df in self.name_group_df:
-            callsite_ensemble_df = self.name_group_df.get_group(callsite)
             hists = {}
             hists["Inclusive"] = {}
             hists["Exclusive"] = {}
             for prop in self.props:
-                prop_histograms = self.histogram_by_property_ensemble(
-                    callsite_ensemble_df, prop
-                )
+                prop_histograms = callsite_hists.ensemble(callsite, prop)
                 hists["Inclusive"][prop] = prop_histograms["Inclusive"]
                 hists["Exclusive"][prop] = prop_histograms["Exclusive"]
-            gradients = Gradients(self.target_df, binCount=self.RunBinCount).run(
-                columnName="name", callsiteOrModule=callsite
-            )
+            gradients = callsite_gradients[callsite]
             boxplot = BoxPlot(callsite_df)
             ensemble[callsite] = self.pack_json(
                 callsite_df,
@@ -362,16 +251,13 @@ class FastEnsembleAuxiliary:
             name_grouped = self.target_name_group_df[dataset]
             target = {}
             for callsite, callsite_df in name_grouped:
-                callsite_ensemble_df = self.name_group_df.get_group(callsite)
                 callsite_target_df = callsite_df
                 if not callsite_df.empty:
                     hists = {}
                     hists["Inclusive"] = {}
                     hists["Exclusive"] = {}
                     for prop in self.props:
-                        prop_histograms = self.histogram_by_property(
-                            callsite_ensemble_df, callsite_target_df, prop
-                        )
+                        prop_histograms = callsite_hists.target(callsite, dataset, prop)
                         hists["Inclusive"][prop] = prop_histograms["Inclusive"]
                         hists["Exclusive"][prop] = prop_histograms["Exclusive"]
                     boxplot = BoxPlot(callsite_df)
@@ -393,20 +279,23 @@ class FastEnsembleAuxiliary:
             filename = self.callsiteh5File
             mapping = self.callsiteMap
         ensemble = {}
+        node_dfs, node_hists = {}, {}
+        node_gradients = Gradients(self.target_df, binCount=self.RunBinCount).run_all(
+            col
+        )
         for node in nodes:
             module_ensemble_df = pd.read_hdf(filename, key=mapping[node])
+            node_dfs[node] = module_ensemble_df
+            node_hists[node] = GenericHistogram(
+                module_ensemble_df, col, self.props, self.MPIBinCount
+            )
             hists = {"Inclusive": {}, "Exclusive": {}}
             for prop in self.props:
-                prop_histograms = self.histogram_by_property_ensemble(
-                    module_ensemble_df, prop
-                )
+                prop_histograms = node_hists[node].ensemble(node, prop)
                 hists["Inclusive"][prop] = prop_histograms["Inclusive"]
                 hists["Exclusive"][prop] = prop_histograms["Exclusive"]
             # Calculate gradients
-            gradients = {"Inclusive": {}, "Exclusive": {}}
-            gradients = Gradients(self.target_df, binCount=self.RunBinCount).run(
-                columnName=col, callsiteOrModule=node
-            )
+            gradients = node_gradients[node]
             quartiles = {"Inclusive": {}, "Exclusive": {}}
             outliers = {"Inclusive": {}, "Exclusive": {}}
             if col == "name":
@@ -424,19 +313,17 @@ class FastEnsembleAuxiliary:
         ret["ensemble"] = ensemble
         for dataset in self.datasets:
             target = {}
-            module_target_df = module_ensemble_df.loc[
-                module_ensemble_df["dataset"] == dataset
-            ]
             for node in nodes:
+                module_target_df = node_dfs[node].loc[
+                    node_dfs[node]["dataset"] == dataset
+                ]
                 gradients = {"Inclusive": {}, "Exclusive": {}}
                 hists = {"Inclusive": {}, "Exclusive": {}}
                 quartiles = {"Inclusive": {}, "Exclusive": {}}
                 outliers = {"Inclusive": {}, "Exclusive": {}}
                 if module_target_df.shape[0] != 0:
                     for prop in self.props:
-                        prop_histograms = self.histogram_by_property(
-                            module_ensemble_df, module_target_df, prop
-                        )
+                        prop_histograms = node_hists[node].target(node, dataset, prop)
                         hists["Inclusive"][prop] = prop_histograms["Inclusive"]
                         hists["Exclusive"][prop] = prop_histograms["Exclusive"]
                     if col == "name":
@@ -455,7 +342,7 @@ class FastEnsembleAuxiliary:
         return ret
 
     def module_data(self):
-        module_group_df = self.df.groupby(["module"])
+        module_group_df = self.df.groupby(["module"], observed=True)
         self.moduleMap = {}
         count = 0
         for module, module_df in module_group_df:
@@ -466,7 +353,7 @@ class FastEnsembleAuxiliary:
             count += 1
 
     def callsite_data(self):
-        name_group_df = self.df.groupby(["name"])
+        name_group_df = self.df.groupby(["name"], observed=True)
         count = 0
         for name, name_df in name_group_df:
             callsite_ensemble_df = name_group_df.get_group(name)
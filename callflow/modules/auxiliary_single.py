@@ -4,8 +4,8 @@
 # SPDX-License-Identifier: MIT
 
 import os
-import json
 import numpy as np
+import pandas as pd
 
 # CallFlow imports
 try:
@@ -13,9 +13,12 @@ try:
 
     LOGGER = callflow.get_logger(__name__)
     from callflow.timer import Timer
+    from callflow.datastructures.auxiliary_store import AuxiliaryStore
 except Exception:
     raise Exception("Module callflow not found not found.")
 
+from callflow.algorithms.summaries import histograms
+
 
 class SingleAuxiliary:
     """
@@ -24,6 +27,7 @@ class SingleAuxiliary:
 
     def __init__(self, gf, dataset="", MPIBinCount=20, props={}, process=True):
         self.graph = gf.graph
+        self.gf = gf
         self.df = gf.df
         self.props = props
         self.process = process
@@ -50,129 +54,127 @@ class SingleAuxiliary:
         name = name.replace(">", "")
         return name
 
-    def histogram(self, data):
-        h, b = np.histogram(data, range=[0, data.max()], bins=int(self.binCount))
-        return 0.5 * (b[1:] + b[:-1]), h
-
     def get_module_callsite_map(self):
         ret = {}
         ret["ensemble"] = {}
-        modules = self.df["module"].unique().tolist()
-        for module in modules:
-            callsites = (
-                self.df.loc[self.df["module"] == module]["name"].unique().tolist()
-            )
-            ret["ensemble"][module] = callsites
+        pairs = self.df[["module", "name"]].drop_duplicates()
+        for module, callsite in zip(pairs["module"].tolist(), pairs["name"].tolist()):
+            ret["ensemble"].setdefault(module, []).append(callsite)
         return ret
 
     def get_callsite_module_map(self):
         ret = {}
         callsites = self.df["name"].unique().tolist()
         for callsite in callsites:
-            module = (
-                self.df.loc[self.df["name"] == callsite]["module"].unique().tolist()
-            )
+            module = self.gf.lookup_with_name(callsite)["module"].unique().tolist()
             ret[callsite] = module
         return ret
 
-    def pack_json(self, group_df, node_name, data_type):
-        # df = self.df.loc[self.df["name"] == node_name]
-        with self.timer.phase("Calculate Histograms"):
-            # time_inc_ensemble_arr = np.array(df["time (inc)"].tolist())
-            # time_exc_ensemble_arr = np.array(df["time"].tolist())
-            time_inc_target_arr = np.array(group_df["time (inc)"].tolist())
-            time_exc_target_arr = np.array(group_df["time"].tolist())
-            # histogram_inc_array = np.concatenate(
-            #     (time_inc_target_arr, time_inc_ensemble_arr), axis=0
-            # )
-            # histogram_exc_array = np.concatenate(
-            #     (time_exc_target_arr, time_exc_ensemble_arr), axis=0
-            # )
-            hist_inc_grid = self.histogram(time_inc_target_arr)
-            hist_exc_grid = self.histogram(time_exc_target_arr)
-        if "rank" not in group_df.keys():
-            group_df = group_df.reset_index(drop=False)
-        result = {
-            "name": node_name,
-            "time (inc)": group_df["time (inc)"].tolist(),
-            "time": group_df["time"].tolist(),
-            "sorted_time (inc)": group_df["time (inc)"].sort_values().tolist(),
-            "sorted_time": group_df["time"].sort_values().tolist(),
-            "rank": group_df["rank"].tolist(),
-            "id": "node-" + str(group_df["nid"].tolist()[0]),
-            "mean_time (inc)": group_df["time (inc)"].mean(),
-            "mean_time": group_df["time"].mean(),
-            "max_time (inc)": group_df["time (inc)"].max(),
-            "max_time": group_df["time"].max(),
-            "min_time (inc)": group_df["time (inc)"].min(),
-            "min_time": group_df["time"].min(),
-            "dataset": group_df["dataset"].tolist(),
-            "module": group_df["module"].tolist()[0],
-            "hist_time (inc)": {
-                "x": hist_inc_grid[0].tolist(),
-                "y": hist_inc_grid[1].tolist(),
-                "x_min": hist_inc_grid[0][0],
-                "x_max": hist_inc_grid[0][-1],
-                "y_min": np.min(hist_inc_grid[1]).astype(np.float64),
-                "y_max": np.max(hist_inc_grid[1]).astype(np.float64),
-            },
-            "hist_time": {
-                "x": hist_exc_grid[0].tolist(),
-                "y": hist_exc_grid[1].tolist(),
-                "x_min": hist_exc_grid[0][0],
-                "x_max": hist_exc_grid[0][-1],
-                "y_min": np.min(hist_exc_grid[1]).astype(np.float64),
-                "y_max": np.max(hist_exc_grid[1]).astype(np.float64),
-            },
+    # Return the histogram in the required form.
+    def histogram_format(self, histogram_grid):
+        return {
+            "x": histogram_grid[0].tolist(),
+            "y": histogram_grid[1].tolist(),
+            "x_min": histogram_grid[0][0],
+            "x_max": histogram_grid[0][-1],
+            "y_min": np.min(histogram_grid[1]).astype(np.float64),
+            "y_max": np.max(histogram_grid[1]).astype(np.float64),
         }
-        return result
 
-    # # Callsite grouped information
-    def callsite_data(self):
-        data_type = "callsite"
+    def group_data(self, column):
+        """
+        Payload of each callsite (or module), in a single grouped pass.
+        The rows are sorted by their group once (keeping their order within a
+        group), so the rows of a group are a slice of the sorted columns. The
+        runtimes are sorted within the groups by a single sort too.
+        """
+        df = self.df
+        if "rank" not in df.columns:
+            df = df.reset_index(drop=False)
+
+        codes, groups = pd.factorize(df[column])
+        order = np.argsort(codes, kind="stable")
+        codes = codes[order]
+        bounds = np.searchsorted(codes, np.arange(len(groups) + 1))
+        starts, stops = bounds[:-1], bounds[1:]
+
+        lists = {
+            _: df[_].values[order].tolist()
+            for _ in ["rank", "nid", "dataset", "module"]
+        }
+        stats = {}
+        for metric in ["time (inc)", "time"]:
+            values = df[metric].values.astype(np.float64)[order]
+            sorted_values = values[np.lexsort((values, codes))]
+            stats[metric] = {
+                "mean": (np.add.reduceat(values, starts) / (stops - starts)).tolist(),
+                "min": sorted_values[starts].tolist(),
+                "max": sorted_values[stops - 1].tolist(),
+                "hist": histograms(
+                    codes,
+                    values,
+                    np.zeros(len(groups)),
+                    sorted_values[stops - 1],
+                    int(self.binCount),
+                ),
+            }
+            lists[metric] = values.tolist()
+            lists["sorted_" + metric] = sorted_values.tolist()
+
         ret = {}
-        ## Ensemble data.
-        # Group callsite by the name
-        name_grouped = self.df.groupby(["name"])
-        # Create the data dict.
-        ensemble = {}
-        for name, group_df in name_grouped:
-            name_df = self.df.loc[self.df["name"] == name]
-            ensemble[name] = self.pack_json(name_df, name, data_type)
-        ret[self.dataset] = ensemble
+        for idx, group in enumerate(groups):
+            start, stop = starts[idx], stops[idx]
+            ret[group] = {
+                "name": group,
+                "time (inc)": lists["time (inc)"][start:stop],
+                "time": lists["time"][start:stop],
+                "sorted_time (inc)": lists["sorted_time (inc)"][start:stop],
+                "sorted_time": lists["sorted_time"][start:stop],
+                "rank": lists["rank"][start:stop],
+                "id": "node-" + str(lists["nid"][start]),
+                "mean_time (inc)": stats["time (inc)"]["mean"][idx],
+                "mean_time": stats["time"]["mean"][idx],
+                "max_time (inc)": stats["time (inc)"]["max"][idx],
+                "max_time": stats["time"]["max"][idx],
+                "min_time (inc)": stats["time (inc)"]["min"][idx],
+                "min_time": stats["time"]["min"][idx],
+                "dataset": lists["dataset"][start:stop],
+                "module": lists["module"][start],
+                "hist_time (inc)": self.histogram_format(
+                    [_[idx] for _ in stats["time (inc)"]["hist"]]
+                ),
+                "hist_time": self.histogram_format(
+                    [_[idx] for _ in stats["time"]["hist"]]
+                ),
+            }
         return ret
 
+    # # Callsite grouped information
+    def callsite_data(self):
+        with self.timer.phase("Pack Callsite data"):
+            return {self.dataset: self.group_data("name")}
+
     def module_data(self):
-        data_type = "module"
-        ret = {}
-        # Module grouped information
-        modules = self.df["module"].unique()
-        ensemble = {}
-        for module in modules:
-            module_df = self.df[self.df["module"] == module]
-            ensemble[module] = self.pack_json(module_df, module, data_type)
-        ret[self.dataset] = ensemble
-        return ret
+        with self.timer.phase("Pack Module data"):
+            return {self.dataset: self.group_data("module")}
 
     def run(self):
         ret = {}
-        path = self.props["save_path"] + f"/{self.dataset}/auxiliary_data.json"
+        path = os.path.join(self.props["save_path"], self.dataset)
         # self.process = True
-        if os.path.exists(path) and not self.process:
-            LOGGER.info(f"[Callsite info] Reading the data from file {path}")
-            with open(path, "r") as f:
-                ret = json.load(f)
+        if AuxiliaryStore.exists(path) and not self.process:
+            LOGGER.info(f"[Callsite info] Reading the data from {path}")
+            store = AuxiliaryStore(path)
+            ret = store.to_dict()
+            store.close()
         else:
             LOGGER.info(f"Processing: {self.dataset}")
-            # with self.timer.phase("Pack Callsite data"):
             ret["callsite"] = self.callsite_data()
-            # with self.timer.phase("Pack Module data"):
             ret["module"] = self.module_data()
             with self.timer.phase("Module callsite map data"):
                 ret["moduleCallsiteMap"] = self.get_module_callsite_map()
             # with self.timer.phase("Callsite module map data"):
             #     ret['callsiteModuleMap'] = self.get_callsite_module_map()
             with self.timer.phase("Writing data"):
-                with open(path, "w") as f:
-                    json.dump(ret, f)
+                AuxiliaryStore.write(path, ret)
         return ret
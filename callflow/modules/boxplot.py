@@ -3,11 +3,11 @@
 #
 # SPDX-License-Identifier: MIT
 
-from scipy.stats import iqr
-import collections
+import collections.abc
 import numpy as np
 
 import callflow
+from callflow.algorithms.summaries import KLLSketch
 
 LOGGER = callflow.get_logger(__name__)
 
@@ -15,17 +15,95 @@ LOGGER = callflow.get_logger(__name__)
 class BoxPlot:
     """
     Boxplot computation
+
+    In sketch mode, the quartiles are estimated by a rank-error quantile sketch
+    (refer KLLSketch) instead of sorting the values, and the outliers list only
+    the outlier values (and their datasets and ranks). Boxplots in sketch mode can be
+    merged (e.g., the runs of an ensemble), refer BoxPlot.merge.
     """
 
-    def __init__(self, df):
+    _METRICS = {"Inclusive": "time (inc)", "Exclusive": "time"}
+
+    _QUARTILES = [0, 0.25, 0.5, 0.75, 1.0]
+
+    def __init__(self, df=None, sketch=False, k=200):
+        self.sketch = sketch
         self.q = {}
+        self.outliers = {}
+        if df is None:
+            return
+
+        if sketch:
+            self.sketches = {}
+            for kind, attr in BoxPlot._METRICS.items():
+                self.sketches[kind] = KLLSketch(k)
+                self.sketches[kind].update(df[attr].values)
+            self.q = self.sketch_quartiles()
+            self.outliers = {
+                kind: self.sketch_outliers(
+                    df[attr].values,
+                    df["dataset"].values,
+                    df["rank"].values,
+                    self.q[kind],
+                )
+                for kind, attr in BoxPlot._METRICS.items()
+            }
+            return
+
         self.q["Inclusive"] = self.quartiles(df, attr="time (inc)")
         self.q["Exclusive"] = self.quartiles(df, attr="time")
 
-        self.outliers = {}
         self.outliers["Inclusive"] = self.iqr_outlier(df, attr="time (inc)", axis=0)
         self.outliers["Exclusive"] = self.iqr_outlier(df, attr="time", axis=0)
 
+    @staticmethod
+    def merge(boxplots):
+        """
+        Returns the boxplot of the union of the rows of the `boxplots` (in sketch mode).
+        The outliers are the outliers of the boxplots beyond the merged quartiles,
+        i.e., a value within the quartiles of its own boxplot is not listed.
+        """
+        assert all(_.sketch for _ in boxplots)
+        ret = BoxPlot(sketch=True)
+        ret.sketches = {}
+        for kind in BoxPlot._METRICS:
+            ret.sketches[kind] = KLLSketch(boxplots[0].sketches[kind].k)
+            for boxplot in boxplots:
+                ret.sketches[kind].merge(boxplot.sketches[kind])
+        ret.q = ret.sketch_quartiles()
+
+        for kind in BoxPlot._METRICS:
+            candidates = {
+                _: np.concatenate([boxplot.outliers[kind][_] for boxplot in boxplots])
+                for _ in ["values", "datasets", "ranks"]
+            }
+            ret.outliers[kind] = ret.sketch_outliers(
+                candidates["values"],
+                candidates["datasets"],
+                candidates["ranks"],
+                ret.q[kind],
+            )
+        return ret
+
+    def sketch_quartiles(self):
+        return {
+            kind: self.sketches[kind].quantiles(BoxPlot._QUARTILES)
+            for kind in BoxPlot._METRICS
+        }
+
+    def sketch_outliers(self, values, datasets, ranks, q, bar=1.5):
+        """
+        Returns the values beyond `bar` IQRs of the quartiles `q`.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        iqr_distance = (q[3] - q[1]) * bar
+        mask = (values < q[1] - iqr_distance) | (values > q[3] + iqr_distance)
+        return {
+            "values": values[mask].tolist(),
+            "datasets": np.asarray(datasets)[mask].tolist(),
+            "ranks": np.asarray(ranks)[mask].tolist(),
+        }
+
     def median(self, arr):
         indices = []
 
@@ -47,9 +125,7 @@ class BoxPlot:
         pass
 
     def quartiles(self, df, attr=""):
-        samples = sorted(df[attr].tolist())
-        quartiles = np.quantile(np.array(samples), [0, 0.25, 0.5, 0.75, 1.0]).tolist()
-        return quartiles
+        return np.quantile(df[attr].values, BoxPlot._QUARTILES).tolist()
 
     def q1(self, x, axis=None):
         return np.percentile(x, 25, axis=axis)
@@ -63,14 +139,13 @@ class BoxPlot:
         data = np.array(df[attr])
         dataset_data = np.array(df["dataset"])
         rank_data = np.array(df["rank"])
-        d_iqr = iqr(data, axis=axis)
-        d_q1 = self.q1(data, axis=axis)
-        d_q3 = self.q3(data, axis=axis)
+        d_q1, d_q3 = np.percentile(data, [25, 75], axis=axis)
+        d_iqr = d_q3 - d_q1
         iqr_distance = np.multiply(d_iqr, bar)
 
         stat_shape = list(data.shape)
 
-        if isinstance(axis, collections.Iterable):
+        if isinstance(axis, collections.abc.Iterable):
             for single_axis in axis:
                 stat_shape[single_axis] = 1
         else:
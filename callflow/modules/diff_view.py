@@ -14,12 +14,19 @@ try:
 except Exception:
     raise Exception("Module callflow not found not found.")
 
+from callflow.algorithms.summaries import histograms
+
 
 class DiffView:
+
+    # Dataframe columns read by the module.
+    _DF_COLUMNS = ["name", "module", "dataset", "rank", "time", "time (inc)"]
+
     def __init__(self, state, dataset1, dataset2, col):
         self.state = state
-        self.df1 = self.state.gf.df.loc[self.state.gf.df["dataset"] == dataset1]
-        self.df2 = self.state.gf.df.loc[self.state.gf.df["dataset"] == dataset2]
+        self.df = self.state.gf.select(DiffView._DF_COLUMNS)
+        self.df1 = self.state.gf.lookup_with_dataset(dataset1, DiffView._DF_COLUMNS)
+        self.df2 = self.state.gf.lookup_with_dataset(dataset2, DiffView._DF_COLUMNS)
 
         self.col = col
         self.dataset1 = dataset1
@@ -34,11 +41,12 @@ class DiffView:
 
     def run(self):
         results = []
-        nodes = self.state.gf.df["module"].unique()
+        nodes = self.df["module"].unique()
 
         for node in nodes:
             results.append(self.calculate_diff(node))
 
+        self.histograms(results)
         return results
 
     def iqr(self, arr):
@@ -48,9 +56,33 @@ class DiffView:
         self.q2 = stats.scoreatpercentile(a, 50)
         self.q3 = stats.scoreatpercentile(a, 75)
 
-    def histogram(self, data, nbins=20):
-        h, b = np.histogram(data, range=[data.min(), data.max()], bins=nbins)
-        return 0.5 * (b[1:] + b[:-1]), h
+    def histograms(self, results, nbins=20):
+        """
+        Histograms of the differences of all modules, in a single pass.
+        """
+        diffs = [np.asarray(_["diff"]) for _ in results if len(_["diff"]) != 0]
+        if len(diffs) == 0:
+            return
+
+        codes = np.repeat(np.arange(len(diffs)), [len(_) for _ in diffs])
+        lo = [_.min() for _ in diffs]
+        hi = [_.max() for _ in diffs]
+        centers, counts = histograms(codes, np.concatenate(diffs), lo, hi, nbins)
+
+        idx = 0
+        for result in results:
+            if len(result["diff"]) == 0:
+                continue
+            result["bins"] = nbins
+            result["hist"] = {
+                "x": centers[idx].tolist(),
+                "y": counts[idx].tolist(),
+                "x_min": centers[idx][0],
+                "x_max": centers[idx][-1],
+                "y_min": float(counts[idx].min()),
+                "y_max": float(counts[idx].max()),
+            }
+            idx += 1
 
     def freedman_diaconis_bins(self, arr):
         """Calculate number of hist bins using Freedman-Diaconis rule."""
@@ -136,26 +168,15 @@ class DiffView:
 
         LOGGER.debug(f"Mean differences {mean_diff}")
 
-        dist_list = np.sort(diff).tolist()
-
-        # Calculate appropriate number of bins automatically.
+        # The histograms of the modules with differences are computed
+        # together (refer DiffView.histograms).
         num_of_bins = 20
-
-        if len(dist_list) != 0:
-            hist_grid = self.histogram(np.array(dist_list))
-            hist_x_min = hist_grid[0][0]
-            hist_x_max = hist_grid[0][-1]
-            hist_y_min = float(np.min(hist_grid[1]).astype(np.float64))
-            hist_y_max = float(np.max(hist_grid[1]).astype(np.float64))
-            x = hist_grid[0].tolist()
-            y = hist_grid[1].tolist()
-        else:
-            hist_x_min = 0
-            hist_x_max = 0
-            hist_y_min = 0
-            hist_y_max = 0
-            x = 0
-            y = 0
+        hist_x_min = 0
+        hist_x_max = 0
+        hist_y_min = 0
+        hist_y_max = 0
+        x = 0
+        y = 0
 
         result = {
             "name": module,
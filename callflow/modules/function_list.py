@@ -5,7 +5,6 @@
 
 import pandas as pd
 import networkx as nx
-from ast import literal_eval as make_tuple
 
 # CallFlow imports
 try:
@@ -25,6 +24,7 @@ class FunctionList:
         self.graph = state.new_gf.graph
         self.df = state.new_gf.df
         self.entire_df = state.new_entire_gf.df
+        self.path_table = state.new_gf.path_table
         # Processing for the modFunc format to get the module name
         if "=" in modFunc:
             self.function = modFunc.split("=")[1]
@@ -38,8 +38,7 @@ class FunctionList:
     def add_paths(self, path_name):
         for idx, row in self.df.iterrows():
             path = row[path_name]
-            if isinstance(path, str):
-                path = make_tuple(path)
+            path = self.path_table.path(path)
             corrected_path = path[0]
             if len(corrected_path) >= 2:
                 source = corrected_path[-2]
@@ -5,9 +5,12 @@
 
 import math
 import numpy as np
+import pandas as pd
 from scipy import stats
 import statsmodels.nonparametric.api as smnp
 
+from callflow.algorithms.summaries import Histogram
+
 
 class Gradients:
     def __init__(self, dfs, binCount="20"):
@@ -84,20 +87,22 @@ class Gradients:
             data_min = data.min()
             data_max = data.max()
 
-        h, b = np.histogram(data, range=[data_min, data_max], bins=int(self.binCount))
+        hist = Histogram([data_min], [data_max], int(self.binCount))
+        hist.update(np.zeros(len(data), dtype=np.int64), data)
+        h = hist.counts[0]
+        b = hist.edges(0, np.arange(hist.bins + 1))
 
-        # Map the datasets to their histogram indexes.
-        dataset_position_dict = {}
-        for dataset in dataset_dict:
-            mean = dataset_dict[dataset]
-            for idx, x in np.ndenumerate(b):
-                if x > float(mean):
-                    dataset_position_dict[dataset] = idx[0] - 1
-                    break
-                if idx[0] == len(b) - 1:
-                    dataset_position_dict[dataset] = len(b) - 2
+        return 0.5 * (b[1:] + b[:-1]), h, self.positions(b, dataset_dict)
 
-        return 0.5 * (b[1:] + b[:-1]), h, dataset_position_dict
+    def positions(self, edges, dataset_dict):
+        """
+        Map the datasets to the histogram indexes of their means (the last bin
+        includes its right edge).
+        """
+        means = np.array([float(_) for _ in dataset_dict.values()])
+        ret = np.searchsorted(edges, means, side="right") - 1
+        ret = np.minimum(ret, len(edges) - 2)
+        return dict(zip(dataset_dict.keys(), ret.tolist()))
 
     def clean_dict(self, in_dict):
         ret = {k: in_dict[k] for k in in_dict if not math.isnan(in_dict[k])}
@@ -127,9 +132,6 @@ class Gradients:
     def run(self, columnName="name", callsiteOrModule="", targetDataset=""):
         dist_inc = {}
         dist_exc = {}
-        num_of_bins = {}
-        hist_inc_grid = {}
-        hist_exc_grid = {}
 
         # Get the runtimes for all the runs.
         for idx, dataset in enumerate(self.dfs):
@@ -141,19 +143,86 @@ class Gradients:
             dist_exc[dataset] = self.get_runtime_data(node_df, "time", debug)
 
         # convert the dictionary of values to list of values.
-        temp_inc = self.convert_dictmean_to_list(dist_inc)
-        dist_inc_list = temp_inc[0]
-        dataset_inc_list = temp_inc[1]
+        dataset_inc_list = self.convert_dictmean_to_list(dist_inc)[1]
+        dataset_exc_list = self.convert_dictmean_to_list(dist_exc)[1]
+
+        return self.pack(dataset_inc_list, dataset_exc_list)
+
+    def means(self, columnName="name"):
+        """
+        Mean runtime of each node (callsite or module) in each run, i.e., the mean
+        over its ranks (of the last row of each rank), and 0 if it is not in the run.
+        Returns the nodes, and the means of each metric (node x run array).
+        """
+        means = []
+        for dataset in self.dfs:
+            df = self.dfs[dataset].drop_duplicates([columnName, "rank"], keep="last")
+            means.append(
+                df.groupby(columnName, observed=True)[["time (inc)", "time"]].mean()
+            )
+
+        nodes = pd.unique(np.concatenate([_.index.values for _ in means]))
+        ret = {}
+        for metric in ["time (inc)", "time"]:
+            ret[metric] = np.column_stack(
+                [_[metric].reindex(nodes).fillna(0).values for _ in means]
+            )
+        return nodes, ret
+
+    def run_all(self, columnName="name"):
+        """
+        Gradients of all the nodes (refer run) from a single grouped pass over
+        the runs, i.e., the means of all nodes are binned at once.
+        Returns {node: gradients}.
+        """
+        if len(self.dfs) == 0:
+            return {}
 
-        temp_exc = self.convert_dictmean_to_list(dist_exc)
-        dist_exc_list = temp_exc[0]
-        dataset_exc_list = temp_exc[1]
+        nodes, means = self.means(columnName)
+        datasets = list(self.dfs)
+        bins = int(self.binCount)
+        indices = np.arange(len(nodes))
+
+        grids = {}
+        for metric, values in means.items():
+            hist = Histogram(values.min(axis=1), values.max(axis=1), bins)
+            hist.update(np.repeat(indices, len(datasets)), values.ravel())
+            edges = hist.edges(indices[:, None], np.arange(bins + 1))
+            grids[metric] = (hist.centers(indices), hist.counts, edges)
+
+        ret = {}
+        for idx, node in enumerate(nodes):
+            dataset_dicts, hist_grids = [], []
+            for metric in ["time (inc)", "time"]:
+                dataset_dict = dict(zip(datasets, means[metric][idx].tolist()))
+                centers, counts, edges = grids[metric]
+                dataset_dicts.append(dataset_dict)
+                hist_grids.append(
+                    (
+                        centers[idx],
+                        counts[idx],
+                        self.positions(edges[idx], dataset_dict),
+                    )
+                )
+            ret[node] = self.pack(*dataset_dicts, *hist_grids)
+        return ret
+
+    def pack(
+        self, dataset_inc_list, dataset_exc_list, hist_inc_grid=None, hist_exc_grid=None
+    ):
+        """
+        Histograms of the mean runtimes of the datasets ({dataset: mean}).
+        """
+        dist_inc_list = list(dataset_inc_list.values())
+        dist_exc_list = list(dataset_exc_list.values())
 
         # Calculate appropriate number of bins automatically.
         num_of_bins = self.binCount
 
-        hist_inc_grid = self.histogram(np.array(dist_inc_list), dataset_inc_list)
-        hist_exc_grid = self.histogram(np.array(dist_exc_list), dataset_exc_list)
+        if hist_inc_grid is None:
+            hist_inc_grid = self.histogram(np.array(dist_inc_list), dataset_inc_list)
+        if hist_exc_grid is None:
+            hist_exc_grid = self.histogram(np.array(dist_exc_list), dataset_exc_list)
 
         # max_num_of_bins = min(self.freedman_diaconis_bins(np.array(dist_list)), 50)
 
@@ -4,11 +4,109 @@
 # SPDX-License-Identifier: MIT
 
 import numpy as np
+import pandas as pd
+
+from callflow.algorithms.summaries import histograms
 
 
 class GenericHistogram:
-    def __init__(self):
-        pass
+    """
+    Histograms of the runtimes of the groups of rows (e.g., callsites or modules)
+    by a property, computed for all groups at once (refer summaries.histograms):
+        - "all_ranks": the runtimes of the rows.
+        - "rank": the mean runtime of each (dataset, rank).
+        - other properties (e.g., "name", "dataset"): the mean runtime of each value.
+
+    The target histograms of a group (i.e., its rows of a dataset) and the
+    ensemble histogram they are shown with share the range of both.
+    """
+
+    _METRICS = {"Inclusive": "time (inc)", "Exclusive": "time"}
+
+    def __init__(
+        self, df, column, props=["rank", "name", "dataset", "all_ranks"], binCount=20
+    ):
+        self.props = props
+        self.binCount = int(binCount)
+
+        codes, self.groups = pd.factorize(df[column])
+        self.group_ids = {_: idx for idx, _ in enumerate(self.groups)}
+        dataset_codes, self.datasets = pd.factorize(df["dataset"])
+        self.dataset_ids = {_: idx for idx, _ in enumerate(self.datasets)}
+
+        keys = {"group": codes, "dataset": dataset_codes}
+        for prop in props:
+            if prop not in ["all_ranks", "dataset"]:
+                keys[prop] = pd.factorize(df[prop])[0]
+        self.df = pd.DataFrame(keys)
+        for metric in GenericHistogram._METRICS.values():
+            self.df[metric] = df[metric].values
+
+        # {prop: (centers, counts)} of each metric, and the same for the
+        # targets {(prop, dataset): (centers, counts)}.
+        self.ensemble_hists = {_: {} for _ in GenericHistogram._METRICS}
+        self.target_hists = {_: {} for _ in GenericHistogram._METRICS}
+        for prop in props:
+            self.compute(prop)
+
+    def values(self, prop, target=False):
+        """
+        Values of the property (and the group and dataset of each).
+        """
+        if prop == "all_ranks":
+            return self.df
+        if prop == "rank":
+            keys = ["group", "dataset", "rank"]
+        elif prop == "dataset" or target:
+            keys = ["group", "dataset"] + ([prop] if prop != "dataset" else [])
+        else:
+            keys = ["group", prop]
+        return self.df.groupby(keys, sort=False).mean().reset_index()
+
+    def compute(self, prop):
+        ngroups, ndatasets = len(self.groups), len(self.datasets)
+        ensemble = self.values(prop)
+        target = self.values(prop, target=True)
+
+        for kind, metric in GenericHistogram._METRICS.items():
+            codes, values = ensemble["group"].values, ensemble[metric].values
+            lo = np.full(ngroups, np.inf)
+            hi = np.full(ngroups, -np.inf)
+            np.minimum.at(lo, codes, values)
+            np.maximum.at(hi, codes, values)
+            self.ensemble_hists[kind][prop] = histograms(
+                codes, values, lo, hi, self.binCount
+            )
+
+            # Range of each (group, dataset) target, including the ensemble.
+            target_codes = target["group"].values * ndatasets + target["dataset"].values
+            target_values = target[metric].values
+            target_lo = np.repeat(lo, ndatasets)
+            target_hi = np.repeat(hi, ndatasets)
+            np.minimum.at(target_lo, target_codes, target_values)
+            np.maximum.at(target_hi, target_codes, target_values)
+            target_lo = target_lo.reshape(ngroups, ndatasets)
+            target_hi = target_hi.reshape(ngroups, ndatasets)
+
+            by_dataset = target["dataset"].values
+            for dataset in range(ndatasets):
+                mask = by_dataset == dataset
+                self.target_hists[kind][(prop, dataset)] = (
+                    histograms(
+                        codes,
+                        values,
+                        target_lo[:, dataset],
+                        target_hi[:, dataset],
+                        self.binCount,
+                    ),
+                    histograms(
+                        target["group"].values[mask],
+                        target_values[mask],
+                        target_lo[:, dataset],
+                        target_hi[:, dataset],
+                        self.binCount,
+                    ),
+                )
 
     # Return the histogram in the required form.
     def histogram_format(self, histogram_grid):
@@ -21,113 +119,32 @@ class GenericHistogram:
             "y_max": np.max(histogram_grid[1]).astype(np.float64),
         }
 
-    # Prop can be dataset, rank, name
-    def ensemble(self, ensemble_df, prop):
-        ret = {}
-
-        if prop == "all_ranks":
-            time_ensemble_inclusive_arr = np.array(ensemble_df["time (inc)"].tolist())
-            time_ensemble_exclusive_arr = np.array(ensemble_df["time"].tolist())
-
-        elif prop == "rank":
-            ensemble_prop = ensemble_df.groupby(["dataset", prop])[
-                ["time", "time (inc)"]
-            ].mean()
-            time_ensemble_inclusive_arr = np.array(ensemble_prop["time (inc)"])
-            time_ensemble_exclusive_arr = np.array(ensemble_prop["time"])
-
-        else:
-            ensemble_prop = ensemble_df.groupby([prop])[["time", "time (inc)"]].mean()
-
-            time_ensemble_inclusive_arr = np.array(ensemble_prop["time (inc)"])
-            time_ensemble_exclusive_arr = np.array(ensemble_prop["time"])
-
-        inclusive_max = time_ensemble_inclusive_arr.max()
-        inclusive_min = time_ensemble_inclusive_arr.min()
+    def _grid(self, hist, idx):
+        centers, counts = hist
+        return centers[idx], counts[idx]
 
-        histogram_ensemble_inclusive_grid = self.histogram(
-            time_ensemble_inclusive_arr, inclusive_min, inclusive_max
-        )
-
-        exclusive_max = time_ensemble_exclusive_arr.max()
-        exclusive_min = time_ensemble_exclusive_arr.min()
-        histogram_ensemble_exclusive_grid = self.histogram(
-            time_ensemble_exclusive_arr, exclusive_min, exclusive_max
-        )
-
-        ret["Inclusive"] = {
-            "ensemble": self.histogram_format(histogram_ensemble_inclusive_grid),
-        }
-        ret["Exclusive"] = {
-            "ensemble": self.histogram_format(histogram_ensemble_exclusive_grid),
+    # Prop can be dataset, rank, name
+    def ensemble(self, group, prop):
+        idx = self.group_ids[group]
+        return {
+            kind: {
+                "ensemble": self.histogram_format(
+                    self._grid(self.ensemble_hists[kind][prop], idx)
+                )
+            }
+            for kind in GenericHistogram._METRICS
         }
-        return ret
 
     # Prop can be dataset, rank, name
-    def target(self, ensemble_df, target_df, prop):
+    def target(self, group, dataset, prop):
+        idx = self.group_ids[group]
         ret = {}
-
-        if prop == "all_ranks":
-            time_ensemble_inclusive_arr = np.array(ensemble_df["time (inc)"].tolist())
-            time_ensemble_exclusive_arr = np.array(ensemble_df["time"].tolist())
-
-            time_target_inclusive_arr = np.array(target_df["time (inc)"].tolist())
-            time_target_exclusive_arr = np.array(target_df["time"].tolist())
-        elif prop == "rank":
-            ensemble_prop = ensemble_df.groupby(["dataset", prop])[
-                ["time", "time (inc)"]
-            ].mean()
-            target_prop = target_df.groupby(["dataset", prop])[
-                ["time", "time (inc)"]
-            ].mean()
-
-            time_ensemble_inclusive_arr = np.array(ensemble_prop["time (inc)"])
-            time_ensemble_exclusive_arr = np.array(ensemble_prop["time"])
-
-            time_target_inclusive_arr = np.array(target_prop["time (inc)"])
-            time_target_exclusive_arr = np.array(target_prop["time"])
-        else:
-            ensemble_prop = ensemble_df.groupby([prop])[["time", "time (inc)"]].mean()
-            target_prop = target_df.groupby([prop])[["time", "time (inc)"]].mean()
-
-            time_ensemble_inclusive_arr = np.array(ensemble_prop["time (inc)"])
-            time_ensemble_exclusive_arr = np.array(ensemble_prop["time"])
-
-            time_target_inclusive_arr = np.array(target_prop["time (inc)"])
-            time_target_exclusive_arr = np.array(target_prop["time"])
-
-        inclusive_max = max(
-            time_ensemble_inclusive_arr.max(), time_target_inclusive_arr.max()
-        )
-        inclusive_min = min(
-            time_ensemble_inclusive_arr.min(), time_target_inclusive_arr.min()
-        )
-        histogram_ensemble_inclusive_grid = self.histogram(
-            time_ensemble_inclusive_arr, inclusive_min, inclusive_max
-        )
-        histogram_target_inclusive_grid = self.histogram(
-            time_target_inclusive_arr, inclusive_min, inclusive_max
-        )
-
-        exclusive_max = max(
-            time_ensemble_exclusive_arr.max(), time_target_exclusive_arr.max()
-        )
-        exclusive_min = min(
-            time_ensemble_exclusive_arr.min(), time_target_exclusive_arr.min()
-        )
-        histogram_ensemble_exclusive_grid = self.histogram(
-            time_ensemble_exclusive_arr, exclusive_min, exclusive_max
-        )
-        histogram_target_exclusive_grid = self.histogram(
-            time_target_exclusive_arr, exclusive_min, exclusive_max
-        )
-
-        ret["Inclusive"] = {
-            "ensemble": self.histogram_format(histogram_ensemble_inclusive_grid),
-            "target": self.histogram_format(histogram_target_inclusive_grid),
-        }
-        ret["Exclusive"] = {
-            "ensemble": self.histogram_format(histogram_ensemble_exclusive_grid),
-            "target": self.histogram_format(histogram_target_exclusive_grid),
-        }
+        for kind in GenericHistogram._METRICS:
+            ensemble, target = self.target_hists[kind][
+                (prop, self.dataset_ids[dataset])
+            ]
+            ret[kind] = {
+                "ensemble": self.histogram_format(self._grid(ensemble, idx)),
+                "target": self.histogram_format(self._grid(target, idx)),
+            }
         return ret
@@ -21,6 +21,7 @@ class ParameterProjection:
 
     def __init__(self, supergraph, targetDataset="", n_cluster=3):
 
+        self.gf = supergraph.gf
         self.df = supergraph.gf.df
         self.datasets = self.df["dataset"].unique().tolist()
         self.projection = "MDS"
@@ -34,15 +35,10 @@ class ParameterProjection:
 
     def add_df_params(self, dataset):
         ret = {}
-        ret["max_inclusive_time"] = self.df.loc[self.df["dataset"] == dataset][
-            "time (inc)"
-        ].max()
-        ret["max_exclusive_time"] = self.df.loc[self.df["dataset"] == dataset][
-            "time"
-        ].max()
-        ret["rank_count"] = len(
-            self.df.loc[self.df["dataset"] == dataset]["rank"].unique()
-        )
+        dataset_df = self.gf.lookup_with_dataset(dataset)
+        ret["max_inclusive_time"] = dataset_df["time (inc)"].max()
+        ret["max_exclusive_time"] = dataset_df["time"].max()
+        ret["rank_count"] = len(dataset_df["rank"].unique())
         # ret['similarity'] = self.similarities[self.datasetOrder[self.targetDataset]]
         return ret
 
@@ -19,11 +19,12 @@ class SplitCallee:
         """
         assert isinstance(gf, callflow.GraphFrame)
         assert "component_path" in gf.df.columns
+        self.path_table = gf.path_table
 
         paths = self.callsite_paths(callsites)
 
         # module_group_df = gf.df.groupby(["module"])
-        module_name_group_df = gf.df.groupby(["module", "name"])
+        module_name_group_df = gf.df.groupby(["module", "name"], observed=True)
 
         for path in paths:
             component_edges = self.create_source_targets(path["component_path"])
@@ -101,16 +102,16 @@ class SplitCallee:
         return edges
 
     def callsite_paths(self, callsites):
-        from ast import literal_eval as make_list
-
         paths = []
         for callsite in callsites:
             df = self.name_group_df.get_group(callsite)
             paths.append(
                 {
-                    "group_path": make_list(df["group_path"].unique()[0]),
-                    "path": make_list(df["path"].unique()[0]),
-                    "component_path": make_list(df["component_path"].unique()[0]),
+                    "group_path": self.path_table.path(df["group_path"].unique()[0]),
+                    "path": self.path_table.path(df["path"].unique()[0]),
+                    "component_path": self.path_table.path(
+                        df["component_path"].unique()[0]
+                    ),
                 }
             )
         return paths
@@ -7,5 +7,6 @@ from .process import Process
 from .group import Group
 from .filter import Filter
 from .argparser import ArgParser
+from .manifest import Manifest
 
-__all__ = ["Process", "Group", "Filter", "ArgParser"]
+__all__ = ["Process", "Group", "Filter", "ArgParser", "Manifest"]
@@ -23,11 +23,41 @@ SCHEMA = {
         "filter_perc": {"type": "number"},
         "filter_by": {"type": "string"},
         "group_by": {"type": "string"},
+        "df_format": {"type": "string"},
+        "lazy_render": {"type": "boolean"},
+        "memory_budget": {"type": "number"},
+        "workers": {"type": "integer"},
+        "cache_size": {"type": "integer"},
+        "chunk_size": {"type": "integer"},
+        "boxplot_sketch": {"type": "boolean"},
+        "precompute_layouts": {"type": "boolean"},
+        "request_workers": {"type": "integer"},
+        "request_timeout": {"type": "number"},
+        "production": {"type": "boolean"},
+        "server_workers": {"type": "integer"},
     },
 }
 
 _SUPPORTED_PROFILE_FORMATS = ["hpctoolkit", "caliper_json", "caliper"]
 
+_SUPPORTED_DF_FORMATS = ["csv", "parquet", "feather"]
+
+# Options read from the command line, else the config file, else the default.
+# {option: (type, default)}
+_OPTIONS = {
+    "lazy_render": (bool, False),
+    "memory_budget": (float, 0),
+    "workers": (int, 1),
+    "cache_size": (int, 64),
+    "chunk_size": (int, 0),
+    "boxplot_sketch": (bool, False),
+    "precompute_layouts": (bool, False),
+    "request_workers": (int, 0),
+    "request_timeout": (float, 0),
+    "production": (bool, False),
+    "server_workers": (int, 4),
+}
+
 
 class ArgParser:
     """
@@ -109,7 +139,6 @@ class ArgParser:
             "--profile_format",
             help="Profile format, either hpctoolkit | caliper | caliper_json",
         )
-        parser.add_argument("--production", help="Launch app on production server.")
         parser.add_argument("--filter_perc", help="Set filter percentage")
         parser.add_argument(
             "--filter_by", help="Set filter by (e.g., time or time (inc)"
@@ -119,6 +148,58 @@ class ArgParser:
             help="Set group by (e.g., grouping by 'name' column gets call graph, and grouping by 'module' produces a super graph",
         )
         parser.add_argument("--save_path", help="Save path for the processed files")
+        parser.add_argument(
+            "--df_format",
+            help="Storage format for the processed dataframe, either csv | parquet | feather",
+        )
+        parser.add_argument(
+            "--workers",
+            help="Number of processes to process the runs of an ensemble concurrently",
+        )
+        parser.add_argument(
+            "--lazy_render",
+            action="store_true",
+            help="Read the processed dataframes on demand when rendering (feather files are memory-mapped)",
+        )
+        parser.add_argument(
+            "--memory_budget",
+            help="Memory budget (in MB) for the dataframes read in lazy render mode (0 for no limit)",
+        )
+        parser.add_argument(
+            "--cache_size",
+            help="Number of layouts cached for the client's requests (0 to disable)",
+        )
+        parser.add_argument(
+            "--chunk_size",
+            help="Rows per chunk for the ensemble auxiliary processing, to bound its memory (0 to process in memory)",
+        )
+        parser.add_argument(
+            "--boxplot_sketch",
+            action="store_true",
+            help="Estimate the boxplots with quantile sketches, merged across the runs",
+        )
+        parser.add_argument(
+            "--precompute_layouts",
+            action="store_true",
+            help="Precompute the layouts of the default views while processing",
+        )
+        parser.add_argument(
+            "--request_workers",
+            help="Number of processes to compute the layouts, projections and comparisons (0 to compute on the request's thread)",
+        )
+        parser.add_argument(
+            "--request_timeout",
+            help="Seconds a request waits for its computation by the request workers (0 for no limit)",
+        )
+        parser.add_argument(
+            "--production",
+            action="store_true",
+            help="Serve the API with a multi-worker server (gunicorn) sharing the loaded data",
+        )
+        parser.add_argument(
+            "--server_workers",
+            help="Number of worker processes of the production server",
+        )
         parser.add_argument(
             "--read_parameter", help="Enable parameter analysis", action="store_true"
         )
@@ -240,6 +321,17 @@ class ArgParser:
         else:
             scheme["group_by"] = json["group_by"]
 
+        if args.df_format:
+            scheme["df_format"] = args.df_format
+        elif "df_format" in json:
+            scheme["df_format"] = json["df_format"]
+        else:
+            scheme["df_format"] = "csv"
+        assert scheme["df_format"] in _SUPPORTED_DF_FORMATS
+
+        for option in _OPTIONS:
+            scheme[option] = ArgParser._read_option(args, json, option)
+
         if "callsite_module_map" in json:
             scheme["callsite_module_map"] = ArgParser._process_module_map(
                 json["scheme"]["callsite_module_map"]
@@ -252,6 +344,20 @@ class ArgParser:
 
         return scheme
 
+    @staticmethod
+    def _read_option(args, json, option):
+        """
+        Read an option (refer _OPTIONS) from the arguments, else the config file.
+        """
+        _type, default = _OPTIONS[option]
+        value = getattr(args, option)
+        if value:
+            return _type(value)
+        elif option in json:
+            return json[option]
+        else:
+            return default
+
     @staticmethod
     def _write_config(config):
         """
@@ -419,6 +525,16 @@ class ArgParser:
         else:
             scheme["group_by"] = "module"
 
+        # Set df_format
+        if args.df_format:
+            scheme["df_format"] = args.df_format
+        else:
+            scheme["df_format"] = "csv"
+        assert scheme["df_format"] in _SUPPORTED_DF_FORMATS
+
+        for option in _OPTIONS:
+            scheme[option] = ArgParser._read_option(args, {}, option)
+
         return scheme
 
     @staticmethod
@@ -451,7 +567,12 @@ class ArgParser:
             if not os.path.exists(dataset_dir):
                 os.makedirs(dataset_dir)
 
-            files = ["df.csv", "nxg.json", "hatchet_tree.txt", "auxiliary_data.json"]
+            files = [
+                callflow.GraphFrame._DF_FILENAMES[config["df_format"]],
+                "nxg.json",
+                "hatchet_tree.txt",
+                "auxiliary_data.bin",
+            ]
             for f in files:
                 fname = os.path.join(dataset_dir, f)
                 if not os.path.exists(fname):
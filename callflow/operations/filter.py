@@ -6,7 +6,6 @@
 # Library imports
 import numpy as np
 import networkx as nx
-from ast import literal_eval as make_list
 
 # CallFlow imports
 import callflow
@@ -110,7 +109,7 @@ class Filter:
 
         for callsite in callsites:
             path = df.loc[df["name"] == callsite]["path"].tolist()[0]
-            path = make_list(path)
+            path = self.gf.path_table.path(path)
             ret.add_path(path)
 
         return ret
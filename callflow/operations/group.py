@@ -3,10 +3,11 @@
 #
 # SPDX-License-Identifier: MIT
 
-from ast import literal_eval as make_list
+import pandas as pd
 
 # CallFlow imports
 import callflow
+from callflow.datastructures.path_table import PathTable
 
 LOGGER = callflow.get_logger(__name__)
 
@@ -16,186 +17,108 @@ class Group(callflow.GraphFrame):
         self.gf = gf
         self.group_by = group_by
 
-        # Data.
-        self.callsite_module_map = self.gf.df.set_index("name")["module"].to_dict()
-        self.callsite_path_map = self.gf.df.set_index("name")["path"].to_dict()
+        # Data (the last row of each callsite, same as a dict built row by row).
+        df = self.gf.df[["name", "module", "path"]].drop_duplicates("name", keep="last")
+        self.callsite_module_map = dict(zip(df["name"], df["module"]))
+        self.callsite_path_map = dict(zip(df["name"], df["path"]))
 
-        # Variables used by grouping operation.
-        self.entry_funcs = {}
-        self.other_funcs = {}
-        # TODO: remove this.
-        # self.module_id_map = {}
+        # Group paths of the call paths, i.e., {path ID: (group path ID, module)}.
+        # Memoized along the path table, so that shared prefixes are grouped once.
+        self.group_path_ids = {}
 
         self.compute()
 
     def compute(self):
-        group_path = {}
-        component_path = {}
-        component_level = {}
-        entry_func = {}
-        show_node = {}
-        node_name = {}
-        module = {}
-        change_name = {}
-
         LOGGER.debug(
             f"Nodes: {len(self.gf.nxg.nodes())}, Edges: {len(self.gf.nxg.edges())}"
         )
 
-        for idx, edge in enumerate(self.gf.nxg.edges()):
-            snode = edge[0]
-            tnode = edge[1]
-
-            if "/" in snode:
-                snode = snode.split("/")[-1]
-            if "/" in tnode:
-                tnode = tnode.split("/")[-1]
-
-            spath = self.callsite_path_map[snode]
-            tpath = self.callsite_path_map[tnode]
-
-            temp_group_path_results = self.create_group_path(spath)
-            group_path[snode] = temp_group_path_results
-
-            component_path[snode] = self.create_component_path(spath, group_path[snode])
-            component_level[snode] = len(component_path[snode])
-
-            temp_group_path_results = self.create_group_path(tpath)
-            group_path[tnode] = temp_group_path_results
-
-            component_path[tnode] = self.create_component_path(tpath, group_path[tnode])
-            component_level[tnode] = len(component_path[tnode])
+        # Callsites connected by the edges of the nxg.
+        callsites = set()
+        for edge in self.gf.nxg.edges():
+            for node in edge:
+                if "/" in node:
+                    node = node.split("/")[-1]
+                callsites.add(node)
 
-            if component_level[snode] == 2:
-                entry_func[snode] = True
-                show_node[snode] = True
-            else:
-                entry_func[snode] = False
-                show_node[snode] = False
-
-            node_name[snode] = self.callsite_module_map[snode] + "=" + snode
-
-            if component_level[tnode] == 2:
-                entry_func[tnode] = True
-                show_node[tnode] = True
-            else:
-                entry_func[tnode] = False
-                show_node[tnode] = False
-
-            node_name[tnode] = self.callsite_module_map[snode] + "=" + tnode
-
-        self.update_df("group_path", group_path)
-        self.update_df("component_path", component_path)
+        # Each callsite is grouped once.
+        group_path = {}
+        component_path = {}
+        component_level = {}
+        entry_func = {}
+        node_name = {}
+        for callsite in callsites:
+            path_id = self.callsite_path_map[callsite]
+            group_path[callsite], module = self.group_path_id(path_id)
+
+            component = self.create_component_path(
+                self.gf.path_table.path(path_id), module
+            )
+            component_path[callsite] = self.gf.path_table.intern(component)
+            component_level[callsite] = len(component)
+
+            entry_func[callsite] = component_level[callsite] == 2
+            # Labeled by its own module, same as its group path entries.
+            node_name[callsite] = self.callsite_module_map[callsite] + "=" + callsite
+
+        self.update_df("group_path", group_path, default=PathTable.EMPTY)
+        self.update_df("component_path", component_path, default=PathTable.EMPTY)
         self.update_df("show_node", entry_func)
         self.update_df("vis_name", node_name)
         self.update_df("component_level", component_level)
-        # self.update_df("mod_index", module_idx)
         self.update_df("entry_function", entry_func)
 
-    # flake8: noqa: C901
-    def create_group_path(self, path):
-        if isinstance(path, str):
-            path = make_list(path)
-        group_path = []
-        prev_module = None
-        for idx, callsite in enumerate(path):
-            if idx == 0:
-                # Assign the first callsite as from_callsite and not push into an array.
-                from_callsite = callsite
-                from_module = self.callsite_module_map[from_callsite]
-
-                # Store the previous module to check the hierarchy later.
-                prev_module = from_module
-
-                # Create the entry function and other functions dict.
-                if from_module not in self.entry_funcs:
-                    self.entry_funcs[from_module] = []
-                if from_module not in self.other_funcs:
-                    self.other_funcs[from_module] = []
-
-                # Push into entry function dict since it is the first callsite.
-                self.entry_funcs[from_module].append(from_callsite)
-
-                # Append to the group path.
-                group_path.append(from_module + "=" + from_callsite)
-
-            elif idx == len(path) - 1:
-                # Final callsite in the path.
-                to_callsite = callsite
-                if "/" in to_callsite:
-                    to_callsite = to_callsite.split("/")[-1]
-
-                to_module = self.callsite_module_map[to_callsite]
-
-                if prev_module != to_module:
-                    group_path.append(to_module + "=" + to_callsite)
-
-                if to_module not in self.entry_funcs:
-                    self.entry_funcs[to_module] = []
-                if to_module not in self.other_funcs:
-                    self.other_funcs[to_module] = []
-
-                if to_callsite not in self.other_funcs[to_module]:
-                    self.other_funcs[to_module].append(to_callsite)
-
-                if to_callsite not in self.entry_funcs[to_module]:
-                    self.entry_funcs[to_module].append(to_callsite)
-            else:
-                # Assign the from and to callsite.
-                from_callsite = path[idx - 1]
-                if "/" in callsite:
-                    to_callsite = callsite.split("/")[-1]
-                else:
-                    to_callsite = callsite
-
-                from_module = self.callsite_module_map[from_callsite]
-                to_module = self.callsite_module_map[to_callsite]
-
-                # Create the entry function and other function dict if not already present.
-                if to_module not in self.entry_funcs:
-                    self.entry_funcs[to_module] = []
-                if to_module not in self.other_funcs:
-                    self.other_funcs[to_module] = []
-
-                # if previous module is not same as the current module.
-                if to_module != prev_module:
-                    # TODO: Come back and check if it is in the path.
-                    if to_module in group_path:
-                        prev_module = to_module
-                    else:
-                        group_path.append(to_module + "=" + to_callsite)
-                        prev_module = to_module
-                        if to_callsite not in self.entry_funcs[to_module]:
-                            self.entry_funcs[to_module].append(to_callsite)
-
-                elif to_module == prev_module:
-                    to_callsite = callsite
-                    # to_module = self.entire_df.loc[self.entire_df['name'] == to_callsite]['module'].unique()[0]
-                    to_module = self.callsite_module_map[to_callsite]
-
-                    prev_module = to_module
-
-                    if to_callsite not in self.other_funcs[to_module]:
-                        self.other_funcs[to_module].append(to_callsite)
-
-        return group_path
-
-    def create_component_path(self, path, group_path):
-        component_path = []
-        component_module = group_path[len(group_path) - 1].split("=")[0]
-
-        for idx, node in enumerate(path):
-            node_func = node
-            if "/" in node:
-                node = node.split("/")[-1]
-            module = self.callsite_module_map[node]
-            if component_module == module:
-                component_path.append(node_func)
-
-        component_path.insert(0, component_module)
+    def group_path_id(self, path_id):
+        """
+        Returns the group path ID of the call path `path_id`, and the module of its last callsite.
+        The group path is the (module=callsite) entries of the path where the module changes.
+        It extends the group path of the call path's prefix, i.e., it is computed
+        once for each node of the path table.
+        """
+        path_table = self.gf.path_table
+
+        # Walk up to the closest grouped prefix.
+        chain = []
+        while path_id != PathTable.EMPTY and path_id not in self.group_path_ids:
+            chain.append(path_id)
+            path_id = path_table.prefix(path_id)
+
+        group_path_id, prev_module = self.group_path_ids.get(
+            path_id, (PathTable.EMPTY, None)
+        )
+        for path_id in reversed(chain):
+            callsite = path_table.leaf(path_id)
+            # The first callsite is always an entry.
+            if path_table.prefix(path_id) != PathTable.EMPTY and "/" in callsite:
+                callsite = callsite.split("/")[-1]
+
+            module = self.callsite_module_map[callsite]
+            if prev_module is None or module != prev_module:
+                group_path_id = path_table.extend(
+                    group_path_id, module + "=" + callsite
+                )
+
+            prev_module = module
+            self.group_path_ids[path_id] = (group_path_id, module)
+
+        return group_path_id, prev_module
+
+    def create_component_path(self, path, component_module):
+        """
+        Component path is the module followed by the path's callsites in the module.
+        """
+        component_path = [component_module]
+        for node in path:
+            callsite = node.split("/")[-1] if "/" in node else node
+            if self.callsite_module_map[callsite] == component_module:
+                component_path.append(node)
         return tuple(component_path)
 
-    def update_df(self, col_name, mapping):
-        self.gf.df[col_name] = self.gf.df["name"].apply(
-            lambda node: mapping[node] if node in mapping.keys() else ""
-        )
+    def update_df(self, col_name, mapping, default=""):
+        """
+        Set the column from a {callsite: value} mapping, i.e., it is looked up
+        once for each callsite and broadcast to its rows.
+        """
+        codes, names = pd.factorize(self.gf.df["name"])
+        values = [mapping.get(name, default) for name in names]
+        self.gf.df[col_name] = pd.Series(values).take(codes).values
@@ -0,0 +1,176 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+import json
+import hashlib
+
+import callflow
+
+LOGGER = callflow.get_logger(__name__)
+
+
+class Manifest:
+    """
+    Manifest of the .callflow directory (i.e., save_path/manifest.json).
+
+    It records the content hash of the data each run was processed from, and
+    the fingerprints of the ensemble's callsites and modules. Re-processing uses
+    it to skip the unchanged runs and to reuse their auxiliary data.
+    All the records are discarded if the processing parameters change.
+    """
+
+    _FILENAME = "manifest.json"
+
+    # Config keys that change the processed results.
+    _PARAMS = [
+        "filter_by",
+        "filter_perc",
+        "group_by",
+        "df_format",
+        "chunk_size",
+        "boxplot_sketch",
+    ]
+
+    # Optional config inputs of the processing (refer SuperGraph.process_gf),
+    # which are recorded by their hash, since they can be large.
+    _HASHED_PARAMS = ["callsite_module_map"]
+
+    # Files written for each processed run (besides the dataframe).
+    _ARTIFACTS = ["nxg.json", "paths.json", "auxiliary_data.bin"]
+
+    def __init__(self, config):
+        self.config = config
+        self.path = os.path.join(config["save_path"], Manifest._FILENAME)
+        self.params = {_: config[_] for _ in Manifest._PARAMS}
+        for _ in Manifest._HASHED_PARAMS:
+            self.params[_] = Manifest.value_hash(config.get(_))
+
+        self.manifest = {"params": self.params, "runs": {}, "ensemble": None}
+        if os.path.isfile(self.path):
+            with open(self.path, "r") as fptr:
+                manifest = json.load(fptr)
+            if manifest["params"] == self.params:
+                self.manifest = manifest
+            else:
+                LOGGER.info("Processing parameters changed, ignoring the manifest.")
+
+        self.hashes = {}
+
+    # --------------------------------------------------------------------------
+    def is_changed(self, name):
+        """
+        Returns true if the run has to be processed, i.e., it was not
+        processed before, its data changed, or its files are missing.
+        """
+        record = self.manifest["runs"].get(name)
+        if record is None or record != self._run_record(name):
+            return True
+        return not self._is_processed(name)
+
+    def add_run(self, name):
+        """
+        Record a processed run.
+        """
+        self.manifest["runs"][name] = self._run_record(name)
+
+    def is_ensemble_unchanged(self, names):
+        """
+        Returns true if the ensemble was processed from the same (unchanged) runs.
+        """
+        ensemble = self.manifest["ensemble"]
+        if ensemble is None or ensemble["runs"] != names:
+            return False
+        if any(self.is_changed(_) for _ in names):
+            return False
+        return self._is_processed("ensemble")
+
+    def ensemble_fingerprints(self):
+        """
+        Returns the callsite and module fingerprints of the processed ensemble (if any).
+        """
+        ensemble = self.manifest["ensemble"]
+        if ensemble is None or not self._is_processed("ensemble"):
+            return None
+        return {"callsite": ensemble["callsite"], "module": ensemble["module"]}
+
+    def set_ensemble(self, names, fingerprints):
+        """
+        Record the processed ensemble.
+        """
+        self.manifest["ensemble"] = {
+            "runs": names,
+            "callsite": fingerprints["callsite"],
+            "module": fingerprints["module"],
+        }
+
+    def write(self):
+        LOGGER.info(f"[Write] {self.path}")
+        with open(self.path, "w") as fptr:
+            json.dump(self.manifest, fptr, indent=2)
+
+    # --------------------------------------------------------------------------
+    def _run_record(self, name):
+        """
+        Record of a run: its input data path, profile format, and content hash.
+        """
+        props = self.config["parameter_props"]
+        path = os.path.join(self.config["data_path"], props["data_path"][name])
+        if path not in self.hashes:
+            self.hashes[path] = Manifest.content_hash(path)
+
+        return {
+            "path": path,
+            "profile_format": props["profile_format"][name],
+            "hash": self.hashes[path],
+        }
+
+    @staticmethod
+    def content_hash(path):
+        """
+        SHA-1 of a file, or of all the files (and their relative paths) in a directory.
+        """
+        if os.path.isdir(path):
+            fnames = sorted(
+                os.path.join(root, fname)
+                for root, dirs, files in os.walk(path)
+                for fname in files
+            )
+        else:
+            fnames = [path]
+
+        sha = hashlib.sha1()
+        for fname in fnames:
+            sha.update(os.path.relpath(fname, path).encode())
+            with open(fname, "rb") as fptr:
+                for chunk in iter(lambda: fptr.read(1 << 20), b""):
+                    sha.update(chunk)
+        return sha.hexdigest()
+
+    @staticmethod
+    def value_hash(value):
+        """
+        Returns the hash of a json-serializable value (None, if it is None).
+        """
+        if value is None:
+            return None
+        string = json.dumps(value, sort_keys=True, default=str)
+        return hashlib.sha1(string.encode()).hexdigest()
+
+    def _is_processed(self, tag):
+        """
+        Returns true if the files of the run (or the ensemble) are written.
+        """
+        dirname = os.path.join(self.config["save_path"], tag)
+        files = [callflow.GraphFrame._DF_FILENAMES[self.params["df_format"]]]
+        return all(
+            Manifest._is_written(os.path.join(dirname, _))
+            for _ in files + Manifest._ARTIFACTS
+        )
+
+    @staticmethod
+    def _is_written(fname):
+        # .callflow directory is created with empty placeholder files.
+        return os.path.isfile(fname) and os.path.getsize(fname) > 0
@@ -5,10 +5,10 @@
 
 import numpy as np
 import pandas as pd
-from scipy.stats import kurtosis, skew
 
 # CallFlow imports
 import callflow
+from callflow.datastructures.path_table import PathTable
 
 LOGGER = callflow.get_logger(__name__)
 
@@ -40,9 +40,11 @@ class Process:
         def graphMapper(self):
             self.callers = {}
             self.callees = {}
-            self.paths = {}
             self.hatchet_nodes = {}
 
+            # Path IDs (refer PathTable) of the hatchet nodes, keyed by id(node).
+            self.path_ids = {}
+
             for node in self.gf.graph.traverse():
                 node_dict = callflow.utils.node_dict_from_frame(node.frame)
 
@@ -59,8 +61,6 @@ class Process:
                 else:
                     node_name = node_dict["name"]
 
-                node_paths = node.paths()
-                self.paths[node_name] = node_paths
                 self.callers[node_name] = self.convertFrameList(node.parents)
                 self.callees[node_name] = self.convertFrameList(node.children)
                 self.hatchet_nodes[node_name] = node
@@ -68,87 +68,115 @@ class Process:
         def build(self):
             return Process(self.gf, self.tag)
 
+        def path_id(self, node):
+            """
+            Returns the path ID of the hatchet node's path, i.e., the last of node.paths().
+            The path extends the path of the node's last parent, so the path IDs
+            are computed once per node, and paths share their prefixes in the table.
+            """
+            # Walk up to the closest node with a path ID (or the root).
+            chain = []
+            while id(node) not in self.path_ids and len(node.parents) > 0:
+                chain.append(node)
+                node = node.parents[-1]
+
+            if id(node) not in self.path_ids:
+                self.path_ids[id(node)] = self.gf.path_table.extend(
+                    PathTable.EMPTY, callflow.utils.path_name_from_frame(node.frame)
+                )
+
+            path_id = self.path_ids[id(node)]
+            for node in reversed(chain):
+                path_id = self.gf.path_table.extend(
+                    path_id, callflow.utils.path_name_from_frame(node.frame)
+                )
+                self.path_ids[id(node)] = path_id
+            return path_id
+
         # Add the path information from the node object
         def add_path(self):
-            self.raiseExceptionIfNodeCountNotEqual(self.paths)
-            self.gf.df["path"] = self.gf.df["name"].apply(
-                lambda node_name: callflow.utils.path_list_from_frames(
-                    self.paths[node_name]
-                )
-            )
+            self.raiseExceptionIfNodeCountNotEqual(self.hatchet_nodes)
+            # Each distinct path is interned once, and the rows store its ID.
+            path_ids = {
+                node_name: self.path_id(node)
+                for node_name, node in self.hatchet_nodes.items()
+            }
+            self.gf.df["path"] = self.gf.df["name"].map(path_ids)
             return self
 
         # Imbalance percentage Series in the dataframe
         def add_imbalance_perc(self):
-            inclusive = {}
-            exclusive = {}
-            std_deviation_inclusive = {}
-            std_deviation_exclusive = {}
-
-            skewness_inclusive = {}
-            skewness_exclusive = {}
-
-            kurtosis_inclusive = {}
-            kurtosis_exclusive = {}
-
-            for node_name in self.gf.df["name"].unique():
-                node_df = self.gf.df.loc[self.gf.df["name"] == node_name]
-
-                max_incTime = node_df["time"].mean()
-                mean_incTime = node_df["time (inc)"].mean()
-
-                max_excTime = node_df["time"].max()
-                mean_excTime = node_df["time"].mean()
-
-                if mean_incTime == 0.0:
-                    mean_incTime = 1.0
-
-                inclusive[node_name] = (max_incTime - mean_incTime) / mean_incTime
-                exclusive[node_name] = (max_excTime - mean_excTime) / mean_excTime
-
-                std_deviation_inclusive[node_name] = np.std(
-                    node_df["time (inc)"].tolist(), ddof=1
-                )
-                std_deviation_exclusive[node_name] = np.std(
-                    node_df["time"].tolist(), ddof=1
-                )
-
-                skewness_inclusive[node_name] = skew(node_df["time (inc)"].tolist())
-                skewness_exclusive[node_name] = skew(node_df["time"].tolist())
-
-                kurtosis_inclusive[node_name] = kurtosis(node_df["time (inc)"].tolist())
-                kurtosis_exclusive[node_name] = kurtosis(node_df["time"].tolist())
-
-            self.gf.df["imbalance_perc_inclusive"] = self.gf.df["name"].apply(
-                lambda name: inclusive[name]
-            )
-            self.gf.df["imbalance_perc_exclusive"] = self.gf.df["name"].apply(
-                lambda name: exclusive[name]
-            )
-
-            self.gf.df["std_deviation_inclusive"] = self.gf.df["name"].apply(
-                lambda name: std_deviation_inclusive[name]
-            )
-            self.gf.df["std_deviation_exclusive"] = self.gf.df["name"].apply(
-                lambda name: std_deviation_exclusive[name]
-            )
-
-            self.gf.df["skewness_inclusive"] = self.gf.df["name"].apply(
-                lambda name: skewness_inclusive[name]
-            )
-            self.gf.df["skewness_exclusive"] = self.gf.df["name"].apply(
-                lambda name: skewness_exclusive[name]
-            )
-
-            self.gf.df["kurtosis_inclusive"] = self.gf.df["name"].apply(
-                lambda name: kurtosis_inclusive[name]
-            )
-            self.gf.df["kurtosis_exclusive"] = self.gf.df["name"].apply(
-                lambda name: kurtosis_exclusive[name]
-            )
+            # Statistics are computed per callsite in one pass, and broadcast to its rows.
+            stats = Process.Builder.callsite_statistics(self.gf.df)
+            for column, values in stats.items():
+                self.gf.df[column] = values
 
             return self
 
+        @staticmethod
+        def callsite_statistics(df):
+            """
+            Compute the imbalance percentage, standard deviation, skewness and
+            kurtosis of the inclusive and exclusive times of each callsite.
+
+            Return:
+                (dict) column name -> per-row values (i.e., statistic of the row's callsite).
+            """
+            codes, _ = pd.factorize(df["name"])
+            inc = Process.Builder._group_moments(codes, df["time (inc)"].values)
+            exc = Process.Builder._group_moments(codes, df["time"].values)
+
+            # Note: inclusive imbalance uses the mean exclusive time as the maximum.
+            mean_inc = np.where(inc["mean"] == 0.0, 1.0, inc["mean"])
+            with np.errstate(divide="ignore", invalid="ignore"):
+                imbalance_inc = (exc["mean"] - mean_inc) / mean_inc
+                imbalance_exc = (exc["max"] - exc["mean"]) / exc["mean"]
+
+            stats = {
+                "imbalance_perc_inclusive": imbalance_inc,
+                "imbalance_perc_exclusive": imbalance_exc,
+                "std_deviation_inclusive": inc["std"],
+                "std_deviation_exclusive": exc["std"],
+                "skewness_inclusive": inc["skewness"],
+                "skewness_exclusive": exc["skewness"],
+                "kurtosis_inclusive": inc["kurtosis"],
+                "kurtosis_exclusive": exc["kurtosis"],
+            }
+            return {column: values[codes] for column, values in stats.items()}
+
+        @staticmethod
+        def _group_moments(codes, values):
+            """
+            Per-group mean, max, standard deviation (ddof=1), skewness and
+            kurtosis (same as scipy.stats.skew and scipy.stats.kurtosis) of
+            `values`, where `codes` is the group index of each value.
+            """
+            values = values.astype(np.float64)
+            count = np.bincount(codes)
+            mean = np.bincount(codes, weights=values) / count
+            maximum = pd.Series(values).groupby(codes).max().values
+
+            # Central moments (two-pass, as scipy).
+            deviation = values - mean[codes]
+            m2 = np.bincount(codes, weights=deviation ** 2) / count
+            m3 = np.bincount(codes, weights=deviation ** 3) / count
+            m4 = np.bincount(codes, weights=deviation ** 4) / count
+
+            # Constant groups (up to round-off) have zero skewness and kurtosis.
+            zero = m2 <= (np.finfo(np.float64).resolution * mean) ** 2
+            with np.errstate(divide="ignore", invalid="ignore"):
+                std = np.sqrt(m2 * count / (count - 1))
+                skewness = np.where(zero, 0.0, m3 / m2 ** 1.5)
+                kurtosis = np.where(zero, 0.0, m4 / m2 ** 2) - 3.0
+
+            return {
+                "mean": mean,
+                "max": maximum,
+                "std": std,
+                "skewness": skewness,
+                "kurtosis": kurtosis,
+            }
+
         def add_callers_and_callees(self):
             self.gf.df["callees"] = self.gf.df["name"].apply(
                 lambda node: self.callees[node]
@@ -6,12 +6,15 @@
 # Library imports
 import os
 import warnings
-from flask import Flask, request, json, jsonify
+from flask import Flask, request, jsonify
 from networkx.readwrite import json_graph
 
 
 # CallFlow imports
 import callflow
+from callflow.server.serializer import Serializer
+from callflow.server.executor import RequestTimeoutError
+from callflow.server.production_server import ProductionServer
 
 STATIC_FOLDER_PATH = os.path.abspath("app/dist/")
 
@@ -20,12 +23,22 @@ app = Flask(__name__, static_url_path="", static_folder=STATIC_FOLDER_PATH)
 
 LOGGER = callflow.get_logger(__name__)
 
+# Encoding and compression of the responses are negotiated per request.
+SERIALIZER = Serializer()
+
 
 class APIProvider:
     """"""
 
     def __init__(
-        self, callflow: callflow.CallFlow, host: str, port: str, ensemble: bool
+        self,
+        callflow: callflow.CallFlow,
+        host: str,
+        port: str,
+        ensemble: bool,
+        production: bool = False,
+        workers: int = 4,
+        timeout: float = 0,
     ) -> None:
         self.callflow = callflow
         self._handle_general()
@@ -33,7 +46,10 @@ class APIProvider:
         self._handle_ensemble()
 
         LOGGER.info("Starting the API service")
-        app.run(host=host, port=port, threaded=True)
+        if production:
+            ProductionServer(app, host, port, workers=workers, timeout=timeout).run()
+        else:
+            app.run(host=host, port=port, threaded=True)
 
     @staticmethod
     def emit_json(endpoint: str, json_data: any) -> str:
@@ -41,14 +57,22 @@ class APIProvider:
         Emit the json data to the endpoint
         """
         try:
+            payload, mimetype, encoding = SERIALIZER.serialize(
+                json_data,
+                accept=request.headers.get("Accept", ""),
+                accept_encoding=request.headers.get("Accept-Encoding", ""),
+            )
             response = app.response_class(
-                response=json.dumps(json_data), status=200, mimetype="application/json"
+                response=payload, status=200, mimetype=mimetype
             )
+            if encoding is not None:
+                response.headers.add("Content-Encoding", encoding)
+            response.headers.add("Vary", "Accept, Accept-Encoding")
             response.headers.add("Access-Control-Allow-Origin", "*")
             response.headers.add("Access-Control-Allow-Headers", "*")
             response.headers.add("Access-Control-Allow-Methods", "*")
             return response
-        except ValueError:
+        except (ValueError, TypeError):
             warnings.warn(f"[API: {endpoint}] emits no data.")
             return jsonify(isError=True, message="Error", statusCode=500, data={"a": 1})
 
@@ -68,6 +92,8 @@ class APIProvider:
 
         @app.route("/supergraph_data", methods=["POST"])
         def supergraph_data():
+            # Optional "module", "callsites", "metric", "page" and "page_size"
+            # select a page of the top callsites (refer AuxiliaryStore.query).
             data = request.json
             result = self.callflow.request_general(
                 {
@@ -77,6 +103,23 @@ class APIProvider:
             )
             return APIProvider.emit_json("supergraph_data", result)
 
+        @app.route("/cache_stats", methods=["GET"])
+        def cache_stats():
+            result = self.callflow.cache.stats()
+            return APIProvider.emit_json("cache_stats", result)
+
+        @app.route("/executor_stats", methods=["GET"])
+        def executor_stats():
+            result = {}
+            if self.callflow.executor is not None:
+                result = self.callflow.executor.stats()
+            return APIProvider.emit_json("executor_stats", result)
+
+        @app.errorhandler(RequestTimeoutError)
+        def request_timeout(error):
+            warnings.warn(f"[API: {request.path}] {error}")
+            return jsonify(isError=True, message=str(error), statusCode=504), 504
+
     def _handle_single(self):
         """
         Single CallFlow API requests
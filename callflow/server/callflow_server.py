@@ -10,6 +10,7 @@ import os
 import callflow
 from callflow.operations import ArgParser
 from callflow.server.api_provider import APIProvider
+from callflow.server.executor import RequestExecutor
 import callflow.server.manager as manager
 
 # Globals
@@ -32,9 +33,15 @@ class CallFlowServer:
         )
 
         self.debug = True
-        self.production = True
+        self.production = self.args.config["production"]
         self.process = self.args.process
 
+        # The production server's workers share the data loaded before they are
+        # forked, whereas the lazily read dataframes would be read by each worker.
+        if self.production and not self.process and self.args.config["lazy_render"]:
+            LOGGER.info("Production mode: lazy_render is not used.")
+            self.args.config["lazy_render"] = False
+
         self.callflow = callflow.CallFlow(config=self.args.config)
 
         if self.process:
@@ -59,17 +66,30 @@ class CallFlowServer:
         if len(self.args.config["parameter_props"]["runs"]) > 1:
             ensemble = True
 
-        APIProvider(
-            callflow=self.callflow,
-            host=CALLFLOW_APP_HOST,
-            port=CALLFLOW_APP_PORT,
-            ensemble=ensemble,
-        )
-
-        # Start the server.
+        # CPU-heavy requests are computed by a pool of worker processes.
+        # In production mode, they are computed by the server's workers.
         if self.production:
-            # TODO: CAL-6-enable-production-server
-            pass
+            LOGGER.info("Production mode: request_workers is not used.")
+        elif self.args.config["request_workers"] > 0:
+            self.callflow.executor = RequestExecutor(
+                self.callflow,
+                workers=self.args.config["request_workers"],
+                timeout=self.args.config["request_timeout"],
+            )
+
+        try:
+            APIProvider(
+                callflow=self.callflow,
+                host=CALLFLOW_APP_HOST,
+                port=CALLFLOW_APP_PORT,
+                ensemble=ensemble,
+                production=self.production,
+                workers=self.args.config["server_workers"],
+                timeout=self.args.config["request_timeout"],
+            )
+        finally:
+            if self.callflow.executor is not None:
+                self.callflow.executor.shutdown()
 
 
 def main():
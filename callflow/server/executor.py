@@ -0,0 +1,146 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+
+# CallFlow imports
+import callflow
+
+LOGGER = callflow.get_logger(__name__)
+
+# CallFlow of the worker processes (inherited from the server, if forked).
+_CALLFLOW = None
+
+
+def _init_worker(config):
+    """
+    Load the .callflow directory in the worker, unless it is inherited.
+    """
+    global _CALLFLOW
+    if _CALLFLOW is None:
+        _CALLFLOW = callflow.CallFlow(config=config)
+        _CALLFLOW.load()
+    # The worker computes the requests itself.
+    _CALLFLOW.executor = None
+
+
+def _run_in_worker(method, operation):
+    return getattr(_CALLFLOW, method)(operation)
+
+
+def _noop():
+    return None
+
+
+class RequestTimeoutError(Exception):
+    """
+    The computation of a request did not finish in time (refer RequestExecutor).
+    """
+
+
+class RequestExecutor:
+    """
+    Computes the CPU-heavy requests (e.g., layouts, projections) in a pool of
+    worker processes, so they do not hold the server's GIL, and the other
+    requests are served while they are computed.
+
+    The identical requests in flight share a computation, and a request waits
+    for at most `timeout` seconds (the computation is not interrupted, its
+    result is still shared with the identical requests).
+    """
+
+    def __init__(self, callflow_, workers=2, timeout=0):
+        """
+        Arguments:
+            callflow_ (CallFlow): loaded CallFlow, inherited by the (forked) workers.
+            workers (int): number of worker processes.
+            timeout (float): seconds a request waits for its result (0 for no limit).
+        """
+        global _CALLFLOW
+        assert workers > 0
+        self.workers = workers
+        self.timeout = timeout if timeout > 0 else None
+
+        self.submitted = 0
+        self.deduplicated = 0
+        self.timeouts = 0
+
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+        # Forked workers share the loaded data with the server (copy-on-write),
+        # the others load it again.
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        if context.get_start_method() == "fork":
+            _CALLFLOW = callflow_
+
+        LOGGER.info(f"Starting {workers} request workers")
+        self._pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(callflow_.config,),
+        )
+
+        # Start the workers before the server starts its threads.
+        for future in [self._pool.submit(_noop) for _ in range(workers)]:
+            future.result()
+
+    def run(self, method, operation):
+        """
+        Returns the result of `CallFlow.<method>(operation)`, computed in a worker.
+        """
+        key = (method, json.dumps(operation, sort_keys=True))
+        with self._lock:
+            future = self._inflight.get(key)
+            submitted = future is None
+            if submitted:
+                self.submitted += 1
+                future = self._pool.submit(_run_in_worker, method, operation)
+                self._inflight[key] = future
+            else:
+                self.deduplicated += 1
+
+        # A completed future runs the callback immediately (i.e., on this thread),
+        # so it is registered after the lock is released.
+        if submitted:
+            future.add_done_callback(lambda _: self._done(key, _))
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise RequestTimeoutError(
+                f"{method} {operation} did not finish in {self.timeout} seconds."
+            )
+
+    def _done(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self):
+        """
+        Returns the metrics of the executor.
+        """
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "inflight": len(self._inflight),
+                "submitted": self.submitted,
+                "deduplicated": self.deduplicated,
+                "timeouts": self.timeouts,
+            }
+
+    def shutdown(self):
+        """
+        Stop the workers, without waiting for the computations in flight.
+        """
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,87 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import gc
+
+try:
+    import gunicorn.app.base
+except ImportError:
+    gunicorn = None
+
+# CallFlow imports
+import callflow
+
+LOGGER = callflow.get_logger(__name__)
+
+
+class ProductionServer:
+    """
+    Serves the API (a WSGI app) with gunicorn's pre-forked worker processes.
+
+    The app (and the loaded supergraphs) is loaded once by the master process,
+    and the workers are forked from it, so they share its memory copy-on-write
+    instead of each loading a private copy. The loaded objects are frozen out of
+    the garbage collector (refer gc.freeze), so the workers' collections do not
+    touch (i.e., copy) their pages. Only the data loaded before the fork is
+    shared, so the supergraphs must be read eagerly (i.e., not lazily).
+    """
+
+    # Threads of each worker, so the cheap requests are served during a heavy one.
+    _THREADS = 4
+
+    def __init__(self, app, host, port, workers=4, timeout=0):
+        """
+        Arguments:
+            app (Flask): WSGI app, with its routes.
+            workers (int): number of worker processes.
+            timeout (float): seconds before a silent worker is restarted (0 for no limit).
+        """
+        self.app = app
+        self.options = {
+            "bind": f"{host}:{port}",
+            "workers": workers,
+            "worker_class": "gthread",
+            "threads": ProductionServer._THREADS,
+            "preload_app": True,
+            "timeout": int(timeout),
+        }
+
+    @staticmethod
+    def is_available():
+        return gunicorn is not None
+
+    def run(self):
+        if not ProductionServer.is_available():
+            LOGGER.warning("gunicorn is not installed, using the development server.")
+            host, port = self.options["bind"].split(":")
+            self.app.run(host=host, port=int(port), threaded=True)
+            return
+
+        # Move the loaded objects to the permanent generation before forking.
+        gc.collect()
+        gc.freeze()
+
+        LOGGER.info(f"Starting {self.options['workers']} server workers")
+        _GunicornApplication(self.app, self.options).run()
+
+
+if gunicorn is not None:
+
+    class _GunicornApplication(gunicorn.app.base.BaseApplication):
+        """
+        gunicorn application of an (already loaded) WSGI app.
+        """
+
+        def __init__(self, app, options):
+            self.application = app
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return self.application
@@ -0,0 +1,156 @@
+# Copyright 2017-2020 Lawrence Livermore National Security, LLC and other
+# CallFlow Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import gzip
+import json
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# CallFlow imports
+import callflow
+
+LOGGER = callflow.get_logger(__name__)
+
+
+def _to_builtin(obj):
+    """
+    Convert the numpy objects (and sets) that the encoders do not support.
+    """
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
+
+
+def _encode_json(data):
+    # orjson serializes the numpy arrays natively, and is much faster than json.
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                data,
+                default=_to_builtin,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            # e.g., integers that do not fit 64 bits.
+            pass
+    return json.dumps(data, default=_to_builtin).encode("utf-8")
+
+
+def _encode_msgpack(data):
+    return msgpack.packb(data, default=_to_builtin, use_bin_type=True)
+
+
+class Serializer:
+    """
+    Serializer of the API responses (refer APIProvider.emit_json).
+
+    The encoding (i.e., the mimetype) and the compression of a response are
+    negotiated from the request's "Accept" and "Accept-Encoding" headers. JSON
+    is encoded using orjson (json, if it is not installed), a compact binary
+    encoding (msgpack) is used if the client accepts it, and the payload is
+    compressed using brotli or gzip. Encoders (and compressors) are looked up
+    by the mimetype (and the encoding), so new ones can be registered.
+    """
+
+    # {mimetype: encode(data) -> bytes}, JSON is used unless another is preferred.
+    ENCODERS = {"application/json": _encode_json}
+
+    # {encoding: compress(payload, level) -> bytes}, in the order of preference.
+    COMPRESSORS = {"gzip": lambda payload, level: gzip.compress(payload, level)}
+
+    # Smaller payloads are not compressed.
+    _MIN_SIZE = 1024
+
+    def __init__(self, level=1, min_size=_MIN_SIZE):
+        """
+        Arguments:
+            level (int): compression level (1-9 for gzip, 0-11 for brotli), the
+                fastest by default, since the responses are compressed per request.
+            min_size (int): size (in bytes) of the smallest compressed payload.
+        """
+        self.level = level
+        self.min_size = min_size
+
+    @staticmethod
+    def _accepted(header):
+        """
+        Parse an "Accept"-style header into {value: quality}.
+        """
+        ret = {}
+        for item in header.split(","):
+            parts = [_.strip() for _ in item.split(";")]
+            if parts[0] == "":
+                continue
+            quality = 1.0
+            for param in parts[1:]:
+                if param.startswith("q="):
+                    try:
+                        quality = float(param[2:])
+                    except ValueError:
+                        quality = 0.0
+            ret[parts[0].lower()] = quality
+        return ret
+
+    def negotiate(self, accept="", accept_encoding=""):
+        """
+        Returns the mimetype and the encoding (None, if not compressed) of the
+        response, as preferred by the request's headers.
+        """
+        accepted = Serializer._accepted(accept)
+        mimetypes = [_ for _ in Serializer.ENCODERS if accepted.get(_, 0) > 0]
+        # JSON, unless the client explicitly prefers another mimetype.
+        mimetype = max(mimetypes, key=lambda _: accepted[_], default="application/json")
+        if accepted.get("application/json", 0) >= accepted.get(mimetype, 0):
+            mimetype = "application/json"
+
+        accepted = Serializer._accepted(accept_encoding)
+        encodings = [
+            _
+            for _ in Serializer.COMPRESSORS
+            if accepted.get(_, accepted.get("*", 0)) > 0
+        ]
+        encoding = max(
+            encodings, key=lambda _: accepted.get(_, accepted.get("*")), default=None
+        )
+        return mimetype, encoding
+
+    def serialize(self, data, accept="", accept_encoding=""):
+        """
+        Returns the payload, its mimetype and its encoding (None, if not compressed).
+        """
+        mimetype, encoding = self.negotiate(accept, accept_encoding)
+        payload = Serializer.ENCODERS[mimetype](data)
+        if encoding is None or len(payload) < self.min_size:
+            return payload, mimetype, None
+        return Serializer.COMPRESSORS[encoding](payload, self.level), mimetype, encoding
+
+
+# Optional encoders and compressors (brotli is preferred over gzip).
+if msgpack is not None:
+    Serializer.ENCODERS["application/msgpack"] = _encode_msgpack
+
+if brotli is not None:
+    Serializer.COMPRESSORS = {
+        "br": lambda payload, level: brotli.compress(payload, quality=level),
+        **Serializer.COMPRESSORS,
+    }
@@ -9,6 +9,7 @@
 import callflow
 import hatchet
 import json
+from ast import literal_eval
 
 LOGGER = callflow.get_logger(__name__)
 
@@ -47,6 +48,18 @@ def convertStringToList(string: str):
     return string.strip("][").split(", ")
 
 
+def list_from_path(path):
+    """
+    Convert a callsite path stored by the older versions to a list.
+    Paths read from a csv file are stringified lists, while paths read from a
+    columnar file (parquet/feather) are already sequences.
+    Note: Paths are now interned in the PathTable, and stored as path IDs.
+    """
+    if isinstance(path, str):
+        return literal_eval(path)
+    return list(path)
+
+
 def median(arr: list):
     """
     Returns the median and its index in the array.
@@ -231,6 +244,15 @@ def node_dict_from_frame(frame: hatchet.frame):
         return {"name": frame.get("name"), "line": "NA", "type": "region"}
 
 
+def path_name_from_frame(frame: hatchet.frame):
+    """
+    Constructs callsite's name (as an element of its path) from Hatchet's frame.
+    """
+    if frame.get("type") in ["statement", "loop"]:
+        return frame.get("file") + ":" + str(frame.get("line"))
+    return frame.get("name")
+
+
 def path_list_from_frames(frames: list):
     """
     Constructs callsite's path from Hatchet's frame.
@@ -239,14 +261,7 @@ def path_list_from_frames(frames: list):
     for frame in frames:
         path = []
         for f in frame:
-            if f.get("type") == "function":
-                path.append(f.get("name"))
-            elif f.get("type") == "statement":
-                path.append(f.get("file") + ":" + str(f.get("line")))
-            elif f.get("type") == "loop":
-                path.append(f.get("file") + ":" + str(f.get("line")))
-            else:
-                path.append(f.get("name"))
+            path.append(path_name_from_frame(f))
         paths.append(path)
     return path
 